@@ -0,0 +1,39 @@
+"""Gerador de clientes e backups mock como pacote importável (com docs/ no sys.path)
+
+Importar o pacote só carrega a biblioteca padrão: as tabelas de referência são lidas no primeiro cliente gerado
+e o motor de arquivos (numpy/pyarrow, shards, CSVs) do generate_large_dataset.py só entra quando é usado.
+
+    from backup_generator import generate_dataset
+    clients, backups = generate_dataset({"seed": 1, "clients": {"count": 5}, "dates": {"days": 30}})
+"""
+import importlib
+
+from backup_generator.cnpj import generate_cnpj, generate_cnpjs, is_valid_cnpj
+from backup_generator.core import (
+    DEFAULT_SCENARIO, build_clients_with_stats, compute_client_stats, generate_backup_data, generate_client,
+    generate_client_population, generate_clients, generate_dataset, iter_backup_data, load_scenario, normalize_scenario,
+)
+from backup_generator.reference import reference_tables
+from backup_generator.sampling import CategoricalSampler
+
+# Funções do motor de arquivos, carregadas sob demanda: nome -> módulo
+_ENGINE_EXPORTS = {
+    "run_scenario": "generate_large_dataset",
+    "run_cached_scenario": "generate_large_dataset",
+    "generate_backup_columns": "generate_large_dataset",
+    "generate_upload_csv": "generate_large_dataset",
+}
+
+__all__ = [
+    "CategoricalSampler", "DEFAULT_SCENARIO", "build_clients_with_stats", "compute_client_stats", "generate_backup_data",
+    "generate_client", "generate_client_population", "generate_clients", "generate_cnpj", "generate_cnpjs",
+    "generate_dataset", "is_valid_cnpj", "iter_backup_data", "load_scenario", "normalize_scenario", "reference_tables",
+] + list(_ENGINE_EXPORTS)
+
+def __getattr__(name):
+    if name in _ENGINE_EXPORTS:
+        return getattr(importlib.import_module(_ENGINE_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_ENGINE_EXPORTS))
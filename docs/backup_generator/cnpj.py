@@ -0,0 +1,138 @@
+import random
+from functools import lru_cache
+
+# Pesos dos dígitos verificadores (Receita Federal)
+FIRST_WEIGHTS = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+SECOND_WEIGHTS = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+
+# Os 12 primeiros dígitos (a base) vão de 0 a 10^12 - 1
+BASE_SPACE = 10 ** 12
+HALF_SPACE = 10 ** 6
+
+def _weighted_tables(weights):
+    """Soma ponderada de cada grupo de 3 dígitos da base, para todos os 1000 valores do grupo"""
+    tables = []
+    for group in range(4):
+        w0, w1, w2 = weights[3 * group:3 * group + 3]
+        tables.append([(v // 100) * w0 + (v // 10 % 10) * w1 + (v % 10) * w2 for v in range(1000)])
+    return tables
+
+# Tabelas pré-calculadas: a soma ponderada de uma base vira 4 consultas em vez de 12 multiplicações
+FIRST_TABLES = _weighted_tables(FIRST_WEIGHTS)
+SECOND_TABLES = _weighted_tables(SECOND_WEIGHTS)
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """numpy importado só no primeiro lote: importar o pacote continua rápido"""
+    try:
+        import numpy
+    except ImportError:  # numpy é opcional: sem ele o lote é calculado em Python puro
+        return None
+    return numpy
+
+def generate_cnpj(rng=random):
+    """Gera um CNPJ válido"""
+    def calc_digit(cnpj, weights):
+        total = sum(int(cnpj[i]) * weights[i] for i in range(len(weights)))
+        remainder = total % 11
+        return 0 if remainder < 2 else 11 - remainder
+
+    # Gera os primeiros 12 dígitos
+    cnpj = [rng.randint(0, 9) for _ in range(12)]
+
+    # Calcula os dois dígitos verificadores
+    first_digit = calc_digit(cnpj, FIRST_WEIGHTS)
+    cnpj.append(first_digit)
+
+    second_digit = calc_digit(cnpj, SECOND_WEIGHTS)
+    cnpj.append(second_digit)
+
+    # Formata o CNPJ
+    return f"{cnpj[0]}{cnpj[1]}.{cnpj[2]}{cnpj[3]}{cnpj[4]}.{cnpj[5]}{cnpj[6]}{cnpj[7]}/{cnpj[8]}{cnpj[9]}{cnpj[10]}{cnpj[11]}-{cnpj[12]}{cnpj[13]}"
+
+def cnpj_key(rng=random):
+    """Sorteia a chave da permutação que espalha os índices pelo espaço de bases"""
+    def multiplier():
+        # Coprimo com 10^12 (ímpar e não múltiplo de 5) para a multiplicação ser inversível
+        value = rng.randrange(BASE_SPACE)
+        while value % 2 == 0 or value % 5 == 0:
+            value = rng.randrange(BASE_SPACE)
+        return value
+
+    return (multiplier(), rng.randrange(BASE_SPACE), multiplier(), rng.randrange(BASE_SPACE))
+
+def _multiply(base, multiplier):
+    """base * multiplier mod 10^12 sem passar de 10^18 (cabe em int64)"""
+    high, low = divmod(multiplier, HALF_SPACE)
+    return (base * low + base * high % HALF_SPACE * HALF_SPACE) % BASE_SPACE
+
+def _permute(base, key):
+    """Bijeção de [0, 10^12): afim, troca das metades de 6 dígitos e afim de novo"""
+    first_multiplier, first_offset, second_multiplier, second_offset = key
+    base = (_multiply(base, first_multiplier) + first_offset) % BASE_SPACE
+    base = base % HALF_SPACE * HALF_SPACE + base // HALF_SPACE
+    return (_multiply(base, second_multiplier) + second_offset) % BASE_SPACE
+
+def _check_digit(total):
+    remainder = total % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+def format_cnpj(number):
+    """Formata um CNPJ de 14 dígitos (inteiro) como 00.000.000/0000-00"""
+    digits = f"{number:014d}"
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+def cnpj_numbers(bases):
+    """Acrescenta os dígitos verificadores a uma sequência de bases de 12 dígitos"""
+    np = _numpy()
+    if np is not None:
+        bases = np.asarray(bases, dtype=np.int64)
+        groups = [bases // 10 ** 9, bases // 10 ** 6 % 1000, bases // 1000 % 1000, bases % 1000]
+        first_total = sum(np.asarray(table, dtype=np.int64)[group] for table, group in zip(FIRST_TABLES, groups))
+        first = first_total % 11
+        first = np.where(first < 2, 0, 11 - first)
+        second_total = sum(np.asarray(table, dtype=np.int64)[group] for table, group in zip(SECOND_TABLES, groups))
+        second = (second_total + first * SECOND_WEIGHTS[12]) % 11
+        second = np.where(second < 2, 0, 11 - second)
+        return (bases * 100 + first * 10 + second).tolist()
+
+    first_0, first_1, first_2, first_3 = FIRST_TABLES
+    second_0, second_1, second_2, second_3 = SECOND_TABLES
+    numbers = []
+    for base in bases:
+        high, low = divmod(base, HALF_SPACE)
+        g0, g1 = divmod(high, 1000)
+        g2, g3 = divmod(low, 1000)
+        first = _check_digit(first_0[g0] + first_1[g1] + first_2[g2] + first_3[g3])
+        second = _check_digit(second_0[g0] + second_1[g1] + second_2[g2] + second_3[g3] + first * SECOND_WEIGHTS[12])
+        numbers.append(base * 100 + first * 10 + second)
+    return numbers
+
+def cnpjs_for_indices(indices, key):
+    """CNPJs válidos para índices de cliente: índices distintos sempre dão CNPJs distintos"""
+    np = _numpy()
+    if np is not None:
+        bases = _permute(np.asarray(indices, dtype=np.int64), key)
+    else:
+        bases = [_permute(index, key) for index in indices]
+    return [format_cnpj(number) for number in cnpj_numbers(bases)]
+
+def generate_cnpjs(count, rng=random, first_index=0):
+    """Gera `count` CNPJs válidos e distintos de uma vez"""
+    if first_index + count > BASE_SPACE:
+        raise ValueError(f"No máximo {BASE_SPACE:,} CNPJs distintos")
+    np = _numpy()
+    if np is not None:
+        indices = np.arange(first_index, first_index + count, dtype=np.int64)
+    else:
+        indices = range(first_index, first_index + count)
+    return cnpjs_for_indices(indices, cnpj_key(rng))
+
+def is_valid_cnpj(cnpj):
+    """Confere os dígitos verificadores de um CNPJ (formatado ou só dígitos)"""
+    digits = [int(char) for char in cnpj if char.isdigit()]
+    if len(digits) != 14:
+        return False
+    first = _check_digit(sum(digit * weight for digit, weight in zip(digits, FIRST_WEIGHTS)))
+    second = _check_digit(sum(digit * weight for digit, weight in zip(digits, SECOND_WEIGHTS)))
+    return digits[12] == first and digits[13] == second
@@ -0,0 +1,754 @@
+import copy
+import hashlib
+import json
+import random
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+
+from backup_generator.cnpj import (
+    BASE_SPACE, cnpj_key, cnpj_numbers, cnpjs_for_indices, format_cnpj, generate_cnpj, generate_cnpjs, is_valid_cnpj,
+)
+from backup_generator.reference import reference_tables
+from backup_generator.sampling import CategoricalSampler, client_samplers, resolve_weights
+from backup_generator.text_output import COMPRESSIONS
+
+def derive_seed(seed, *parts):
+    """Deriva uma semente de 64 bits estável a partir da semente mestre"""
+    key = ":".join(str(part) for part in (seed,) + parts)
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+
+def client_random(seed, *parts):
+    """Cria um gerador random.Random próprio, derivado da semente mestre"""
+    return random.Random(derive_seed(seed, *parts))
+
+def generate_phone(state, rng=random, samplers=None):
+    """Gera um telefone baseado no estado (DDD com os pesos dos samplers, se informados)"""
+    if samplers is None:
+        area_code = rng.choice(reference_tables()["area_codes"].get(state, ["11"]))
+    else:
+        sampler = samplers.area_codes.get(state)
+        area_code = "11" if sampler is None else sampler.draw(rng)
+    number = f"{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+    return f"({area_code}) {number}"
+
+def generate_clients(num_clients=500, seed=None, first_index=0, unique_cnpj=True, population=None):
+    """Gera lista de clientes; com unique_cnpj=False, o CNPJ sai do gerador de cada cliente (saída de antes)"""
+    clients = []
+    cnpjs = None
+    if unique_cnpj:
+        # CNPJs em lote pelo índice do cliente: distintos entre si, inclusive entre shards
+        key = cnpj_key(random if seed is None else client_random(seed, "cnpj"))
+        cnpjs = cnpjs_for_indices(range(first_index, first_index + num_clients), key)
+    
+    for i in range(first_index, first_index + num_clients):
+        # Com semente mestre, cada cliente tem seu próprio gerador (independente da ordem)
+        rng = random if seed is None else client_random(seed, "client", i)
+        clients.append(generate_client(i, rng, None if cnpjs is None else cnpjs[i - first_index], population))
+    
+    return clients
+
+def generate_client(index, rng=random, cnpj=None, population=None):
+    """Gera os dados de um único cliente"""
+    if population is None:
+        population = DEFAULT_SCENARIO["clients"]
+    
+    if population["weights"] is None:
+        # Sorteios de referência (uniformes): a mesma semente continua dando os mesmos clientes
+        samplers = None
+        tables = reference_tables()
+        state = rng.choice(tables["states"])
+        city = rng.choice(tables["cities_by_state"][state])
+        company_name = rng.choice(tables["company_names"])
+        suffix = rng.choice(tables["company_suffixes"])
+    else:
+        samplers = client_samplers(population["weights"])
+        state = samplers.states.draw(rng)
+        city = samplers.cities[state].draw(rng)
+        company_name = samplers.company_names.draw(rng)
+        suffix = samplers.company_suffixes.draw(rng)
+    full_name = f"{company_name} {suffix}"
+    
+    # Gerar dados do cliente
+    client_id = f"clt_{index+1:03d}"
+    if cnpj is None:
+        cnpj = generate_cnpj(rng)
+    email = f"contato@{company_name.lower().replace(' ', '')}.com.br"
+    phone = generate_phone(state, rng, samplers)
+    address = f"{city} - {state}"
+    
+    # Status pela distribuição do cenário (padrão: 80% ativos, 10% inativos, 10% pendentes)
+    status_rand = rng.random()
+    statuses = list(population["status_mix"].items())
+    status = statuses[-1][0]
+    threshold = 0.0
+    for candidate, share in statuses[:-1]:
+        threshold += share
+        if status_rand < threshold:
+            status = candidate
+            break
+    
+    # Taxa de sucesso baseada no status
+    success_rate = rng.uniform(*population["success_rate"][status])
+    
+    # Tamanho médio de backup
+    avg_size = rng.uniform(*population["avg_size_gb"])
+    
+    return {
+        "id": client_id,
+        "name": full_name,
+        "cnpj": cnpj,
+        "email": email,
+        "phone": phone,
+        "address": address,
+        "status": status,
+        "avg_size": round(avg_size, 2),
+        "success_rate": round(success_rate, 2)
+    }
+
+# Clientes por bloco no sorteio em lote: cada bloco tem seu gerador, então a população não depende dos shards
+POPULATION_BLOCK = 4096
+
+def generate_client_population(num_clients=500, seed=None, first_index=0, unique_cnpj=True, population=None):
+    """Gera os clientes em lote (numpy) com os amostradores de clients.weights: os campos de generate_client
+
+    Com semente, os índices são sorteados em blocos de POPULATION_BLOCK com geradores próprios: a fatia de um
+    shard é a mesma fatia da população inteira.
+    """
+    try:
+        import numpy as np
+    except ImportError:  # numpy é opcional: só o sorteio em lote depende dele
+        raise RuntimeError('clients.sampling "batch" requer numpy (pip install numpy)') from None
+    if population is None:
+        population = DEFAULT_SCENARIO["clients"]
+    if num_clients <= 0:
+        return []
+    
+    if seed is None:
+        offset = 0
+        draws = _draw_population(num_clients, np.random.default_rng(), population, np)
+    else:
+        first_block = first_index // POPULATION_BLOCK
+        last_block = (first_index + num_clients - 1) // POPULATION_BLOCK
+        blocks = [
+            _draw_population(POPULATION_BLOCK, np.random.default_rng(derive_seed(seed, "population", block)), population, np)
+            for block in range(first_block, last_block + 1)
+        ]
+        offset = first_index - first_block * POPULATION_BLOCK
+        draws = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+    draws = {name: column[offset:offset + num_clients].tolist() for name, column in draws.items()}
+    
+    if unique_cnpj:
+        key = cnpj_key(random if seed is None else client_random(seed, "cnpj"))
+        cnpjs = cnpjs_for_indices(range(first_index, first_index + num_clients), key)
+    else:
+        cnpjs = [format_cnpj(number) for number in cnpj_numbers(draws["cnpj_base"])]
+    
+    tables = reference_tables()
+    names = tables["company_names"]
+    emails = [f"contato@{name.lower().replace(' ', '')}.com.br" for name in names]
+    suffixes = tables["company_suffixes"]
+    statuses = list(population["status_mix"])
+    return [
+        {
+            "id": f"clt_{index + 1:03d}",
+            "name": f"{names[name]} {suffixes[suffix]}",
+            "cnpj": cnpj,
+            "email": emails[name],
+            "phone": f"({area_code}) {phone_high}-{phone_low}",
+            "address": f"{city} - {state}",
+            "status": statuses[status],
+            "avg_size": avg_size,
+            "success_rate": success_rate,
+        }
+        for index, name, suffix, cnpj, area_code, phone_high, phone_low, city, state, status, avg_size, success_rate in zip(
+            range(first_index, first_index + num_clients), draws["name"], draws["suffix"], cnpjs, draws["area_code"],
+            draws["phone_high"], draws["phone_low"], draws["city"], draws["state"], draws["status"], draws["avg_size"],
+            draws["success_rate"]
+        )
+    ]
+
+def _draw_population(count, generator, population, np):
+    """Sorteia `count` clientes em colunas: cada campo é um único sorteio vetorizado (cidade e DDD por UF)"""
+    samplers = client_samplers(population["weights"])
+    tables = reference_tables()
+    states = samplers.states.draw_indices(generator, count)
+    cities = np.empty(count, dtype=object)
+    area_codes = np.empty(count, dtype=object)
+    for position, state in enumerate(tables["states"]):
+        mask = states == position
+        selected = int(mask.sum())
+        if selected:
+            sampler = samplers.cities[state]
+            cities[mask] = np.array(sampler.values, dtype=object)[sampler.draw_indices(generator, selected)]
+            sampler = samplers.area_codes[state]
+            area_codes[mask] = np.array(sampler.values, dtype=object)[sampler.draw_indices(generator, selected)]
+    
+    status_mix = population["status_mix"]
+    status = CategoricalSampler(list(status_mix), list(status_mix.values())).draw_indices(generator, count)
+    ranges = np.array([population["success_rate"][name] for name in status_mix], dtype=np.float64)
+    phones = generator.integers(1000, 10000, (2, count))
+    return {
+        "state": np.array(tables["states"], dtype=object)[states],
+        "city": cities,
+        "area_code": area_codes,
+        "name": samplers.company_names.draw_indices(generator, count),
+        "suffix": samplers.company_suffixes.draw_indices(generator, count),
+        "cnpj_base": generator.integers(0, BASE_SPACE, count),
+        "phone_high": phones[0],
+        "phone_low": phones[1],
+        "status": status,
+        "success_rate": np.round(generator.uniform(ranges[status, 0], ranges[status, 1]), 2),
+        "avg_size": np.round(generator.uniform(*population["avg_size_gb"], count), 2),
+    }
+
+def generate_backup_data(clients, backups_per_client=400, seed=None, history_days=400, scenario=None):
+    """Gera dados de backup para todos os clientes"""
+    return list(iter_backup_data(clients, backups_per_client, seed, history_days, scenario))
+
+def iter_backup_data(clients, backups_per_client=400, seed=None, history_days=400, scenario=None):
+    """Gera os backups cliente a cliente, sem acumular a lista completa em memória"""
+    values = iter_backup_values(clients, backups_per_client, seed, history_days, scenario)
+    id_digits = (scenario or DEFAULT_SCENARIO)["output"]["backup_id_digits"]
+    for backup_id, (client_index, *backup) in enumerate(values, 1):
+        yield format_backup(backup_id, clients[client_index], *backup, id_digits=id_digits)
+
+def iter_backup_values(clients, backups_per_client=400, seed=None, history_days=400, scenario=None):
+    """Gera os backups como tuplas (índice do cliente, época, sucesso, duração em segundos, tamanho em GB)"""
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    
+    # Data de início (padrão: 400 dias atrás para ter 400 backups por cliente)
+    start_date = scenario["start_date"]
+    start_epoch = epoch_seconds(start_date)
+    
+    for client_index, client in enumerate(clients):
+        schedule = client_schedule(client, scenario)
+        step = FREQUENCY_DAYS[schedule["frequency"]]
+        interval = timedelta(days=step)
+        current_date = start_date
+        day_start = start_epoch
+        rng = random if seed is None else client_random(seed, "backups", client["id"])
+        
+        # Cliente inativo para de fazer backup antes (padrão: na metade do histórico)
+        end_date_client = start_date + timedelta(days=client_last_day(client, scenario, history_days))
+        
+        # Séries temporais (rajadas de falha, crescimento, sazonalidade) só quando a agenda as configura
+        modeled = schedule_is_modeled(schedule)
+        if modeled:
+            size_factors, failure_factors = day_factors(schedule, start_date, history_days + 1)
+            failed_before = False
+        
+        day = 0
+        backup_count = 0
+        while current_date <= end_date_client and backup_count < backups_per_client:
+            # Pular fins de semana para alguns clientes (padrão: 10% dos dias)
+            if rng.random() < schedule["weekend_skip"] and current_date.weekday() >= 5:
+                current_date += interval
+                day_start += 86400 * step
+                day += step
+                continue
+            
+            if modeled:
+                failure = failure_probability(client, schedule, failure_factors[day], failed_before)
+                backup = draw_backup_values(client, day_start, rng, schedule, failure, size_factors[day])
+                failed_before = not backup[1]
+                yield (client_index,) + backup
+            else:
+                yield (client_index,) + draw_backup_values(client, day_start, rng, schedule)
+            
+            backup_count += 1
+            
+            # Próximo backup (diário ou semanal)
+            current_date += interval
+            day_start += 86400 * step
+            day += step
+
+EPOCH = datetime(1970, 1, 1)
+
+def epoch_seconds(moment):
+    """Segundos desde 1970-01-01 de uma data sem fuso"""
+    return (moment - EPOCH) // timedelta(seconds=1)
+
+def draw_backup(client, current_date, backup_id, rng=random, schedule=None):
+    """Sorteia horário, status, duração e tamanho de um backup do cliente no dia informado"""
+    return format_backup(backup_id, client, *draw_backup_values(client, epoch_seconds(current_date), rng, schedule))
+
+def draw_backup_values(client, day_start, rng=random, schedule=None, failure=None, size_factor=1.0):
+    """Sorteia um backup do dia (em segundos desde a época) sem formatar: (época, sucesso, duração, tamanho)"""
+    if schedule is None:
+        schedule = DEFAULT_SCHEDULE
+    
+    # Gerar horário de backup: cascata de faixas (padrão: 70% às 23h, 27% de madrugada, 3% à tarde)
+    *windows, fallback = schedule["hours"]
+    for window in windows:
+        if rng.random() < window["probability"]:
+            hour = rng.randint(*window["hours"])
+            break
+    else:
+        hour = rng.randint(*fallback["hours"])
+    
+    minute = rng.randint(0, 59)
+    timestamp = day_start + hour * 3600 + minute * 60
+    
+    # Determinar se o backup foi bem-sucedido (com os modelos de série, pela chance de falha do dia)
+    if failure is None:
+        is_success = rng.random() < client["success_rate"]
+    else:
+        is_success = rng.random() >= failure
+    
+    if is_success:
+        # Tamanho baseado na média do cliente com variação (e no crescimento/sazonalidade do dia)
+        size_variation = rng.uniform(*schedule["size_variation"])
+        size_gb = round(client["avg_size"] * size_variation * size_factor, 2)
+        duration_minutes = rng.randint(*schedule["duration_minutes"]["success"])
+    else:
+        size_gb = 0.0
+        duration_minutes = rng.randint(*schedule["duration_minutes"]["failed"])
+    
+    return timestamp, is_success, duration_minutes * 60 + rng.randint(0, 59), size_gb
+
+def schedule_is_modeled(schedule):
+    """Se a agenda usa algum modelo de série temporal além dos sorteios independentes"""
+    season = schedule["seasonality"]
+    return (
+        schedule["failures"]["model"] != "independent"
+        or schedule["size_growth"]["model"] != "none"
+        or season["month_end_days"] > 0
+        or any(factor != 1 for factor in season["weekday_size"])
+    )
+
+def day_factors(schedule, start_date, num_days):
+    """Multiplicadores de tamanho e da chance de falha para cada dia do histórico"""
+    growth = schedule["size_growth"]
+    season = schedule["seasonality"]
+    size_factors = []
+    failure_factors = []
+    for day in range(num_days):
+        moment = start_date + timedelta(days=day)
+        years = day / 365
+        if growth["model"] == "linear":
+            size = 1 + growth["rate"] * years
+        elif growth["model"] == "exponential":
+            size = (1 + growth["rate"]) ** years
+        else:
+            size = 1.0
+        size *= season["weekday_size"][moment.weekday()]
+        
+        # Fechamento do mês: os últimos dias do mês têm backups maiores e falham mais
+        # (o dia está entre os month_end_days últimos se somar month_end_days já cai em outro mês)
+        failure = 1.0
+        later = moment + timedelta(days=season["month_end_days"])
+        if (later.year, later.month) != (moment.year, moment.month):
+            size *= season["month_end_size"]
+            failure = season["month_end_failure"]
+        size_factors.append(size)
+        failure_factors.append(failure)
+    return size_factors, failure_factors
+
+def failure_probability(client, schedule, factor, failed_before):
+    """Chance de falha do próximo backup: independente ou pela cadeia de Markov de rajadas"""
+    failure = min(1.0, (1 - client["success_rate"]) * factor)
+    if schedule["failures"]["model"] != "markov":
+        return failure
+    
+    # Duas situações (ok/falhando): uma rajada dura em média burst_days backups e a fração
+    # de falhas a longo prazo continua sendo a do cliente
+    burst_days = schedule["failures"]["burst_days"]
+    if failed_before:
+        return 1 - 1 / burst_days
+    if failure >= 1:
+        return 1.0
+    return min(1.0, failure / (burst_days * (1 - failure)))
+
+# Colunas do backup.csv, na ordem das linhas de format_backup
+BACKUP_FIELDNAMES = ['backup_id', 'client_id', 'client_name', 'date', 'status', 'duration', 'size']
+
+def format_backup(backup_id, client, timestamp, success, duration_seconds, size_gb, id_digits=6):
+    """Formata um backup como a linha de dicionário dos CSVs (só na saída)"""
+    minutes, seconds = divmod(duration_seconds, 60)
+    return {
+        "backup_id": f"bkp_{backup_id:0{id_digits}d}",
+        "client_id": client["id"],
+        "client_name": client["name"],
+        "date": (EPOCH + timedelta(seconds=timestamp)).strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "success" if success else "failed",
+        "duration": f"{minutes:02d}:{seconds:02d}",
+        "size": f"{size_gb} GB"
+    }
+
+# Data de entrada fixa dos clientes no clients.csv e no CSV de upload
+JOIN_DATE = '2023-01-15'
+
+def compute_client_stats(backup_data):
+    """Calcula as estatísticas de backup de cada cliente"""
+    client_stats = {}
+    for backup in backup_data:
+        update_client_stats(client_stats, backup)
+    
+    return client_stats
+
+def update_client_stats(client_stats, backup):
+    """Acumula um backup nas estatísticas do seu cliente"""
+    client_id = backup['client_id']
+    if client_id not in client_stats:
+        client_stats[client_id] = {
+            'total_backups': 0,
+            'successful_backups': 0,
+            'failed_backups': 0,
+            'last_backup_date': backup['date']
+        }
+    
+    client_stats[client_id]['total_backups'] += 1
+    if backup['status'] == 'success':
+        client_stats[client_id]['successful_backups'] += 1
+    else:
+        client_stats[client_id]['failed_backups'] += 1
+    
+    # Atualizar última data de backup
+    if backup['date'] > client_stats[client_id]['last_backup_date']:
+        client_stats[client_id]['last_backup_date'] = backup['date']
+
+def build_clients_with_stats(clients, client_stats, scenario=None):
+    """Combina os dados dos clientes com as estatísticas de backup"""
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    clients_with_stats = []
+    for client in clients:
+        stats = client_stats.get(client['id'], {
+            'total_backups': 0,
+            'successful_backups': 0,
+            'failed_backups': 0,
+            'last_backup_date': 'N/A'
+        })
+        
+        clients_with_stats.append({
+            'client_id': client['id'],
+            'name': client['name'],
+            'cnpj': client['cnpj'],
+            'email': client['email'],
+            'phone': client['phone'],
+            'address': client['address'],
+            'status': client['status'],
+            'join_date': JOIN_DATE,
+            'logo': 'https://api.placeholder.com/40/40',
+            'backup_frequency': client_schedule(client, scenario)['frequency'],
+            'backup_retention_days': 30,
+            'last_backup_date': stats['last_backup_date'],
+            'total_backups': stats['total_backups'],
+            'successful_backups': stats['successful_backups'],
+            'failed_backups': stats['failed_backups'],
+            'avg_backup_size_gb': client['avg_size']
+        })
+    
+    return clients_with_stats
+
+# Formatos colunares gerados ao lado do backup.csv (extensão de cada arquivo)
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow', 'npz': '.npz'}
+
+# Dumps para carga direta no banco do backend (tabelas cliente e backup): nome da saída no diretório
+DATABASE_OUTPUTS = {'postgres': 'postgres', 'postgres-binary': 'postgres_binary', 'sqlite': 'backup.sqlite'}
+
+# Modos de sorteio dos clientes (clients.sampling)
+SAMPLING_MODES = ("reference", "batch")
+
+# Particionamento do backup.csv em backup_partitions/ (ver backup_generator.partitions)
+PARTITION_MODES = ("month",)
+
+# Valores padrão dos arquivos de cenário (YAML/JSON): o comportamento histórico do gerador
+SCHEDULE_DEFAULTS = {
+    # Filtros opcionais: cada cliente usa a primeira agenda cujos client_id/status o incluem
+    "clients": None,
+    "statuses": None,
+    "frequency": "daily",
+    # Probabilidade de pular cada backup agendado para um fim de semana
+    "weekend_skip": 0.1,
+    # Cascata de faixas de horário (inclusivas): cada faixa é sorteada com a sua probabilidade
+    # entre as que sobraram; a última faixa fica com o restante e não leva probabilidade
+    "hours": [
+        {"probability": 0.7, "hours": [23, 23]},
+        {"probability": 0.9, "hours": [1, 3]},
+        {"hours": [22, 23]},
+    ],
+    "duration_minutes": {"success": [5, 20], "failed": [1, 5]},
+    "size_variation": [0.8, 1.2],
+    # Falhas independentes ou em rajadas (cadeia de Markov com duração média de burst_days backups)
+    "failures": {"model": "independent", "burst_days": 3.0},
+    # Crescimento do tamanho dos backups: none, linear ou exponential, com rate = crescimento por ano
+    "size_growth": {"model": "none", "rate": 0.0},
+    # Sazonalidade: multiplicador de tamanho por dia da semana (seg a dom) e pico de fechamento do mês
+    "seasonality": {"weekday_size": [1, 1, 1, 1, 1, 1, 1], "month_end_days": 0, "month_end_size": 1.0, "month_end_failure": 1.0},
+}
+
+SCENARIO_DEFAULTS = {
+    "name": "padrão",
+    "seed": None,
+    "clients": {
+        "count": 500,
+        # Lista fixa de clientes (campos de generate_client) no lugar dos sorteados
+        "list": None,
+        # CNPJs em lote (generate_cnpjs), distintos entre si; false volta ao sorteio cliente a cliente, que pode repetir
+        "unique_cnpj": True,
+        # Troca os CNPJs com dígitos verificadores inválidos da lista fixa
+        "valid_cnpj": False,
+        "status_mix": {"active": 0.8, "inactive": 0.1, "pending": 0.1},
+        "success_rate": {"active": [0.75, 0.95], "inactive": [0.30, 0.60], "pending": [0.50, 0.70]},
+        "avg_size_gb": [0.5, 5.0],
+        # Pesos de estados, cidades e DDDs: null (uniforme), "population" (reais) ou {states, cities, area_codes}
+        "weights": None,
+        # reference: um gerador por cliente (os sorteios de sempre); batch: a população inteira em lote (numpy)
+        "sampling": "reference",
+    },
+    "dates": {
+        "start": "2023-01-01",
+        # Dias de histórico; ou "end" com a data final (inclusiva)
+        "days": 400,
+        "end": None,
+        # Dia (número de dias ou data) em que os inativos param; padrão: metade do histórico
+        "inactive_stop": None,
+    },
+    # Máximo de backups por cliente; null para não limitar
+    "backups_per_client": 400,
+    "schedules": [{}],
+    "output": {
+        "dir": "data",
+        "engine": "dict",
+        "stream": False,
+        "chunk_size": 500000,
+        "workers": 1,
+        "formats": [],
+        "aggregates": False,
+        # Dígitos do número no backup_id (bkp_000001); o extended.json usa 4, como o generate_extended_data.py
+        "backup_id_digits": 6,
+        # Dumps do banco do backend: postgres (COPY texto), postgres-binary (COPY binário) e sqlite
+        "databases": [],
+        # Compressão do clients.csv e do backup.csv: null, gzip ou zstd (.gz/.zst no nome)
+        "compression": None,
+        # Backups em partições mensais (backup_partitions/ com manifest.json) no lugar do backup.csv único
+        "partition": None,
+        # Baldes de cliente por mês (crc32 do client_id); 1 = só por mês
+        "client_buckets": 1,
+        # Só o CSV de upload (schema CsvRow, backups em JSON por cliente), em streaming
+        "upload": False,
+    },
+}
+
+FREQUENCY_DAYS = {"daily": 1, "weekly": 7}
+FAILURE_MODELS = ("independent", "markov")
+GROWTH_MODELS = ("none", "linear", "exponential")
+
+def load_scenario(filename):
+    """Lê um arquivo de cenário (.yaml/.yml ou .json) e o completa com os valores padrão"""
+    with open(filename, encoding='utf-8') as scenario_file:
+        if filename.endswith(('.yaml', '.yml')):
+            # PyYAML é opcional e importado só aqui: importar o pacote não paga o custo dele
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("Cenários em YAML requerem PyYAML (pip install pyyaml)") from None
+            raw = yaml.safe_load(scenario_file) or {}
+        else:
+            raw = json.load(scenario_file)
+    return normalize_scenario(raw)
+
+def normalize_scenario(raw):
+    """Completa um cenário com os valores padrão, valida os campos e resolve as datas"""
+    _check_keys(raw, SCENARIO_DEFAULTS, "cenário")
+    clients = _scenario_section(raw, "clients")
+    dates = _scenario_section(raw, "dates")
+    output = _scenario_section(raw, "output")
+    
+    start_date = _parse_day(dates["start"])
+    if dates["end"] is not None:
+        if "days" in (raw.get("dates") or {}):
+            raise ValueError("Use dates.days ou dates.end, não os dois")
+        days = (_parse_day(dates["end"]) - start_date).days
+    else:
+        days = int(dates["days"])
+    if days < 0:
+        raise ValueError("O histórico do cenário termina antes de começar")
+    
+    inactive_stop = dates["inactive_stop"]
+    if inactive_stop is not None and not isinstance(inactive_stop, int):
+        inactive_stop = (_parse_day(inactive_stop) - start_date).days
+    
+    if clients["list"] is not None:
+        clients["list"] = [_fixed_client(client) for client in clients["list"]]
+        if "count" not in (raw.get("clients") or {}):
+            clients["count"] = len(clients["list"])
+    if abs(sum(clients["status_mix"].values()) - 1) > 1e-9:
+        raise ValueError("clients.status_mix deve somar 1")
+    missing = [status for status in clients["status_mix"] if status not in clients["success_rate"]]
+    if missing:
+        raise ValueError(f"clients.success_rate sem faixa para: {', '.join(missing)}")
+    if clients["sampling"] not in SAMPLING_MODES:
+        raise ValueError(f"clients.sampling desconhecido: {clients['sampling']} (use {', '.join(SAMPLING_MODES)})")
+    resolve_weights(clients["weights"])
+    
+    schedules = [_normalize_schedule(schedule) for schedule in raw.get("schedules") or [{}]]
+    if schedules[-1]["clients"] is not None or schedules[-1]["statuses"] is not None:
+        schedules.append(_normalize_schedule({}))  # quem não casar com nenhum filtro usa a agenda padrão
+    
+    if output["engine"] not in ("dict", "numpy"):
+        raise ValueError(f"output.engine desconhecido: {output['engine']}")
+    for fmt in output["formats"]:
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"formato desconhecido: {fmt}")
+    for database in output["databases"]:
+        if database not in DATABASE_OUTPUTS:
+            raise ValueError(f"dump de banco desconhecido: {database} (use {', '.join(DATABASE_OUTPUTS)})")
+    if output["workers"] < 1:
+        raise ValueError("output.workers deve ser pelo menos 1")
+    if not isinstance(output["backup_id_digits"], int) or output["backup_id_digits"] < 1:
+        raise ValueError("output.backup_id_digits deve ser um inteiro positivo")
+    if output["compression"] is not None and output["compression"] not in COMPRESSIONS:
+        raise ValueError(f"output.compression desconhecida: {output['compression']} (use {', '.join(COMPRESSIONS)})")
+    if output["partition"] is not None and output["partition"] not in PARTITION_MODES:
+        raise ValueError(f"output.partition desconhecido: {output['partition']} (use {', '.join(PARTITION_MODES)})")
+    if output["client_buckets"] < 1:
+        raise ValueError("output.client_buckets deve ser pelo menos 1")
+    if output["client_buckets"] > 1 and output["partition"] is None:
+        raise ValueError("output.client_buckets requer output.partition")
+    if output["upload"] and (output["formats"] or output["databases"] or output["aggregates"] or output["compression"]
+                             or output["partition"]):
+        raise ValueError("output.upload gera só o upload.csv: não combina com formats, databases, aggregates, compression "
+                         "ou partition")
+    
+    backups_per_client = raw.get("backups_per_client", SCENARIO_DEFAULTS["backups_per_client"])
+    return {
+        "name": raw.get("name", SCENARIO_DEFAULTS["name"]),
+        "seed": raw.get("seed"),
+        "clients": clients,
+        "start_date": start_date,
+        "days": days,
+        "inactive_stop_day": inactive_stop,
+        "backups_per_client": days + 1 if backups_per_client is None else backups_per_client,
+        "schedules": schedules,
+        "output": output,
+    }
+
+def _check_keys(section, defaults, name):
+    unknown = sorted(set(section) - set(defaults))
+    if unknown:
+        raise ValueError(f"Campos desconhecidos em {name}: {', '.join(unknown)}")
+
+def _scenario_section(raw, name):
+    """Seção do cenário sobre uma cópia dos valores padrão"""
+    section = raw.get(name) or {}
+    _check_keys(section, SCENARIO_DEFAULTS[name], name)
+    return dict(copy.deepcopy(SCENARIO_DEFAULTS[name]), **section)
+
+def _parse_day(value):
+    """Aceita AAAA-MM-DD em texto ou a data já convertida pelo YAML"""
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.strptime(str(value), "%Y-%m-%d")
+
+def _normalize_schedule(raw):
+    _check_keys(raw, SCHEDULE_DEFAULTS, "schedules")
+    schedule = dict(copy.deepcopy(SCHEDULE_DEFAULTS), **raw)
+    for section in ("duration_minutes", "failures", "size_growth", "seasonality"):
+        _check_keys(raw.get(section, {}), SCHEDULE_DEFAULTS[section], f"schedules.{section}")
+        schedule[section] = dict(copy.deepcopy(SCHEDULE_DEFAULTS[section]), **raw.get(section, {}))
+    if schedule["failures"]["model"] not in FAILURE_MODELS:
+        raise ValueError(f"Modelo de falhas desconhecido: {schedule['failures']['model']} (use {', '.join(FAILURE_MODELS)})")
+    if schedule["failures"]["burst_days"] < 1:
+        raise ValueError("schedules.failures.burst_days deve ser pelo menos 1")
+    if schedule["size_growth"]["model"] not in GROWTH_MODELS:
+        raise ValueError(f"Modelo de crescimento desconhecido: {schedule['size_growth']['model']} (use {', '.join(GROWTH_MODELS)})")
+    if len(schedule["seasonality"]["weekday_size"]) != 7:
+        raise ValueError("schedules.seasonality.weekday_size precisa de 7 valores (segunda a domingo)")
+    if schedule["frequency"] not in FREQUENCY_DAYS:
+        raise ValueError(f"Frequência desconhecida: {schedule['frequency']} (use {', '.join(FREQUENCY_DAYS)})")
+    *windows, fallback = schedule["hours"]
+    if "probability" in fallback or any("probability" not in window for window in windows):
+        raise ValueError("Em schedules.hours só a última faixa fica sem probabilidade")
+    for window in schedule["hours"]:
+        low, high = window["hours"]
+        if not 0 <= low <= high <= 23:
+            raise ValueError(f"Faixa de horas inválida: {window['hours']}")
+    for selector in ("clients", "statuses"):
+        if schedule[selector] is not None:
+            schedule[selector] = frozenset(schedule[selector])
+    return schedule
+
+def _fixed_client(client):
+    """Um cliente da lista fixa do cenário, com os campos opcionais em branco"""
+    missing = [field for field in ("id", "name", "status", "avg_size", "success_rate") if field not in client]
+    if missing:
+        raise ValueError(f"Cliente {client.get('id', '?')} sem os campos: {', '.join(missing)}")
+    return dict({"cnpj": "", "email": "", "phone": "", "address": ""}, **client)
+
+DEFAULT_SCENARIO = normalize_scenario({})
+DEFAULT_SCHEDULE = DEFAULT_SCENARIO["schedules"][0]
+
+def client_schedule(client, scenario=None):
+    """Agenda de backup do cliente: a primeira do cenário cujos filtros o incluem"""
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    for schedule in scenario["schedules"]:
+        if schedule["clients"] is not None and client["id"] not in schedule["clients"]:
+            continue
+        if schedule["statuses"] is not None and client["status"] not in schedule["statuses"]:
+            continue
+        return schedule
+    return scenario["schedules"][-1]
+
+def client_last_day(client, scenario, history_days):
+    """Último dia (a partir do início) com backup do cliente; inativos param antes"""
+    if client["status"] != "inactive":
+        return history_days
+    if scenario["inactive_stop_day"] is None:
+        return history_days // 2
+    return min(scenario["inactive_stop_day"], history_days)
+
+def with_valid_cnpjs(clients, rng=random):
+    """Troca os CNPJs com dígitos verificadores inválidos por CNPJs válidos e distintos"""
+    invalid_ids = {client['id'] for client in clients if not is_valid_cnpj(client['cnpj'])}
+    cnpjs = iter(generate_cnpjs(len(invalid_ids), rng))
+    return [dict(client, cnpj=next(cnpjs)) if client['id'] in invalid_ids else client for client in clients]
+
+def resolve_client_list(scenario, seed=None):
+    """Confere a lista fixa do cenário e, com valid_cnpj, troca nela os CNPJs inválidos"""
+    population = scenario["clients"]
+    if population["list"] is None:
+        return scenario
+    if population["count"] > len(population["list"]):
+        raise ValueError(f"O cenário lista só {len(population['list'])} clientes")
+    if not population["valid_cnpj"]:
+        return scenario
+    rng = random if seed is None else client_random(seed, "cnpj")
+    return dict(scenario, clients=dict(population, list=with_valid_cnpjs(population["list"], rng)))
+
+def scenario_clients(scenario, first_index=0, num_clients=None, seed=None, unique_cnpj=None):
+    """Clientes do cenário: uma fatia da lista fixa ou sorteados com as distribuições configuradas"""
+    population = scenario["clients"]
+    if num_clients is None:
+        num_clients = population["count"]
+    if population["list"] is not None:
+        return population["list"][first_index:first_index + num_clients]
+    if unique_cnpj is None:
+        unique_cnpj = population["unique_cnpj"]
+    if population["sampling"] == "batch":
+        return generate_client_population(num_clients, seed, first_index, unique_cnpj, population)
+    return generate_clients(num_clients, seed, first_index, unique_cnpj, population)
+
+def generate_dataset(scenario=None, seed=None):
+    """Gera clientes e backups de um cenário em memória, sem arquivos: (clientes com estatísticas, backups)
+
+    Mesmos sorteios do motor de referência (output.engine dict) do generate_large_dataset.py: com semente, as linhas
+    são as do clients.csv/backup.csv que ele escreveria. scenario pode vir no formato dos arquivos de cenário.
+    """
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    elif "start_date" not in scenario:
+        scenario = normalize_scenario(scenario)
+    if seed is None:
+        seed = scenario["seed"]
+    
+    scenario = resolve_client_list(scenario, seed)
+    clients = scenario_clients(scenario, seed=seed)
+    backups = generate_backup_data(clients, scenario["backups_per_client"], seed, scenario["days"], scenario)
+    client_stats = compute_client_stats(backups)
+    # Ordenação estável por data: empates ficam na ordem dos backup_id, como no backup.csv
+    backups.sort(key=itemgetter("date"))
+    return build_clients_with_stats(clients, client_stats, scenario), backups
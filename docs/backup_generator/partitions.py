@@ -0,0 +1,216 @@
+import csv
+import heapq
+import json
+import os
+import zlib
+from contextlib import ExitStack
+
+from backup_generator.core import BACKUP_FIELDNAMES
+from backup_generator.text_output import TextOutput, compressed_name, csv_line, open_text_input
+
+# Layout particionado: um arquivo por mês (e por balde de cliente) com o schema do backup.csv, mais o manifesto
+PARTITION_DIR = "backup_partitions"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def client_bucket(client_id, client_buckets):
+    """Balde do cliente: crc32 do client_id módulo o número de baldes (estável entre processos e execuções)"""
+    if client_buckets == 1:
+        return 0
+    return zlib.crc32(client_id.encode("utf-8")) % client_buckets
+
+def partition_name(month, bucket, client_buckets=1, compression=None):
+    """Caminho da partição, relativo ao diretório: 2024-01.csv ou 2024-01/bucket-003.csv"""
+    if client_buckets == 1:
+        return compressed_name(f"{month}.csv", compression)
+    return compressed_name(f"{month}/bucket-{bucket:03d}.csv", compression)
+
+class PartitionWriter:
+    """Recebe as linhas do backup.csv em ordem de data e as distribui em um arquivo por mês (e balde de cliente)
+
+    Como as linhas chegam ordenadas, só os arquivos do mês corrente ficam abertos; cada arquivo tem o cabeçalho
+    do backup.csv e as mesmas linhas (e backup_id) do arquivo único. Ao fechar, grava o manifesto com linhas,
+    datas e totais de sucesso/falha de cada partição.
+    """
+
+    def __init__(self, directory, client_buckets=1, compression=None):
+        if client_buckets < 1:
+            raise ValueError("client_buckets deve ser pelo menos 1")
+        self.directory = directory
+        self.client_buckets = client_buckets
+        self.compression = compression
+        self.partitions = []
+        self._month = None
+        self._outputs = {}
+        self._current = {}
+        self._buckets = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def files(self):
+        """Arquivos escritos (partições e manifesto), depois de close"""
+        return ([os.path.join(self.directory, partition["path"]) for partition in self.partitions]
+                + [os.path.join(self.directory, MANIFEST_NAME)])
+
+    def write(self, text):
+        self.writelines([text])
+
+    def writelines(self, lines):
+        client_buckets = self.client_buckets
+        buckets = self._buckets
+        for line in lines:
+            # Só o nome do cliente pode ter vírgulas (entre aspas): os 4 últimos campos e o início são fixos
+            head, moment, status, _, size = line.rsplit(",", 4)
+            if moment[:7] != self._month:
+                self._start_month(moment[:7])
+            if client_buckets == 1:
+                bucket = 0
+            else:
+                client_id = head.split(",", 2)[1]
+                bucket = buckets.get(client_id)
+                if bucket is None:
+                    bucket = buckets[client_id] = client_bucket(client_id, client_buckets)
+            partition = self._current.get(bucket)
+            if partition is None:
+                partition = self._open_partition(bucket, moment)
+            partition["rows"] += 1
+            partition["last_date"] = moment
+            if status == "success":
+                partition["successful"] += 1
+                partition["size_gb"] += float(size.split(" ", 1)[0])  # "1.94 GB\r\n"
+            else:
+                partition["failed"] += 1
+            self._outputs[bucket].write(line)
+
+    def _open_partition(self, bucket, moment):
+        name = partition_name(self._month, bucket, self.client_buckets, self.compression)
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        output = TextOutput(path)
+        output.write(csv_line(BACKUP_FIELDNAMES))
+        self._outputs[bucket] = output
+        partition = self._current[bucket] = {
+            "path": name,
+            "month": self._month,
+            "bucket": bucket,
+            "rows": 0,
+            "first_date": moment,
+            "last_date": moment,
+            "successful": 0,
+            "failed": 0,
+            "size_gb": 0.0,
+        }
+        return partition
+
+    def _start_month(self, month):
+        """Fecha as partições do mês anterior (as linhas estão em ordem de data: ele não volta)"""
+        if self._month is not None and month < self._month:
+            raise ValueError(f"Linhas fora de ordem de data: {month} depois de {self._month}")
+        self._close_month()
+        self._month = month
+
+    def _close_month(self):
+        with ExitStack() as stack:
+            for output in self._outputs.values():
+                stack.callback(output.close)
+        self.partitions.extend(self._current[bucket] for bucket in sorted(self._current))
+        self._outputs = {}
+        self._current = {}
+
+    def close(self):
+        """Fecha as últimas partições e grava o manifesto"""
+        self._close_month()
+        for partition in self.partitions:
+            partition["size_gb"] = round(partition["size_gb"], 2)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "partition_by": "month" if self.client_buckets == 1 else "month,client_bucket",
+            "client_buckets": self.client_buckets,
+            "bucket_hash": "crc32(client_id utf-8) % client_buckets",
+            "compression": self.compression,
+            "fieldnames": BACKUP_FIELDNAMES,
+            "rows": sum(partition["rows"] for partition in self.partitions),
+            "first_date": min((partition["first_date"] for partition in self.partitions), default=None),
+            "last_date": max((partition["last_date"] for partition in self.partitions), default=None),
+            "successful": sum(partition["successful"] for partition in self.partitions),
+            "failed": sum(partition["failed"] for partition in self.partitions),
+            "partitions": self.partitions,
+        }
+        tmp_path = os.path.join(self.directory, MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(tmp_path, os.path.join(self.directory, MANIFEST_NAME))
+        return manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_month()
+
+def manifest_path(path):
+    """Aceita o diretório das partições ou o próprio manifest.json"""
+    return os.path.join(path, MANIFEST_NAME) if os.path.isdir(path) else path
+
+def is_partitioned(path):
+    """Se o caminho é um diretório de partições (ou o manifesto de um)"""
+    return os.path.basename(manifest_path(path)) == MANIFEST_NAME and os.path.exists(manifest_path(path))
+
+def load_manifest(path):
+    """Lê o manifesto das partições (diretório ou caminho do manifest.json)"""
+    with open(manifest_path(path), encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Versão de manifesto não suportada: {manifest.get('version')}")
+    return manifest
+
+def select_partitions(manifest, since=None, until=None, client_ids=None):
+    """Partições que podem ter backups na janela [since, until] (AAAA-MM-DD, inclusivas) dos clientes informados"""
+    buckets = None
+    if client_ids is not None:
+        buckets = {client_bucket(client_id, manifest["client_buckets"]) for client_id in client_ids}
+    selected = []
+    for partition in manifest["partitions"]:
+        if since is not None and partition["last_date"][:len(since)] < since:
+            continue
+        if until is not None and partition["first_date"][:len(until)] > until:
+            continue
+        if buckets is not None and partition["bucket"] not in buckets:
+            continue
+        selected.append(partition)
+    return selected
+
+def iter_partition_rows(path, since=None, until=None, client_ids=None):
+    """Linhas (listas na ordem de BACKUP_FIELDNAMES) em ordem de data, lendo só as partições da janela
+
+    Os baldes de um mês são intercalados por (data, backup_id), a ordem do backup.csv único.
+    """
+    manifest = load_manifest(path)
+    directory = os.path.dirname(manifest_path(path))
+    wanted = None if client_ids is None else set(client_ids)
+    months = {}
+    for partition in select_partitions(manifest, since, until, client_ids):
+        months.setdefault(partition["month"], []).append(partition)
+
+    for month in sorted(months):
+        with ExitStack() as stack:
+            readers = []
+            for partition in months[month]:
+                reader = csv.reader(stack.enter_context(open_text_input(os.path.join(directory, partition["path"]))))
+                next(reader)  # cabeçalho
+                readers.append(reader)
+            rows = readers[0] if len(readers) == 1 else heapq.merge(*readers, key=_row_order)
+            for row in rows:
+                if since is not None and row[3][:len(since)] < since:
+                    continue
+                if until is not None and row[3][:len(until)] > until:
+                    break
+                if wanted is not None and row[1] not in wanted:
+                    continue
+                yield row
+
+def _row_order(row):
+    return row[3], int(row[0][4:])
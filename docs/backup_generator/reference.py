@@ -0,0 +1,19 @@
+import json
+import os
+from functools import lru_cache
+
+# Nomes de empresas, sufixos, estados, cidades por estado, DDDs e seus pesos populacionais, em JSON compacto ao lado do módulo
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference_data.json")
+
+@lru_cache(maxsize=None)
+def reference_tables():
+    """Tabelas de referência dos clientes, lidas do JSON uma única vez (no primeiro cliente gerado)"""
+    with open(REFERENCE_FILE, encoding="utf-8") as reference_file:
+        return json.load(reference_file)
+
+def __getattr__(name):
+    # reference.company_names, reference.states etc. também carregam as tabelas só no primeiro acesso
+    tables = reference_tables()
+    if name in tables:
+        return tables[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,119 @@
+import json
+import random
+from functools import lru_cache
+
+from backup_generator.reference import reference_tables
+
+# Tabelas com pesos configuráveis em clients.weights; "population" usa os pesos reais do reference_data.json
+WEIGHTED_TABLES = ("states", "cities", "area_codes")
+
+class CategoricalSampler:
+    """Sorteio de uma lista de valores com pesos, por tabela de alias (Vose): O(1) por sorteio, um a um ou em lote
+
+    Cada posição i da tabela guarda a probabilidade de ficar com i e o alias que a completa; um sorteio é uma
+    posição uniforme e um teste contra prob[i], sem busca binária na distribuição acumulada.
+    """
+
+    def __init__(self, values, weights=None):
+        self.values = list(values)
+        count = len(self.values)
+        if weights is None:
+            weights = [1.0] * count
+        total = float(sum(weights))
+        if count == 0 or len(weights) != count or total <= 0 or min(weights) < 0:
+            raise ValueError("Os pesos precisam ser um por valor, não negativos e com soma positiva")
+        scaled = [weight * count / total for weight in weights]
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Sobras de arredondamento ficam com probabilidade 1 (prob e alias já iniciados assim)
+        self._arrays = None
+
+    def draw(self, rng=random):
+        """Um valor, com o random.Random informado"""
+        index = int(rng.random() * len(self.values))
+        return self.values[index] if rng.random() < self.prob[index] else self.values[self.alias[index]]
+
+    def draw_indices(self, generator, size):
+        """Posições de `size` sorteios de uma vez, com um numpy.random.Generator"""
+        import numpy as np
+        if self._arrays is None:
+            self._arrays = np.array(self.prob), np.array(self.alias, dtype=np.int64)
+        prob, alias = self._arrays
+        index = generator.integers(0, len(self.values), size)
+        return np.where(generator.random(size) < prob[index], index, alias[index])
+
+class ClientSamplers:
+    """Amostradores das tabelas de referência dos clientes (estados, cidades, DDDs, nomes) com os pesos do cenário"""
+
+    def __init__(self, weights=None):
+        tables = reference_tables()
+        weights = resolve_weights(weights)
+        self.states = CategoricalSampler(tables["states"], _weights_for(weights["states"], tables["states"]))
+        self.cities = {
+            state: CategoricalSampler(cities, _weights_for(weights["cities"].get(state), cities))
+            for state, cities in tables["cities_by_state"].items()
+        }
+        self.area_codes = {
+            state: CategoricalSampler(codes, _weights_for(weights["area_codes"].get(state), codes))
+            for state, codes in tables["area_codes"].items()
+        }
+        self.company_names = CategoricalSampler(tables["company_names"])
+        self.company_suffixes = CategoricalSampler(tables["company_suffixes"])
+
+def _weights_for(weights, values):
+    return None if weights is None else [weights.get(value, 0.0) for value in values]
+
+def resolve_weights(weights=None):
+    """Pesos completos de clients.weights: None (uniforme), "population" ou um dict por tabela sobre os reais
+
+    No dict, states é {UF: peso}, cities e area_codes são {UF: {cidade ou DDD: peso}}; o que ele não traz
+    continua com os pesos de "population". Nomes fora das tabelas de referência são erro.
+    """
+    if weights is None:
+        return {"states": None, "cities": {}, "area_codes": {}}
+    tables = reference_tables()
+    resolved = json.loads(json.dumps(tables["population_weights"]))
+    if weights == "population":
+        return resolved
+    if not isinstance(weights, dict):
+        raise ValueError('clients.weights deve ser null, "population" ou um dicionário por tabela')
+    unknown = sorted(set(weights) - set(WEIGHTED_TABLES))
+    if unknown:
+        raise ValueError(f"Tabelas desconhecidas em clients.weights: {', '.join(unknown)} (use {', '.join(WEIGHTED_TABLES)})")
+    for state, weight in (weights.get("states") or {}).items():
+        if state not in tables["states"]:
+            raise ValueError(f"UF desconhecida em clients.weights.states: {state}")
+        resolved["states"][state] = weight
+    for table, reference in (("cities", tables["cities_by_state"]), ("area_codes", tables["area_codes"])):
+        for state, state_weights in (weights.get(table) or {}).items():
+            if state not in reference:
+                raise ValueError(f"UF desconhecida em clients.weights.{table}: {state}")
+            unknown = sorted(set(state_weights) - set(reference[state]))
+            if unknown:
+                raise ValueError(f"Valores desconhecidos em clients.weights.{table}.{state}: {', '.join(unknown)}")
+            resolved[table][state].update(state_weights)
+    # Confere soma positiva e pesos não negativos já na normalização do cenário
+    _check_weights(resolved, tables)
+    return resolved
+
+def _check_weights(resolved, tables):
+    CategoricalSampler(tables["states"], _weights_for(resolved["states"], tables["states"]))
+    for table, reference in (("cities", tables["cities_by_state"]), ("area_codes", tables["area_codes"])):
+        for state, values in reference.items():
+            CategoricalSampler(values, _weights_for(resolved[table][state], values))
+
+@lru_cache(maxsize=16)
+def _client_samplers(weights_json):
+    return ClientSamplers(json.loads(weights_json))
+
+def client_samplers(weights=None):
+    """ClientSamplers dos pesos informados, montados uma vez por configuração de pesos"""
+    return _client_samplers(json.dumps(weights, sort_keys=True))
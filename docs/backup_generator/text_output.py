@@ -0,0 +1,166 @@
+import gzip
+import io
+import queue
+import threading
+from functools import lru_cache
+
+# Compressões das saídas de texto e a extensão acrescentada ao nome do arquivo
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+# Terminador de linha do csv.writer (dialeto excel): as linhas montadas aqui saem idênticas às dele
+CRLF = "\r\n"
+
+@lru_cache(maxsize=None)
+def _zstandard():
+    """zstandard importado só na primeira saída/entrada .zst"""
+    try:
+        import zstandard
+    except ImportError:  # zstandard é opcional: só a compressão zstd depende dele
+        return None
+    return zstandard
+
+def _require_zstandard():
+    zstandard = _zstandard()
+    if zstandard is None:
+        raise RuntimeError("Arquivos .zst requerem zstandard (pip install zstandard)")
+    return zstandard
+
+def compressed_name(filename, compression=None):
+    """Nome do arquivo com a extensão da compressão (backup.csv -> backup.csv.gz)"""
+    return filename + COMPRESSIONS[compression] if compression else filename
+
+def compression_of(filename):
+    """Compressão indicada pela extensão do arquivo (None para texto puro)"""
+    for compression, extension in COMPRESSIONS.items():
+        if filename.endswith(extension):
+            return compression
+    return None
+
+def csv_field(value):
+    """Um campo como o csv.writer o escreveria (QUOTE_MINIMAL)"""
+    if value is None:
+        return ""
+    text = str(value)
+    if "," in text or '"' in text or "\n" in text or "\r" in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+def csv_line(fields):
+    """Uma linha de CSV já montada, com o terminador do csv.writer"""
+    return ",".join(map(csv_field, fields)) + CRLF
+
+def open_text_input(filename):
+    """Abre um CSV para leitura em texto, descomprimindo .gz e .zst pela extensão"""
+    compression = compression_of(filename)
+    if compression == "gzip":
+        return gzip.open(filename, "rt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        reader = _require_zstandard().ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return open(filename, newline="", encoding="utf-8")
+
+class TextOutput:
+    """Arquivo de texto escrito em blocos grandes, com compressão gzip/zstd (pela extensão) em uma thread à parte
+
+    As linhas chegam já montadas e são codificadas em blocos de buffer_bytes; com compressão, os blocos passam
+    por uma fila limitada para a thread do compressor (zlib e zstd liberam o GIL), que trabalha enquanto esta
+    thread formata o próximo bloco.
+    """
+
+    def __init__(self, filename, level=None, buffer_bytes=1 << 20):
+        self.filename = filename
+        self.compression = compression_of(filename)
+        self.buffer_bytes = buffer_bytes
+        self._pieces = []
+        self._size = 0
+        self._error = None
+        self._thread = None
+        self._file = open(filename, "wb")
+        if self.compression is not None:
+            try:
+                stream = self._compressor(level)
+            except BaseException:
+                self._file.close()
+                raise
+            self._queue = queue.Queue(maxsize=4)
+            self._thread = threading.Thread(target=self._compress, args=(stream,), name="text-output-compressor", daemon=True)
+            self._thread.start()
+
+    def _compressor(self, level):
+        if level is None:
+            level = DEFAULT_LEVELS[self.compression]
+        if self.compression == "gzip":
+            # mtime fixo: a mesma saída dá os mesmos bytes (cache de saídas, checksums)
+            return gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=level, mtime=0)
+        return _require_zstandard().ZstdCompressor(level=level).stream_writer(self._file, closefd=False)
+
+    def _compress(self, stream):
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                stream.write(data)
+            stream.close()
+        except BaseException as error:
+            self._error = error
+            # Continua esvaziando a fila para quem escreve não ficar bloqueado; o erro sobe no próximo flush
+            while self._queue.get() is not None:
+                pass
+
+    def write(self, text):
+        self._pieces.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_bytes:
+            self.flush()
+
+    def writelines(self, lines):
+        pieces = self._pieces
+        size = self._size
+        limit = self.buffer_bytes
+        for line in lines:
+            pieces.append(line)
+            size += len(line)
+            if size >= limit:
+                self._size = size
+                self.flush()
+                pieces = self._pieces
+                size = 0
+        self._size = size
+
+    def flush(self):
+        """Codifica o bloco acumulado e o entrega ao arquivo (ou à thread do compressor)"""
+        if not self._pieces:
+            return
+        data = "".join(self._pieces).encode("utf-8")
+        self._pieces = []
+        self._size = 0
+        if self._thread is None:
+            self._file.write(data)
+            return
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+
+    def close(self):
+        try:
+            if self._thread is not None:
+                try:
+                    self.flush()
+                finally:
+                    self._queue.put(None)
+                    self._thread.join()
+                    self._thread = None
+                if self._error is not None:
+                    raise self._error
+            else:
+                self.flush()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
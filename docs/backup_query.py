@@ -0,0 +1,506 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from backup_generator.partitions import is_partitioned, iter_partition_rows, load_manifest, manifest_path
+from backup_generator.text_output import COMPRESSIONS, compressed_name, compression_of, open_text_input
+import generate_large_dataset as generator
+from generate_large_dataset import np
+from mock_api_server import load_backup_columns, load_clients
+
+# Cópia binária de largura fixa (uma linha por backup, ordenada por cliente e data), lida via memory-map
+ROW_DTYPE = [
+    ('backup_id', '<i8'),
+    ('timestamp', '<i8'),
+    ('client_index', '<i4'),
+    ('duration_seconds', '<i4'),
+    ('size_gb', '<f8'),
+]
+
+STATUSES = generator.BACKUP_STATUSES
+GROUP_KEYS = ['client', 'state', 'client_status', 'status', 'day', 'month']
+SORT_KEYS = ['key', 'total', 'failed', 'success_rate']
+INDEX_VERSION = 1
+
+def default_index_dir(backup_path):
+    """Diretório do índice ao lado dos dados (data/backup.csv ou data/backup.csv.gz -> data/backup.index)"""
+    if is_partitioned(backup_path):
+        return os.path.dirname(manifest_path(backup_path)) + '.index'
+    compression = compression_of(backup_path)
+    if compression is not None:
+        backup_path = backup_path[:-len(COMPRESSIONS[compression])]
+    return os.path.splitext(backup_path)[0] + '.index'
+
+def default_clients_path(backup_path):
+    """clients.csv do mesmo dataset: ao lado do backup.csv (com a mesma compressão) ou do diretório das partições"""
+    if is_partitioned(backup_path):
+        partition_dir = os.path.dirname(manifest_path(backup_path))
+        return compressed_name(os.path.join(os.path.dirname(partition_dir), 'clients.csv'), load_manifest(backup_path)['compression'])
+    return compressed_name(os.path.join(os.path.dirname(backup_path), 'clients.csv'), compression_of(backup_path))
+
+def source_signature(path):
+    """Tamanho e mtime do arquivo de origem: mudou, o índice precisa ser refeito"""
+    if is_partitioned(path):
+        # O manifesto é regravado a cada geração das partições
+        path = manifest_path(path)
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def backup_id_digits(backup_path, default=6):
+    """Dígitos do número no backup_id do dataset (bkp_000001 -> 6); os formatos colunares guardam só o número"""
+    if is_partitioned(backup_path):
+        row = next(iter_partition_rows(backup_path), None)
+    else:
+        compression = compression_of(backup_path)
+        plain_path = backup_path[:-len(COMPRESSIONS[compression])] if compression is not None else backup_path
+        if os.path.splitext(plain_path)[1] != '.csv':
+            return default
+        with open_text_input(backup_path) as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)  # cabeçalho
+            row = next(reader, None)
+    return len(row[0]) - len('bkp_') if row else default
+
+def build_index(backup_path, clients_path, index_dir, id_digits=None):
+    """Lê os backups uma vez (CSV, NPZ, Parquet, Arrow ou partições) e grava a cópia binária e o índice lateral"""
+    if np is None:
+        raise RuntimeError("O índice de consultas requer numpy (pip install numpy)")
+    clients = load_clients(clients_path)
+    columns = load_backup_columns(backup_path, clients)
+    num_rows = len(columns['timestamp'])
+    os.makedirs(index_dir, exist_ok=True)
+
+    # Ordem por cliente e data: o histórico de cada cliente é um intervalo contíguo de linhas
+    order = np.lexsort((columns['timestamp'], columns['client_index']))
+    rows = np.lib.format.open_memmap(os.path.join(index_dir, 'rows.npy'), mode='w+', dtype=ROW_DTYPE, shape=(num_rows,))
+    for name, _ in ROW_DTYPE:
+        rows[name] = columns[name][order]
+    success = columns['success'][order]
+    rows.flush()
+    del columns
+
+    client_index = rows['client_index']
+    timestamps = rows['timestamp']
+    num_clients = len(clients)
+    counts = np.bincount(client_index, minlength=num_clients)
+    client_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    # Dia -> intervalo na permutação por data (posições das linhas em ordem de data)
+    date_order = generator.date_order(np.asarray(timestamps))
+    date_order = date_order.astype(np.uint32 if num_rows < 2 ** 32 else np.int64)
+    days = np.asarray(timestamps)[date_order] // 86400
+    first_day = int(days[0]) if num_rows else 0
+    num_days = int(days[-1]) - first_day + 1 if num_rows else 0
+    day_offsets = np.searchsorted(days, np.arange(first_day, first_day + num_days + 1)).astype(np.int64)
+
+    # Bitmaps de status (um bit por linha) e totais por cliente e por dia, para consultas que não precisam das linhas
+    sizes = np.asarray(rows['size_gb'])
+    client_totals = np.zeros((num_clients, 4), dtype=np.float64)
+    client_totals[:, 0] = counts
+    client_totals[:, 1] = np.bincount(client_index, weights=success, minlength=num_clients)
+    client_totals[:, 2] = np.bincount(client_index, weights=np.where(success, sizes, 0.0), minlength=num_clients)
+    client_totals[:, 3] = np.bincount(client_index, weights=np.where(success, 0.0, sizes), minlength=num_clients)
+
+    success_by_date = success[date_order]
+    sizes_by_date = sizes[date_order]
+    day_index = days - first_day
+    day_totals = np.zeros((num_days, 4), dtype=np.float64)
+    day_totals[:, 0] = np.diff(day_offsets)
+    day_totals[:, 1] = np.bincount(day_index, weights=success_by_date, minlength=num_days)
+    day_totals[:, 2] = np.bincount(day_index, weights=np.where(success_by_date, sizes_by_date, 0.0), minlength=num_days)
+    day_totals[:, 3] = np.bincount(day_index, weights=np.where(success_by_date, 0.0, sizes_by_date), minlength=num_days)
+
+    np.save(os.path.join(index_dir, 'client_offsets.npy'), client_offsets)
+    np.save(os.path.join(index_dir, 'day_totals.npy'), day_totals)
+    np.save(os.path.join(index_dir, 'client_totals.npy'), client_totals)
+    np.save(os.path.join(index_dir, 'date_order.npy'), date_order)
+    np.save(os.path.join(index_dir, 'day_offsets.npy'), day_offsets)
+    np.save(os.path.join(index_dir, 'status_success.npy'), np.packbits(success))
+    np.save(os.path.join(index_dir, 'status_failed.npy'), np.packbits(~success))
+
+    with open(os.path.join(index_dir, 'clients.json'), 'w', encoding='utf-8') as clients_file:
+        json.dump({
+            'id': [client['client_id'] for client in clients],
+            'name': [client['name'] for client in clients],
+            'state': [client['address'].rsplit(' - ', 1)[-1] for client in clients],
+            'status': [client['status'] for client in clients],
+        }, clients_file, ensure_ascii=False)
+
+    meta = {
+        'version': INDEX_VERSION,
+        'rows': num_rows,
+        'clients': num_clients,
+        'first_day': first_day,
+        'days': num_days,
+        'last_timestamp': int(timestamps.max()) if num_rows else 0,
+        # Largura do backup_id nas linhas listadas (output.backup_id_digits do cenário que gerou os dados)
+        'backup_id_digits': id_digits or backup_id_digits(backup_path),
+        'backups': source_signature(backup_path),
+        'clients_csv': source_signature(clients_path),
+    }
+    with open(os.path.join(index_dir, 'meta.json'), 'w', encoding='utf-8') as meta_file:
+        json.dump(meta, meta_file, indent=2)
+    return meta
+
+def index_is_current(index_dir, backup_path, clients_path):
+    """O índice existe e foi construído a partir destes mesmos arquivos"""
+    try:
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        return False
+    return (meta.get('version') == INDEX_VERSION
+            and meta['backups'] == source_signature(backup_path)
+            and meta['clients_csv'] == source_signature(clients_path))
+
+class BackupQuery:
+    """Consultas sobre o índice: só as linhas selecionadas são lidas do arquivo mapeado"""
+
+    def __init__(self, index_dir):
+        if np is None:
+            raise RuntimeError("O índice de consultas requer numpy (pip install numpy)")
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as meta_file:
+            self.meta = json.load(meta_file)
+        self.rows = np.load(os.path.join(index_dir, 'rows.npy'), mmap_mode='r')
+        self.client_offsets = self._load('client_offsets')
+        self.date_order = self._load('date_order')
+        self.day_offsets = self._load('day_offsets')
+        self._clients = None
+        self._client_totals = None
+        self._day_totals = None
+        self._bitmaps = {}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.index_dir, name + '.npy'), mmap_mode='r')
+
+    @property
+    def clients(self):
+        """Metadados dos clientes (id, nome, estado, status), carregados só quando usados"""
+        if self._clients is None:
+            with open(os.path.join(self.index_dir, 'clients.json'), encoding='utf-8') as clients_file:
+                self._clients = json.load(clients_file)
+            self._clients['position'] = {client_id: index for index, client_id in enumerate(self._clients['id'])}
+        return self._clients
+
+    def client_position(self, client_id):
+        """Posição de um cliente pelo client_id ou pelo número (clt_0421, clt_421 e 421 são o mesmo cliente)"""
+        clients = self.clients
+        if client_id in clients['position']:
+            return clients['position'][client_id]
+        if 'number' not in clients:
+            clients['number'] = {generator.client_number(value): index for index, value in enumerate(clients['id'])}
+        try:
+            return clients['number'][generator.client_number(client_id)]
+        except (KeyError, ValueError):
+            raise ValueError(f"Cliente inexistente: {client_id}") from None
+
+    def status_bits(self, status, positions):
+        """Bit de status de cada linha, lido direto do bitmap"""
+        if status not in self._bitmaps:
+            self._bitmaps[status] = self._load('status_' + status)
+        positions = np.asarray(positions, dtype=np.int64)
+        return (self._bitmaps[status][positions >> 3] >> (7 - (positions & 7)) & 1).astype(bool)
+
+    def select_clients(self, client_ids=None, states=None, client_statuses=None):
+        """Posições dos clientes que passam nos filtros de cliente (None = todos)"""
+        if not (client_ids or states or client_statuses):
+            return None
+        clients = self.clients
+        if client_ids:
+            selected = np.array(sorted(self.client_position(client_id) for client_id in client_ids), dtype=np.int64)
+        else:
+            selected = np.arange(len(clients['id']), dtype=np.int64)
+        if states:
+            wanted = {state.upper() for state in states}
+            state = clients['state']
+            selected = np.array([position for position in selected.tolist() if state[position] in wanted], dtype=np.int64)
+        if client_statuses:
+            status = clients['status']
+            selected = np.array([position for position in selected.tolist() if status[position] in client_statuses], dtype=np.int64)
+        return selected
+
+    def select_rows(self, clients=None, start=None, end=None):
+        """Posições (em ordem) das linhas dos clientes informados com data em [start, end]"""
+        num_rows = self.meta['rows']
+        if clients is not None:
+            client_rows = int((self.client_offsets[clients + 1] - self.client_offsets[clients]).sum())
+        if start is None and end is None:
+            if clients is None:
+                return np.arange(num_rows, dtype=np.int64)
+            return self._client_ranges(clients)
+
+        start = -2 ** 62 if start is None else start
+        end = 2 ** 62 if end is None else end
+        first_day = self.meta['first_day']
+        day_low = min(max(start // 86400 - first_day, 0), self.meta['days'])
+        day_high = min(max(end // 86400 - first_day + 1, 0), self.meta['days'])
+        low, high = int(self.day_offsets[day_low]), int(self.day_offsets[max(day_high, day_low)])
+
+        if clients is not None and client_rows <= high - low:
+            # Poucos clientes: busca binária da janela dentro do intervalo (ordenado por data) de cada um
+            timestamps = self.rows['timestamp']
+            ranges = []
+            for position in clients.tolist():
+                first, last = int(self.client_offsets[position]), int(self.client_offsets[position + 1])
+                history = timestamps[first:last]
+                ranges.append(np.arange(first + int(np.searchsorted(history, start, 'left')),
+                                        first + int(np.searchsorted(history, end, 'right')), dtype=np.int64))
+            return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+        # Janela curta: os dias vêm da permutação por data, e o filtro exato (e de clientes) sobre eles
+        positions = np.sort(np.asarray(self.date_order[low:high], dtype=np.int64))
+        timestamps = self.rows['timestamp'][positions]
+        keep = (timestamps >= start) & (timestamps <= end)
+        if clients is not None:
+            wanted = np.zeros(self.meta['clients'], dtype=bool)
+            wanted[clients] = True
+            keep &= wanted[self.rows['client_index'][positions]]
+        return positions[keep]
+
+    def _client_ranges(self, clients):
+        starts = np.asarray(self.client_offsets[clients])
+        stops = np.asarray(self.client_offsets[clients + 1])
+        lengths = stops - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenação vetorizada de intervalos [start, stop)
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return np.arange(lengths.sum(), dtype=np.int64) + offsets
+
+    def window(self, last_days=None, since=None, until=None):
+        """Intervalo [início, fim] em segundos: últimos N dias (até o último backup) ou datas AAAA-MM-DD inclusivas"""
+        start = end = None
+        if last_days is not None:
+            end = self.meta['last_timestamp']
+            start = end - last_days * 86400
+        if since is not None:
+            start = generator.epoch_seconds(datetime.strptime(since, '%Y-%m-%d'))
+        if until is not None:
+            end = generator.epoch_seconds(datetime.strptime(until, '%Y-%m-%d')) + 86399
+        return start, end
+
+    def aggregate(self, positions, status=None, group_by=None):
+        """Totais por grupo das linhas selecionadas: {chave: [total, sucessos, tamanho em GB]}"""
+        success = self.status_bits('success', positions)
+        if status is not None:
+            keep = success if status == 'success' else ~success
+            positions = positions[keep]
+            success = success[keep]
+        sizes = self.rows['size_gb'][positions]
+        if group_by is None:
+            return {'total': [len(positions), int(success.sum()), float(sizes.sum())]}
+
+        if group_by == 'status':
+            keys = np.where(success, 0, 1)
+            labels = STATUSES
+        elif group_by in ('day', 'month'):
+            keys, labels = self._day_keys(self.rows['timestamp'][positions] // 86400 - self.meta['first_day'], group_by)
+        else:
+            keys, labels = self._client_keys(self.rows['client_index'][positions], group_by)
+        keys = np.asarray(keys).ravel()
+        totals = np.bincount(keys, minlength=len(labels))
+        successes = np.bincount(keys, weights=success, minlength=len(labels))
+        size_sums = np.bincount(keys, weights=sizes, minlength=len(labels))
+        return {
+            labels[key]: [int(totals[key]), int(successes[key]), float(size_sums[key])]
+            for key in np.flatnonzero(totals).tolist()
+        }
+
+    def aggregate_clients(self, clients=None, status=None, group_by=None):
+        """Sem janela de datas: tudo sai dos totais por cliente do índice, sem ler as linhas"""
+        if self._client_totals is None:
+            self._client_totals = self._load('client_totals')
+        totals = np.asarray(self._client_totals if clients is None else self._client_totals[clients])
+        positions = np.arange(self.meta['clients']) if clients is None else clients
+        return self._aggregate_totals(totals, status, group_by, lambda: self._client_keys(positions, group_by))
+
+    def aggregate_days(self, start=None, end=None, status=None, group_by=None):
+        """Sem filtro de cliente e com janela de dias inteiros: tudo sai dos totais por dia do índice"""
+        if self._day_totals is None:
+            self._day_totals = self._load('day_totals')
+        first_day = self.meta['first_day']
+        day_low = 0 if start is None else min(max(start // 86400 - first_day, 0), self.meta['days'])
+        day_high = self.meta['days'] if end is None else min(max(end // 86400 - first_day + 1, day_low), self.meta['days'])
+        totals = np.asarray(self._day_totals[day_low:day_high])
+        return self._aggregate_totals(totals, status, group_by,
+                                      lambda: self._day_keys(np.arange(day_low, day_high), group_by))
+
+    def _aggregate_totals(self, totals, status, group_by, group_keys):
+        """Agrega linhas de totais [backups, sucessos, volume dos sucessos, volume das falhas]"""
+        count, successful, size_success, size_failed = totals.T
+        # (status, backups, sucessos, volume) por linha de totais; falhas não somam sucessos
+        succeeded = (0, successful, successful, size_success)
+        failed = (1, count - successful, np.zeros_like(count), size_failed)
+        by_status = {'success': [succeeded], 'failed': [failed], None: [succeeded, failed]}[status]
+
+        if group_by is None:
+            return {'total': [int(sum(part[1].sum() for part in by_status)),
+                              int(sum(part[2].sum() for part in by_status)),
+                              float(sum(part[3].sum() for part in by_status))]}
+        if group_by == 'status':
+            return {STATUSES[code]: [int(rows.sum()), int(successes.sum()), float(sizes.sum())]
+                    for code, rows, successes, sizes in by_status if rows.sum()}
+
+        keys, labels = group_keys()
+        totals = np.bincount(keys, weights=sum(part[1] for part in by_status), minlength=len(labels))
+        successes = np.bincount(keys, weights=sum(part[2] for part in by_status), minlength=len(labels))
+        size_sums = np.bincount(keys, weights=sum(part[3] for part in by_status), minlength=len(labels))
+        return {
+            labels[key]: [int(totals[key]), int(successes[key]), float(size_sums[key])]
+            for key in np.flatnonzero(totals).tolist()
+        }
+
+    def _day_keys(self, days, group_by):
+        """Código do grupo de cada dia (relativo ao primeiro do índice) e os rótulos AAAA-MM-DD ou AAAA-MM"""
+        first_day = self.meta['first_day']
+        labels = np.datetime_as_string(np.arange(first_day, first_day + self.meta['days']).astype('datetime64[D]')).tolist()
+        if group_by == 'day':
+            return days, labels
+        months = sorted(set(label[:7] for label in labels))
+        codes = np.array([months.index(label[:7]) for label in labels], dtype=np.int64)
+        return codes[days], months
+
+    def _client_keys(self, client_positions, group_by):
+        """Código do grupo de cada linha (por cliente, estado ou status do cliente) e os rótulos"""
+        if group_by == 'client':
+            return client_positions, self.clients['id']
+        attribute = self.clients['state' if group_by == 'state' else 'status']
+        labels = sorted(set(attribute))
+        codes = np.array([labels.index(value) for value in attribute], dtype=np.int64)
+        return codes[client_positions], labels
+
+    def format_rows(self, positions, limit, id_digits=None):
+        """As primeiras linhas selecionadas (em ordem de data) no formato do backup.csv"""
+        id_spec = f"0{id_digits or self.meta['backup_id_digits']}d"
+        positions = positions[np.argsort(self.rows['timestamp'][positions], kind='stable')][:limit]
+        records = self.rows[positions]
+        success = self.status_bits('success', positions).tolist()
+        dates = np.datetime_as_string(records['timestamp'].astype('datetime64[s]')).tolist()
+        clients = self.clients
+        lines = []
+        for record, date, is_success in zip(records.tolist(), dates, success):
+            backup_id, _, client_index, duration_seconds, size_gb = record
+            minutes, seconds = divmod(duration_seconds, 60)
+            lines.append(','.join([
+                f"bkp_{backup_id:{id_spec}}", clients['id'][client_index], clients['name'][client_index],
+                date.replace('T', ' '), STATUSES[0] if is_success else STATUSES[1],
+                f"{minutes:02d}:{seconds:02d}", f"{size_gb} GB"
+            ]))
+        return lines
+
+def sort_groups(groups, sort):
+    """Ordena os grupos pela chave ou, de forma decrescente, por total, falhas ou taxa de sucesso"""
+    items = list(groups.items())
+    if sort == 'total':
+        items.sort(key=lambda item: -item[1][0])
+    elif sort == 'failed':
+        items.sort(key=lambda item: -(item[1][0] - item[1][1]))
+    elif sort == 'success_rate':
+        items.sort(key=lambda item: item[1][1] / item[1][0] if item[1][0] else 0, reverse=True)
+    else:
+        items.sort(key=lambda item: item[0])
+    return items
+
+def run_query(query, args):
+    """Executa a consulta descrita pelos argumentos; devolve (grupos ordenados, linhas listadas)"""
+    clients = query.select_clients(args.client, args.state, args.client_status)
+    start, end = query.window(args.last_days, args.since, args.until)
+    whole_days = (start is None or start % 86400 == 0) and (end is None or (end + 1) % 86400 == 0)
+
+    # Os totais do índice respondem sem ler as linhas: por cliente sem janela de datas,
+    # por dia sem filtro de cliente (e janela de dias inteiros); o resto filtra as linhas mapeadas
+    lines = []
+    if args.rows:
+        positions = query.select_rows(clients, start, end)
+        groups = query.aggregate(positions, args.status, args.group_by)
+        if args.status is not None:
+            keep = query.status_bits('success', positions)
+            positions = positions[keep if args.status == 'success' else ~keep]
+        lines = query.format_rows(positions, args.rows, args.backup_id_digits)
+    elif start is None and end is None and args.group_by not in ('day', 'month'):
+        groups = query.aggregate_clients(clients, args.status, args.group_by)
+    elif clients is None and whole_days and args.group_by in (None, 'status', 'day', 'month'):
+        groups = query.aggregate_days(start, end, args.status, args.group_by)
+    else:
+        groups = query.aggregate(query.select_rows(clients, start, end), args.status, args.group_by)
+    groups = sort_groups(groups, args.sort)
+    return (groups[:args.top] if args.top else groups), lines
+
+def print_groups(groups, group_by):
+    """Tabela de grupos: total, sucessos, falhas, taxa de sucesso e volume"""
+    label = group_by or 'total'
+    width = max([len(label)] + [len(str(key)) for key, _ in groups])
+    print(f"{label:<{width}}  {'backups':>10}  {'sucessos':>10}  {'falhas':>10}  {'sucesso':>8}  {'volume (GB)':>14}")
+    for key, (total, successful, size_gb) in groups:
+        rate = generator._success_rate(successful, total)
+        print(f"{key:<{width}}  {total:>10,}  {successful:>10,}  {total - successful:>10,}  {rate:>7.1f}%  {size_gb:>14,.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Consultas rápidas sobre os backups gerados, por um índice lateral e uma cópia binária mapeada em memória"
+    )
+    parser.add_argument("--data", default="data/backup.csv",
+                        help="Backups do gerador: CSV (ou .csv.gz/.csv.zst), NPZ, Parquet, Arrow ou o diretório backup_partitions/ "
+                             "(padrão: data/backup.csv)")
+    parser.add_argument("--clients-csv", default=None, help="clients.csv do mesmo dataset (padrão: ao lado de --data)")
+    parser.add_argument("--index", default=None, help="Diretório do índice (padrão: data/backup.index)")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstrói o índice mesmo se estiver atualizado")
+    parser.add_argument("--client", action="append", help="Filtra por client_id (pode repetir)")
+    parser.add_argument("--state", action="append", help="Filtra pela UF do cliente (pode repetir)")
+    parser.add_argument("--client-status", action="append", choices=["active", "inactive", "pending"],
+                        help="Filtra pelo status do cliente (pode repetir)")
+    parser.add_argument("--status", choices=STATUSES, default=None, help="Filtra pelo status do backup")
+    parser.add_argument("--last-days", type=int, default=None,
+                        help="Só os últimos N dias, contados a partir do último backup do dataset")
+    parser.add_argument("--since", default=None, help="Data inicial (AAAA-MM-DD, inclusiva)")
+    parser.add_argument("--until", default=None, help="Data final (AAAA-MM-DD, inclusiva)")
+    parser.add_argument("--group-by", choices=GROUP_KEYS, default=None, help="Agrupa os totais")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="key", help="Ordem dos grupos (padrão: key)")
+    parser.add_argument("--top", type=int, default=None, help="Mostra só os N primeiros grupos")
+    parser.add_argument("--rows", type=int, default=0, help="Lista até N backups selecionados, em ordem de data")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    parser.add_argument("--backup-id-digits", type=int, default=None,
+                        help="Dígitos do backup_id nas linhas de --rows (padrão: os do dataset, guardados no índice)")
+    args = parser.parse_args()
+
+    args.data = args.data.rstrip(os.sep) or args.data
+    clients_path = args.clients_csv or default_clients_path(args.data)
+    index_dir = args.index or default_index_dir(args.data)
+    if args.last_days is not None and (args.since or args.until):
+        parser.error("use --last-days ou --since/--until, não os dois")
+
+    try:
+        if args.rebuild or not index_is_current(index_dir, args.data, clients_path):
+            print(f"🔨 Construindo índice de {args.data} em {index_dir}...", file=sys.stderr)
+            started = time.perf_counter()
+            meta = build_index(args.data, clients_path, index_dir, args.backup_id_digits)
+            print(f"✅ Índice pronto: {meta['rows']:,} backups em {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+        started = time.perf_counter()
+        query = BackupQuery(index_dir)
+        groups, lines = run_query(query, args)
+        elapsed = time.perf_counter() - started
+    except (OSError, ValueError, RuntimeError) as error:
+        parser.error(str(error))
+
+    if args.json:
+        json.dump({
+            'groups': [{'key': key, 'total': total, 'successful': successful, 'failed': total - successful,
+                        'success_rate': generator._success_rate(successful, total), 'size_gb': round(size_gb, 2)}
+                       for key, (total, successful, size_gb) in groups],
+            'rows': lines,
+            'seconds': round(elapsed, 6),
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_groups(groups, args.group_by)
+        if lines:
+            print()
+            print(','.join(generator.BACKUP_FIELDNAMES))
+            print('\n'.join(lines))
+        print(f"\n⏱️  Consulta em {elapsed * 1000:.1f} ms", file=sys.stderr)
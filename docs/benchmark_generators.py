@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from operator import itemgetter
+
+from backup_generator.cnpj import generate_cnpjs
+import generate_large_dataset as generator
+
+# Cenários padrão: clientes x dias de histórico
+DEFAULT_CLIENTS = [500, 5000, 50000]
+DEFAULT_DAYS = [30, 400, 3650]
+
+# Fração média de dias com backup (fins de semana pulados e inativos parando na metade)
+EXPECTED_BACKUP_RATIO = 0.93
+
+def scenario_name(clients, days, engine, mode):
+    """Nome estável do cenário, usado para comparar execuções"""
+    return f"{clients}x{days}-{engine}-{mode}"
+
+def estimate_rows(clients, days):
+    """Estimativa de linhas de backup de um cenário"""
+    return int(clients * (days + 1) * EXPECTED_BACKUP_RATIO)
+
+def peak_rss_mb():
+    """Pico de memória residente do processo atual, em MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def timed(phases, name, rows, func, *args, **kwargs):
+    """Executa uma fase medindo o tempo de parede e registra o throughput"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    seconds = time.perf_counter() - started
+    row_count = rows(result) if callable(rows) else rows
+    phases.append({
+        "name": name,
+        "seconds": round(seconds, 4),
+        "rows": row_count,
+        "rows_per_second": round(row_count / seconds) if seconds > 0 else None
+    })
+    return result
+
+def run_scenario(clients, days, engine, mode, output_dir):
+    """Roda um cenário no processo atual e devolve as métricas"""
+    random.seed(0)
+    rng = generator.np.random.default_rng(0) if engine == "numpy" else None
+    clients_path = os.path.join(output_dir, "clients.csv")
+    backup_path = os.path.join(output_dir, "backup.csv")
+    phases = []
+    started = time.perf_counter()
+
+    timed(phases, "generate_cnpj", clients, lambda: [generator.generate_cnpj() for _ in range(clients)])
+    timed(phases, "generate_cnpjs", clients, generate_cnpjs, clients)
+    client_list = timed(phases, "generate_clients", clients, generator.generate_clients, clients)
+
+    if mode == "stream":
+        client_stats = {}
+        if engine == "numpy":
+            backup_rows = generator.iter_backup_rows_columns(client_list, days, rng, history_days=days)
+        else:
+            backup_rows = generator.iter_backup_data(client_list, days, history_days=days)
+        total_rows = timed(
+            phases, "stream_generate_sort_write", lambda count: count,
+            generator.write_backup_csv_streaming,
+            generator.iter_with_client_stats(backup_rows, client_stats), backup_path
+        )
+    elif engine == "numpy":
+        columns = timed(
+            phases, "generate_backup_columns", lambda result: len(result["timestamp"]),
+            generator.generate_backup_columns, client_list, days, rng, history_days=days
+        )
+        total_rows = len(columns["timestamp"])
+        order = timed(phases, "sort", total_rows, generator.date_order, columns["timestamp"])
+        client_stats = timed(phases, "stats", total_rows, generator.compute_client_stats_columns, columns, client_list)
+        timed(
+            phases, "write_backup_csv", total_rows,
+            generator.write_backup_csv, generator.backup_columns_to_rows(columns, client_list, order), backup_path
+        )
+    else:
+        backup_data = timed(
+            phases, "generate_backup_data", len,
+            generator.generate_backup_data, client_list, days, history_days=days
+        )
+        total_rows = len(backup_data)
+        timed(phases, "sort", total_rows, backup_data.sort, key=itemgetter('date'))
+        client_stats = timed(phases, "stats", total_rows, generator.compute_client_stats, backup_data)
+        timed(phases, "write_backup_csv", total_rows, generator.write_backup_csv, backup_data, backup_path)
+
+    clients_with_stats = generator.build_clients_with_stats(client_list, client_stats)
+    timed(phases, "write_clients_csv", clients, generator.write_clients_csv, clients_with_stats, clients_path)
+
+    wall_seconds = time.perf_counter() - started
+    return {
+        "scenario": scenario_name(clients, days, engine, mode),
+        "clients": clients,
+        "days": days,
+        "engine": engine,
+        "mode": mode,
+        "rows": total_rows,
+        "wall_seconds": round(wall_seconds, 4),
+        "rows_per_second": round(total_rows / wall_seconds) if wall_seconds > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "bytes_written": os.path.getsize(clients_path) + os.path.getsize(backup_path),
+        "phases": phases
+    }
+
+def run_scenario_subprocess(clients, days, engine, mode):
+    """Roda o cenário em um processo separado para isolar o pico de memória"""
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as output_dir:
+        command = [
+            sys.executable, os.path.abspath(__file__), "--run-scenario",
+            str(clients), str(days), engine, mode, output_dir
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Cenário {scenario_name(clients, days, engine, mode)} falhou:\n{completed.stderr}")
+        return json.loads(completed.stdout)
+
+def compare_results(results, baseline, threshold, min_seconds=0.05):
+    """Compara com uma execução anterior e devolve as regressões encontradas"""
+    baseline_by_name = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline_by_name.get(result["scenario"])
+        if previous is None:
+            continue
+
+        previous_phases = {phase["name"]: phase for phase in previous["phases"]}
+        checks = [("wall_seconds", previous["wall_seconds"], result["wall_seconds"])]
+        checks += [
+            (phase["name"], previous_phases[phase["name"]]["seconds"], phase["seconds"])
+            for phase in result["phases"] if phase["name"] in previous_phases
+        ]
+        # Fases muito curtas são dominadas por ruído e não entram na comparação
+        checks = [check for check in checks if check[1] >= min_seconds]
+        checks.append(("peak_rss_mb", previous["peak_rss_mb"], result["peak_rss_mb"]))
+        for metric, before, after in checks:
+            if before and after > before * (1 + threshold):
+                regressions.append({
+                    "scenario": result["scenario"],
+                    "metric": metric,
+                    "before": before,
+                    "after": after,
+                    "change": round(after / before - 1, 3)
+                })
+    return regressions
+
+def print_result(result):
+    """Imprime o resumo de um cenário"""
+    print(f"\n📊 {result['scenario']}: {result['rows']:,} backups em {result['wall_seconds']:.2f}s "
+          f"({result['rows_per_second']:,} linhas/s, pico {result['peak_rss_mb']} MB, "
+          f"{result['bytes_written'] / (1024 * 1024):.1f} MB escritos)")
+    for phase in result["phases"]:
+        rate = f"{phase['rows_per_second']:,}" if phase["rows_per_second"] else "-"
+        print(f"   {phase['name']:<28} {phase['seconds']:>9.3f}s {rate:>14} linhas/s")
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+if __name__ == "__main__":
+    if len(sys.argv) == 7 and sys.argv[1] == "--run-scenario":
+        # Modo interno: executa um único cenário e imprime o resultado em JSON
+        _, _, clients, days, engine, mode, output_dir = sys.argv
+        print(json.dumps(run_scenario(int(clients), int(days), engine, mode, output_dir)))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark de throughput e memória dos geradores de dataset")
+    parser.add_argument("--clients", type=parse_int_list, default=DEFAULT_CLIENTS,
+                        help="Quantidades de clientes, separadas por vírgula (padrão: 500,5000,50000)")
+    parser.add_argument("--days", type=parse_int_list, default=DEFAULT_DAYS,
+                        help="Dias de histórico, separados por vírgula (padrão: 30,400,3650)")
+    parser.add_argument("--engine", choices=["dict", "numpy"], default="dict")
+    parser.add_argument("--mode", choices=["memory", "stream"], default="memory",
+                        help="memory: lista completa + sort; stream: ordenação externa com memória constante")
+    parser.add_argument("--max-rows", type=int, default=20000000,
+                        help="Pula cenários com mais linhas estimadas que isso (padrão: 20M)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON para salvar os resultados")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Piora relativa tolerada antes de acusar regressão (padrão: 0.2 = 20%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Ignora na comparação fases mais curtas que isso (padrão: 0.05s)")
+    args = parser.parse_args()
+
+    results = []
+    skipped = []
+    for clients in args.clients:
+        for days in args.days:
+            name = scenario_name(clients, days, args.engine, args.mode)
+            rows = estimate_rows(clients, days)
+            if rows > args.max_rows:
+                print(f"⏭️  {name}: ~{rows:,} linhas estimadas (acima de --max-rows), pulando")
+                skipped.append(name)
+                continue
+
+            print(f"⏱️  Rodando {name} (~{rows:,} linhas)...")
+            result = run_scenario_subprocess(clients, days, args.engine, args.mode)
+            print_result(result)
+            results.append(result)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": getattr(generator.np, "__version__", None),
+        "results": results,
+        "skipped": skipped
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as jsonfile:
+            json.dump(report, jsonfile, indent=2)
+        print(f"\n💾 Resultados salvos em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as jsonfile:
+            baseline = json.load(jsonfile)
+        regressions = compare_results(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression['scenario']} {regression['metric']}: "
+                      f"{regression['before']} -> {regression['after']} (+{regression['change']:.0%})")
+            sys.exit(1)
+        print(f"\n✅ Nenhuma regressão acima de {args.threshold:.0%} em relação a {args.compare}")
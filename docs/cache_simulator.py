@@ -0,0 +1,418 @@
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from functools import partial
+
+from backup_generator.core import format_backup
+from backup_generator.sampling import CategoricalSampler
+from generator_instrumentation import add_instrumentation_arguments, instrumentation_from_args
+from mock_api_server import build_index, client_number
+
+# CACHE_DURATION de src/services/api.ts e api-mock.ts
+CACHE_TTL_SECONDS = 5 * 60
+# Auto refresh do BackupDashboard (setInterval de 30s) e os períodos do seletor (7, 30 e 90 dias)
+DASHBOARD_REFRESH_SECONDS = 30
+DASHBOARD_PERIODS = [7, 30, 90]
+# Políticas comparadas por padrão: a atual (só validade, sem limite nem remoção) e duas limitadas
+DEFAULT_POLICIES = [f"ttl={CACHE_TTL_SECONDS}", f"entries=1000,ttl={CACHE_TTL_SECONDS}", f"mb=64,ttl={CACHE_TTL_SECONDS}"]
+POLICY_PARAMS = ("ttl", "entries", "mb")
+SERVICES = ("api", "mock")
+# Prefixos das chaves com parâmetro (id do cliente ou dias); as demais chaves são fixas
+KEY_PREFIXES = ("backups-cliente-", "backups-client-", "indicadores-", "clientes-status-all-", "timeline-")
+# Históricos amostrados para estimar o tamanho médio de uma linha de BackupHistoricoDTO
+HISTORY_SAMPLE_CLIENTS = 50
+MB = 1024 * 1024
+
+class CacheModel:
+    """Cache de um getCachedData: entrada por chave com instante de gravação e tamanho (bytes do JSON)
+
+    Sem limite, como hoje: uma entrada vencida (idade >= ttl) é miss, mas só sai da memória quando é regravada.
+    As subclasses limitam o cache despejando a entrada usada há mais tempo (LRU) enquanto _over_budget().
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.peak_bytes = 0
+        self.peak_entries = 0
+        self.evictions = 0
+
+    def get(self, key, now):
+        """Se a chave está no cache e ainda vale (isCacheValid)"""
+        entry = self.entries.get(key)
+        if entry is None or (self.ttl is not None and now - entry[0] >= self.ttl):
+            return False
+        self.entries.move_to_end(key)
+        return True
+
+    def put(self, key, size, now):
+        """Grava a resposta carregada (dataCache.set), despejando o que passar do limite"""
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous[1]
+        self.entries[key] = (now, size)
+        self.bytes += size
+        while self.entries and self._over_budget():
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        self.peak_bytes = max(self.peak_bytes, self.bytes)
+        self.peak_entries = max(self.peak_entries, len(self.entries))
+
+    def _over_budget(self):
+        return False
+
+class LRUCache(CacheModel):
+    """No máximo max_entries entradas; despeja a usada há mais tempo"""
+
+    def __init__(self, max_entries, ttl=None):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+
+    def _over_budget(self):
+        return len(self.entries) > self.max_entries
+
+class SizeBoundedCache(CacheModel):
+    """No máximo max_bytes somando as entradas; despeja as usadas há mais tempo (uma resposta maior que o limite não fica)"""
+
+    def __init__(self, max_bytes, ttl=None):
+        super().__init__(ttl)
+        self.max_bytes = max_bytes
+
+    def _over_budget(self):
+        return self.bytes > self.max_bytes
+
+def parse_policy(spec):
+    """Fábrica de cache de um --policy: ttl=SEGUNDOS, entries=N (LRU) e/ou mb=N (LRU por tamanho), separados por vírgula"""
+    params = {}
+    for part in spec.split(","):
+        name, separator, value = part.strip().partition("=")
+        if not separator or name not in POLICY_PARAMS:
+            raise ValueError(f"Parâmetro de política inválido: {part!r} (use {', '.join(POLICY_PARAMS)}, ex.: entries=1000,ttl=300)")
+        try:
+            number = float(value)
+        except ValueError:
+            raise ValueError(f"Valor inválido em {spec!r}: {value}") from None
+        if not number > 0:
+            raise ValueError(f"Os valores de {spec!r} devem ser positivos")
+        params[name] = number
+    if "entries" in params and "mb" in params:
+        raise ValueError(f"Use entries ou mb em {spec!r}, não os dois")
+    ttl = params.get("ttl")
+    if "entries" in params:
+        return partial(LRUCache, int(params["entries"]), ttl)
+    if "mb" in params:
+        return partial(SizeBoundedCache, int(params["mb"] * MB), ttl)
+    return partial(CacheModel, ttl)
+
+def split_key(key):
+    """Tipo e parâmetro de uma chave de cache: backups-cliente-12 -> ("backups-cliente", "12")"""
+    for prefix in KEY_PREFIXES:
+        if key.startswith(prefix):
+            return prefix[:-1], key[len(prefix):]
+    return key, None
+
+def json_size(value):
+    """Bytes da resposta serializada: a medida de memória de uma entrada (os objetos JS ocupam mais, na mesma proporção)"""
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+class DashboardWorkload:
+    """Chaves que cada ação do dashboard consulta no cache, com o tamanho e o custo de carregar cada uma
+
+    service "api" segue o ApiService (src/services/api.ts): cada chave é uma requisição ao backend e o custo é o
+    número de linhas de backup (ou clientes) que ele lê. service "mock" segue o fallback de api-mock.ts: `backups`
+    lê o backup.csv inteiro e as chaves derivadas (timeline-N, backups-client-N) filtram essa lista inteira.
+    """
+
+    def __init__(self, index, service="api"):
+        if service not in SERVICES:
+            raise ValueError(f"Serviço desconhecido: {service} (use {', '.join(SERVICES)})")
+        self.index = index
+        self.service = service
+        self.client_ids = [client_number(client["client_id"]) for client in index.clients]
+        self.history_rows = [int(count) for count in index.client_offsets[1:] - index.client_offsets[:-1]]
+        self.total_rows = len(index)
+        self.mock_positions = {client["client_id"]: position for position, client in enumerate(index.clients)}
+        self._specs = {}
+        self._window_rows = {}
+        if service == "api":
+            # getAllBackups percorre os clientes de listarStatusClientes(): só os que têm backups
+            self.all_history_keys = [f"backups-cliente-{self.client_ids[position]}"
+                                     for position, rows in enumerate(self.history_rows) if rows]
+            self.history_row_bytes = self._history_row_bytes()
+        else:
+            self.mock_row_bytes = self._mock_row_bytes()
+
+    def keys(self, action, position=None, days=30):
+        """Chaves consultadas, na ordem das chamadas, por uma atualização do dashboard ou uma consulta de cliente"""
+        if self.service == "api":
+            # getTimeline -> getAllBackups: listarStatusClientes() e listarBackupsPorCliente de cada cliente
+            timeline = ["clientes-status-all-30", *self.all_history_keys]
+            if action == "refresh":
+                # loadData: getClientsWithBackupStatusProgressive, getStats + getTimeline e, por fim, loadBackupData
+                return ["clientes-lista", f"indicadores-{days}", *timeline, f"clientes-status-all-{days}"]
+            # ClientBackupModal: getByClientId (histórico + listarStatusClientes()) e getTimeline
+            return [f"backups-cliente-{self.client_ids[position]}", "clientes-status-all-30", *timeline]
+        if action == "refresh":
+            return ["clients", "clients-with-backup-status", "backup-stats", f"timeline-{days}"]
+        return [f"backups-client-{self.index.clients[position]['client_id']}", f"timeline-{days}"]
+
+    def spec(self, key):
+        """(tipo, bytes, linhas lidas, dependências) de uma chave; as dependências são consultadas no cache antes de carregar"""
+        spec = self._specs.get(key)
+        if spec is None:
+            kind, suffix = split_key(key)
+            spec = self._specs[key] = (kind, *self._load(kind, suffix))
+        return spec
+
+    def _load(self, kind, suffix):
+        index = self.index
+        clients = len(index.clients)
+        if kind == "backups-cliente":
+            rows = self.history_rows[index.positions[int(suffix)]]
+            return rows * self.history_row_bytes, rows, ()
+        if kind == "clientes-lista":
+            return json_size(index.clients_list()), clients, ()
+        if kind == "indicadores":
+            return json_size(index.indicators(int(suffix))), self._window(int(suffix)), ()
+        if kind == "clientes-status-all":
+            # Janela de `dias` mais o último backup de cada cliente
+            return json_size(index.client_statuses(None, int(suffix))), self._window(int(suffix)) + len(self.all_history_keys), ()
+
+        # api-mock.ts: readCSV dos arquivos e filtros sobre a lista inteira de backups
+        if kind == "backups":
+            return self.total_rows * self.mock_row_bytes, self.total_rows, ()
+        if kind == "clients":
+            return json_size(self._mock_clients()), clients, ()
+        if kind == "backups-client":
+            return self.history_rows[self.mock_positions[suffix]] * self.mock_row_bytes, self.total_rows, ("backups",)
+        if kind == "backup-stats":
+            return json_size({"successful": 0, "failed": 0, "total": self.total_rows, "successRate": 100.0}), self.total_rows, ("backups",)
+        if kind == "timeline":
+            days = int(suffix)
+            successful, total = index.count_window(days)
+            point = {"date": "2024-01-01", "successful": successful // days, "failed": (total - successful) // days}
+            return (days + 1) * json_size(point), self.total_rows, ("backups",)
+        if kind == "clients-with-backup-status":
+            # clients.map(c => backups.filter(...)): cada cliente percorre a lista inteira de backups
+            extra = json_size({"lastBackup": "2024-01-01 00:00:00", "successRate": 99.9})
+            return json_size(self._mock_clients()) + clients * extra, clients * self.total_rows, ("clients", "backups")
+        raise ValueError(f"Chave de cache desconhecida: {kind}")
+
+    def _window(self, days):
+        if days not in self._window_rows:
+            self._window_rows[days] = self.index.count_window(days)[1]
+        return self._window_rows[days]
+
+    def _sample_positions(self):
+        """Clientes com backups espalhados pelo clients.csv, para amostrar tamanhos de resposta"""
+        positions = [position for position, rows in enumerate(self.history_rows) if rows]
+        step = max(1, len(positions) // HISTORY_SAMPLE_CLIENTS)
+        return positions[::step][:HISTORY_SAMPLE_CLIENTS]
+
+    def _history_row_bytes(self):
+        """Bytes médios de um BackupHistoricoDTO, pela resposta de /api/dashboard/backup/cliente/{id} de uma amostra"""
+        size = rows = 0
+        for position in self._sample_positions():
+            size += json_size(self.index.backup_history(self.client_ids[position]))
+            rows += self.history_rows[position]
+        return size / rows if rows else 0.0
+
+    def _mock_row_bytes(self):
+        """Bytes médios de um Backup do backup.csv (readCSV) em uma amostra de linhas"""
+        index = self.index
+        size = rows = 0
+        for position in self._sample_positions():
+            start = int(index.client_offsets[position])
+            for row in range(start, min(start + 20, int(index.client_offsets[position + 1]))):
+                size += json_size(format_backup(
+                    int(index.backup_id[row]), index.clients[position], int(index.timestamp[row]) + index.epoch,
+                    bool(index.success[row]), int(index.duration_seconds[row]), round(float(index.size_gb[row]), 2)
+                ))
+                rows += 1
+        return size / rows if rows else 0.0
+
+    def _mock_clients(self):
+        return [{name: value for name, value in client.items() if name != "id"} for client in self.index.clients]
+
+def zipf_sampler(num_clients, exponent, rng):
+    """Sorteio Zipf das posições dos clientes: o k-ésimo mais popular tem peso 1/k^s (a ordem de popularidade é sorteada)"""
+    positions = list(range(num_clients))
+    rng.shuffle(positions)
+    return CategoricalSampler(positions, [1.0 / rank ** exponent for rank in range(1, num_clients + 1)])
+
+def generate_trace(num_clients, users=5, duration=3600, refresh=DASHBOARD_REFRESH_SECONDS, lookups_per_minute=2.0,
+                   zipf=1.1, periods=DASHBOARD_PERIODS, seed=0):
+    """Trace de acessos (segundos, usuário, ação, posição do cliente, dias) de `users` abas com o dashboard aberto
+
+    Cada aba escolhe um período, carrega o dashboard ao abrir e a cada `refresh` segundos (auto refresh) e abre o
+    histórico de clientes sorteados por Zipf em chegadas de Poisson de `lookups_per_minute` por minuto.
+    """
+    rng = random.Random(seed)
+    clients = zipf_sampler(num_clients, zipf, rng)
+    trace = []
+    for user in range(users):
+        days = rng.choice(periods)
+        moment = rng.uniform(0, refresh)
+        while moment < duration:
+            trace.append((moment, user, "refresh", None, days))
+            moment += refresh
+        if lookups_per_minute > 0:
+            moment = rng.expovariate(lookups_per_minute / 60)
+            while moment < duration:
+                trace.append((moment, user, "lookup", clients.draw(rng), days))
+                moment += rng.expovariate(lookups_per_minute / 60)
+    trace.sort(key=lambda event: event[:2])
+    return trace
+
+def replay(trace, workload, cache_factory, shared=False, phase=None):
+    """Reproduz o trace com um cache por aba (ou um só, com shared) e devolve o resumo da política"""
+    caches = {}
+    hits = Counter()
+    misses = Counter()
+    rows_scanned = Counter()
+
+    def access(cache, key, now):
+        if cache.get(key, now):
+            hits[workload.spec(key)[0]] += 1
+            return
+        kind, size, rows, dependencies = workload.spec(key)
+        for dependency in dependencies:
+            access(cache, dependency, now)
+        misses[kind] += 1
+        rows_scanned[kind] += rows
+        cache.put(key, size, now)
+
+    for moment, user, action, position, days in trace:
+        owner = 0 if shared else user
+        cache = caches.get(owner)
+        if cache is None:
+            cache = caches[owner] = cache_factory()
+        for key in workload.keys(action, position, days):
+            access(cache, key, moment)
+        if phase is not None:
+            phase.advance()
+
+    accesses = sum(hits.values()) + sum(misses.values())
+    kinds = sorted(set(hits) | set(misses))
+    return {
+        "accesses": accesses,
+        "hits": sum(hits.values()),
+        "hit_rate": round(sum(hits.values()) / accesses, 4) if accesses else None,
+        "backend_requests": sum(misses.values()),
+        "rows_scanned": sum(rows_scanned.values()),
+        "caches": len(caches),
+        "peak_mb_per_cache": round(max((cache.peak_bytes for cache in caches.values()), default=0) / MB, 2),
+        "final_mb": round(sum(cache.bytes for cache in caches.values()) / MB, 2),
+        "peak_entries_per_cache": max((cache.peak_entries for cache in caches.values()), default=0),
+        "evictions": sum(cache.evictions for cache in caches.values()),
+        "by_kind": {
+            kind: {
+                "hits": hits[kind],
+                "misses": misses[kind],
+                "hit_rate": round(hits[kind] / (hits[kind] + misses[kind]), 4),
+                "rows_scanned": rows_scanned[kind]
+            }
+            for kind in kinds
+        }
+    }
+
+def print_results(results):
+    """Imprime a tabela de políticas"""
+    print(f"\n📊 {'política':<24} {'acessos':>11} {'hit %':>7} {'backend':>9} {'linhas lidas':>15} "
+          f"{'pico/aba MB':>12} {'final MB':>10} {'despejos':>9}")
+    for policy, result in results.items():
+        print(f"   {policy:<24} {result['accesses']:>11,} {(result['hit_rate'] or 0) * 100:>7.1f} {result['backend_requests']:>9,} "
+              f"{result['rows_scanned']:>15,} {result['peak_mb_per_cache']:>12,.1f} {result['final_mb']:>10,.1f} {result['evictions']:>9,}")
+
+def parse_periods(value):
+    periods = [int(period) for period in value.split(",")]
+    if not periods or min(periods) <= 0:
+        raise argparse.ArgumentTypeError("os períodos devem ser dias positivos, ex.: 7,30,90")
+    return periods
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula o cache de dados do dashboard (getCachedData) com traces de acesso "
+                                                 "sobre os dados gerados e compara políticas TTL, LRU e por tamanho")
+    parser.add_argument("--clients", default="data/clients.csv", help="CSV de clientes do gerador (padrão: data/clients.csv)")
+    parser.add_argument("--backups", default="data/backup.csv",
+                        help="Backups do gerador, em qualquer formato aceito pelo mock_api_server (padrão: data/backup.csv)")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="Data de referência das janelas de `dias` (padrão: o último backup do dataset)")
+    parser.add_argument("--service", choices=SERVICES, default="api",
+                        help="api: chaves do ApiService (src/services/api.ts, padrão); mock: chaves do fallback de api-mock.ts")
+    parser.add_argument("--policy", action="append", default=None,
+                        help="Política de cache: ttl=SEGUNDOS, entries=N (LRU) ou mb=N (LRU por tamanho), combináveis com "
+                             "vírgula; repita para comparar (padrão: " + " | ".join(DEFAULT_POLICIES) + ")")
+    parser.add_argument("--users", type=int, default=5, help="Abas com o dashboard aberto, cada uma com o seu cache (padrão: 5)")
+    parser.add_argument("--shared", action="store_true", help="Um cache só para todas as abas (ex.: cache no servidor)")
+    parser.add_argument("--duration", type=float, default=60, help="Minutos simulados (padrão: 60)")
+    parser.add_argument("--refresh", type=float, default=DASHBOARD_REFRESH_SECONDS,
+                        help="Segundos entre atualizações do dashboard (padrão: 30, o auto refresh)")
+    parser.add_argument("--lookups-per-minute", type=float, default=2.0,
+                        help="Históricos de cliente abertos por minuto em cada aba (padrão: 2)")
+    parser.add_argument("--zipf", type=float, default=1.1,
+                        help="Expoente da popularidade dos clientes consultados (padrão: 1.1; 0 = uniforme)")
+    parser.add_argument("--periods", type=parse_periods, default=DASHBOARD_PERIODS,
+                        help="Períodos (dias) sorteados para as abas (padrão: 7,30,90)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do trace (padrão: 0)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON para salvar o resultado")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    if args.users < 1 or args.duration <= 0 or args.refresh <= 0 or args.lookups_per_minute < 0 or args.zipf < 0:
+        parser.error("--users, --duration e --refresh devem ser positivos; --lookups-per-minute e --zipf, não negativos")
+    try:
+        policies = {spec: parse_policy(spec) for spec in args.policy or DEFAULT_POLICIES}
+    except ValueError as error:
+        parser.error(str(error))
+
+    print(f"Carregando {args.clients} e {args.backups}...")
+    started = time.perf_counter()
+    try:
+        index = build_index(args.clients, args.backups, args.now)
+    except RuntimeError as error:
+        sys.exit(f"❌ {error}")
+    workload = DashboardWorkload(index, args.service)
+    print(f"✅ {len(index.clients):,} clientes e {len(index):,} backups indexados em {time.perf_counter() - started:.1f}s")
+
+    instrumentation = instrumentation_from_args(args)
+    instrumentation.start()
+    trace = generate_trace(len(index.clients), args.users, args.duration * 60, args.refresh, args.lookups_per_minute,
+                           args.zipf, args.periods, args.seed)
+    refreshes = sum(1 for event in trace if event[2] == "refresh")
+    print(f"🧭 Trace: {len(trace):,} eventos ({refreshes:,} atualizações, {len(trace) - refreshes:,} históricos) "
+          f"de {args.users} abas em {args.duration:g} min, serviço {args.service}")
+
+    results = {}
+    for policy, cache_factory in policies.items():
+        with instrumentation.phase(f"política {policy}", total=len(trace)) as phase:
+            results[policy] = replay(trace, workload, cache_factory, args.shared, phase)
+    instrumentation.finish()
+    print_results(results)
+
+    if args.output:
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "clients": len(index.clients),
+            "backups": len(index),
+            "service": args.service,
+            "users": args.users,
+            "shared": args.shared,
+            "duration_minutes": args.duration,
+            "refresh_seconds": args.refresh,
+            "lookups_per_minute": args.lookups_per_minute,
+            "zipf": args.zipf,
+            "periods": args.periods,
+            "seed": args.seed,
+            "events": len(trace),
+            "policies": results
+        }
+        with open(args.output, "w", encoding="utf-8") as jsonfile:
+            json.dump(report, jsonfile, indent=2)
+        print(f"\n💾 Resultado salvo em {args.output}")
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def run_generator(tmp_path):
+    """Roda o generate_large_dataset.py em um diretório próprio; devolve a pasta data/ gerada
+
+    O cache de saídas fica em tmp_path/cache e só é usado com cache=True.
+    """
+    env = dict(os.environ, BACKUP_GENERATOR_CACHE=str(tmp_path / 'cache'))
+
+    def run(name, *argv, cache=False):
+        directory = tmp_path / name
+        (directory / 'data').mkdir(parents=True, exist_ok=True)
+        argv = [*map(str, argv)] + ([] if cache else ['--no-cache'])
+        subprocess.run([sys.executable, os.path.join(HERE, 'generate_large_dataset.py'), *argv],
+                       cwd=directory, env=env, check=True, capture_output=True)
+        return directory / 'data'
+    return run
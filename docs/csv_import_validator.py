@@ -0,0 +1,300 @@
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from backup_generator.cnpj import is_valid_cnpj
+from generator_instrumentation import GeneratorInstrumentation, add_instrumentation_arguments, instrumentation_from_args
+
+# Colunas do CsvRow (src/lib/csvProcessor.ts), nesta ordem
+CSV_FIELDS = ['id', 'nome', 'email', 'cnpj', 'ativo', 'dataInclusao', 'backups']
+
+# Mesmas expressões do validateProcessedData
+EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+CNPJ_PATTERN = re.compile(r'^\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}$')
+
+BACKUP_STATUSES = ('SUCESSO', 'FALHA')
+
+# Mensagens de erro guardadas por extenso no relatório (as demais só entram nas contagens e no errors.csv)
+MAX_REPORTED_ERRORS = 1000
+
+def parse_csv_row(row, row_number):
+    """Equivalente ao parseCsvRow, mas devolvendo os erros em vez de descartar backups inválidos"""
+    errors = []
+    backups = []
+    if row['backups'] and row['backups'].strip():
+        try:
+            backups = json.loads(row['backups'])
+        except ValueError:
+            errors.append((row_number, 'backups_json', "Backups com JSON inválido"))
+            backups = []
+        if not isinstance(backups, list):
+            errors.append((row_number, 'backups_json', "Backups devem ser uma lista JSON"))
+            backups = []
+
+    cliente_id = None
+    if backups:
+        try:
+            cliente_id = int(row['id'])
+        except ValueError:
+            errors.append((row_number, 'cliente_id', f"ID do cliente inválido: {row['id']!r}"))
+
+    backup_requests = []
+    for position, backup in enumerate(backups, 1):
+        if not isinstance(backup, dict):
+            errors.append((row_number, 'backup_formato', f"Backup {position}: esperado um objeto JSON"))
+            continue
+        backup_errors = _backup_errors(backup, position)
+        if backup_errors:
+            errors.extend((row_number, code, message) for code, message in backup_errors)
+            continue
+
+        # Campos ausentes ficam de fora, como os undefined do JSON.stringify
+        request = {
+            'clienteId': cliente_id,
+            'status': backup['status'],
+            'mensagem': backup.get('mensagem') or '',
+            'vacuumExecutado': backup.get('vacuumExecutado') or False,
+            'tamanhoEmMb': backup.get('tamanhoEmMb') or 0
+        }
+        for field in ('vacuumDataExecucao', 'dataInicio', 'dataFim'):
+            if backup.get(field):
+                request[field] = backup[field]
+        backup_requests.append(request)
+
+    client = {
+        'nome': row['nome'],
+        'email': row['email'],
+        'cnpj': row['cnpj'],
+        'ativo': row['ativo'].lower() == 'true',
+        'dataInclusao': row['dataInclusao'],
+        'backups': backup_requests
+    }
+    return client, errors
+
+def _backup_errors(backup, position):
+    """Regras de um backup embutido: status SUCESSO/FALHA, tamanho numérico e datas ISO"""
+    errors = []
+    if backup.get('status') not in BACKUP_STATUSES:
+        errors.append(('backup_status', f"Backup {position}: status inválido ({backup.get('status')!r}, esperado SUCESSO ou FALHA)"))
+    size = backup.get('tamanhoEmMb')
+    if size is not None and (isinstance(size, bool) or not isinstance(size, (int, float)) or size < 0):
+        errors.append(('backup_tamanho', f"Backup {position}: tamanhoEmMb deve ser um número não negativo"))
+    for field in ('dataInicio', 'dataFim', 'vacuumDataExecucao'):
+        value = backup.get(field)
+        if value:
+            try:
+                datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                errors.append(('backup_data', f"Backup {position}: {field} não é uma data ISO ({value!r})"))
+    return errors
+
+def validate_processed_client(client, row_number):
+    """Mesmas regras do validateProcessedData, mais os dígitos verificadores do CNPJ"""
+    errors = []
+    if not client['nome'].strip():
+        errors.append((row_number, 'nome_obrigatorio', "Nome do cliente é obrigatório"))
+    if not client['email'].strip():
+        errors.append((row_number, 'email_obrigatorio', "Email do cliente é obrigatório"))
+    if not client['cnpj'].strip():
+        errors.append((row_number, 'cnpj_obrigatorio', "CNPJ do cliente é obrigatório"))
+    if not client['dataInclusao'].strip():
+        errors.append((row_number, 'data_inclusao_obrigatoria', "Data de inclusão é obrigatória"))
+
+    if client['email'] and not EMAIL_PATTERN.match(client['email']):
+        errors.append((row_number, 'email_invalido', "Email inválido"))
+
+    if client['cnpj']:
+        if not CNPJ_PATTERN.match(client['cnpj']):
+            errors.append((row_number, 'cnpj_formato', "CNPJ inválido (formato esperado: XX.XXX.XXX/XXXX-XX)"))
+        elif not is_valid_cnpj(client['cnpj']):
+            errors.append((row_number, 'cnpj_digitos', "CNPJ inválido (dígitos verificadores não conferem)"))
+    return errors
+
+def validate_chunk(chunk):
+    """Valida um bloco de linhas do CSV (roda nos processos do pool)
+
+    Devolve os payloads válidos já serializados em JSON, os erros (linha, código, mensagem),
+    o total de linhas e o total de backups aceitos.
+    """
+    first_row, text = chunk
+    payloads = []
+    errors = []
+    rows = 0
+    backups = 0
+    for row_number, values in enumerate(csv.reader(io.StringIO(text)), first_row):
+        rows += 1
+        # Como o processCsvData: valores aparados e colunas ausentes vazias (backups vira '[]')
+        values = [value.strip() for value in values] + [''] * (len(CSV_FIELDS) - len(values))
+        row = dict(zip(CSV_FIELDS, values))
+        row['backups'] = row['backups'] or '[]'
+
+        client, row_errors = parse_csv_row(row, row_number)
+        row_errors.extend(validate_processed_client(client, row_number))
+        if row_errors:
+            errors.extend(row_errors)
+            continue
+        payloads.append(json.dumps(client, ensure_ascii=False))
+        backups += len(client['backups'])
+    return payloads, errors, rows, backups
+
+def iter_row_chunks(csvfile, chunk_rows=10000):
+    """Agrupa as linhas do CSV em blocos de texto (primeira linha, texto) sem quebrar campos entre aspas"""
+    header = next(csv.reader([csvfile.readline()]), [])
+    if [field.strip() for field in header] != CSV_FIELDS:
+        raise ValueError(f"Cabeçalho inesperado: {header} (esperado: {','.join(CSV_FIELDS)})")
+
+    lines = []
+    rows = 0
+    first_row = 1
+    pending = ''
+    for line in csvfile:
+        # Um número ímpar de aspas deixa um campo aberto: a quebra de linha faz parte do valor
+        pending += line
+        if pending.count('"') % 2:
+            continue
+        if pending.strip():
+            lines.append(pending)
+            rows += 1
+        pending = ''
+        if rows >= chunk_rows:
+            yield first_row, ''.join(lines)
+            first_row += rows
+            lines = []
+            rows = 0
+    if pending.strip():
+        lines.append(pending)
+        rows += 1
+    if lines:
+        yield first_row, ''.join(lines)
+
+def _run_chunks(chunks, workers):
+    """Valida os blocos em ordem; com workers > 1 mantém só alguns blocos em voo por processo"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield validate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(validate_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def validate_csv(filename, output_dir, workers=None, chunk_rows=10000, batch_size=100, instrumentation=None):
+    """Valida o CSV inteiro e grava payloads.jsonl (um lote por linha), errors.csv e report.json"""
+    if instrumentation is None:
+        instrumentation = GeneratorInstrumentation()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    payloads_path = os.path.join(output_dir, 'payloads.jsonl')
+    errors_path = os.path.join(output_dir, 'errors.csv')
+    report_path = os.path.join(output_dir, 'report.json')
+
+    total_rows = 0
+    total_backups = 0
+    valid_rows = 0
+    batches = 0
+    invalid_rows = set()
+    error_counts = Counter()
+    reported_errors = []
+    batch = []
+    started = time.perf_counter()
+
+    with open(filename, newline='', encoding='utf-8-sig') as csvfile, \
+            open(payloads_path, 'w', encoding='utf-8') as payloads_file, \
+            open(errors_path, 'w', newline='', encoding='utf-8') as errors_file:
+        errors_writer = csv.writer(errors_file)
+        errors_writer.writerow(['row', 'code', 'message'])
+
+        def flush(batch):
+            # Cada linha é um lote pronto para o upload: um array JSON de ProcessedClient
+            payloads_file.write('[' + ','.join(batch) + ']\n')
+
+        results = _run_chunks(iter_row_chunks(csvfile, chunk_rows), workers)
+        with instrumentation.phase("validação do CSV") as phase:
+            for payloads, errors, rows, backups in results:
+                total_rows += rows
+                total_backups += backups
+                valid_rows += len(payloads)
+                phase.advance(rows)
+
+                errors_writer.writerows(errors)
+                for row_number, code, message in errors:
+                    invalid_rows.add(row_number)
+                    error_counts[code] += 1
+                    if len(reported_errors) < MAX_REPORTED_ERRORS:
+                        reported_errors.append(f"Linha {row_number}: {message}")
+
+                for payload in payloads:
+                    batch.append(payload)
+                    if len(batch) >= batch_size:
+                        flush(batch)
+                        batches += 1
+                        batch = []
+            if batch:
+                flush(batch)
+                batches += 1
+
+    seconds = time.perf_counter() - started
+    # Campos do generateProcessingReport, mais as contagens por regra e a vazão
+    report = {
+        'totalRows': total_rows,
+        'processedClients': valid_rows,
+        'totalBackups': total_backups,
+        'invalidRows': len(invalid_rows),
+        'successRate': round(valid_rows / total_rows * 100, 2) if total_rows else 0,
+        'errorCounts': dict(error_counts.most_common()),
+        'errors': reported_errors,
+        'errorsTruncated': sum(error_counts.values()) > len(reported_errors),
+        'batches': batches,
+        'batchSize': batch_size,
+        'seconds': round(seconds, 3),
+        'rowsPerSecond': round(total_rows / seconds) if seconds > 0 else None
+    }
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2, ensure_ascii=False)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Valida um CSV de importação (schema CsvRow do csvProcessor.ts) em paralelo e gera os lotes de upload"
+    )
+    parser.add_argument("csv", help="Arquivo CSV com as colunas " + ",".join(CSV_FIELDS))
+    parser.add_argument("--output-dir", default="data/import",
+                        help="Diretório de saída: payloads.jsonl, errors.csv e report.json (padrão: data/import)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos de validação (padrão: número de CPUs; 1 valida no próprio processo)")
+    parser.add_argument("--chunk-rows", type=int, default=10000,
+                        help="Linhas por bloco enviado a cada processo (padrão: 10000)")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Clientes por lote de payload, uma linha do payloads.jsonl (padrão: 100)")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    instrumentation = instrumentation_from_args(args)
+    instrumentation.start()
+    try:
+        report = validate_csv(args.csv, args.output_dir, args.workers, args.chunk_rows, args.batch_size, instrumentation)
+    except ValueError as error:
+        parser.error(str(error))
+    instrumentation.finish()
+
+    print(f"\n✅ {report['totalRows']:,} linhas validadas em {report['seconds']:.2f}s ({report['rowsPerSecond'] or 0:,} linhas/s)")
+    print(f"📊 Clientes válidos: {report['processedClients']:,} ({report['successRate']}%)")
+    print(f"📊 Backups aceitos: {report['totalBackups']:,}")
+    print(f"📦 Lotes de {report['batchSize']}: {report['batches']:,}")
+    if report['errorCounts']:
+        print(f"\n⚠️  Linhas com erro: {report['invalidRows']:,}")
+        for code, count in report['errorCounts'].items():
+            print(f"   {code}: {count:,}")
+    print(f"\n🎯 Arquivos gerados em {args.output_dir}: payloads.jsonl, errors.csv, report.json")
@@ -1,389 +1,1934 @@
+import argparse
 import csv
+import heapq
+import json
 import random
+import shutil
+import sqlite3
+import struct
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import groupby, islice
+from operator import itemgetter
 import os
 
-# Lista de nomes de empresas para gerar clientes realistas
-company_names = [
-    "Soluções Empresariais", "Tech Solutions", "Inovação Digital", "Sistemas Integrados", "DataGuard Brasil",
-    "Cloud Masters", "Alpha Data Center", "Beta Solutions", "Digital Systems", "TechCorp Brasil",
-    "Inovação Tech", "DataFlow Solutions", "CloudTech Brasil", "SecureData", "InfoSystems",
-    "TechBridge Corp", "DataVault Brasil", "CloudFirst", "TechNova Solutions", "DataCore Systems",
-    "Inovação Data", "TechFlow Corp", "CloudSecure", "DataTech Brasil", "TechInnovate",
-    "CloudBridge Solutions", "DataStream Corp", "TechVault", "CloudData Systems", "DataInnovate",
-    "TechMax", "DataPro", "CloudPro", "TechCore", "DataCore", "CloudMax", "TechFlow", "DataFlow",
-    "CloudTech", "TechData", "DataTech", "CloudData", "TechCloud", "DataCloud", "CloudFlow",
-    "TechStream", "DataStream", "CloudStream", "TechBridge", "DataBridge", "CloudBridge",
-    "TechVault", "DataVault", "CloudVault", "TechSecure", "DataSecure", "CloudSecure",
-    "TechFirst", "DataFirst", "CloudFirst", "TechNova", "DataNova", "CloudNova",
-    "TechInnovate", "DataInnovate", "CloudInnovate", "TechDigital", "DataDigital", "CloudDigital",
-    "TechSystems", "DataSystems", "CloudSystems", "TechCorp", "DataCorp", "CloudCorp",
-    "TechLabs", "DataLabs", "CloudLabs", "TechWorks", "DataWorks", "CloudWorks",
-    "TechGroup", "DataGroup", "CloudGroup", "TechTeam", "DataTeam", "CloudTeam",
-    "TechPartners", "DataPartners", "CloudPartners", "TechAlliance", "DataAlliance", "CloudAlliance",
-    "TechNetwork", "DataNetwork", "CloudNetwork", "TechConnect", "DataConnect", "CloudConnect",
-    "TechLink", "DataLink", "CloudLink", "TechHub", "DataHub", "CloudHub",
-    "TechCenter", "DataCenter", "CloudCenter", "TechBase", "DataBase", "CloudBase",
-    "TechZone", "DataZone", "CloudZone", "TechSpace", "DataSpace", "CloudSpace",
-    "TechPlace", "DataPlace", "CloudPlace", "TechSpot", "DataSpot", "CloudSpot",
-    "TechPoint", "DataPoint", "CloudPoint", "TechNode", "DataNode", "CloudNode",
-    "TechGrid", "DataGrid", "CloudGrid", "TechWeb", "DataWeb", "CloudWeb",
-    "TechNet", "DataNet", "CloudNet", "TechMesh", "DataMesh", "CloudMesh",
-    "TechFabric", "DataFabric", "CloudFabric", "TechMatrix", "DataMatrix", "CloudMatrix",
-    "TechArray", "DataArray", "CloudArray", "TechVector", "DataVector", "CloudVector",
-    "TechScalar", "DataScalar", "CloudScalar", "TechTensor", "DataTensor", "CloudTensor",
-    "TechQuantum", "DataQuantum", "CloudQuantum", "TechNeural", "DataNeural", "CloudNeural",
-    "TechAI", "DataAI", "CloudAI", "TechML", "DataML", "CloudML",
-    "TechDL", "DataDL", "CloudDL", "TechNN", "DataNN", "CloudNN",
-    "TechGPU", "DataGPU", "CloudGPU", "TechCPU", "DataCPU", "CloudCPU",
-    "TechRAM", "DataRAM", "CloudRAM", "TechSSD", "DataSSD", "CloudSSD",
-    "TechHDD", "DataHDD", "CloudHDD", "TechNVMe", "DataNVMe", "CloudNVMe",
-    "TechSATA", "DataSATA", "CloudSATA", "TechPCIe", "DataPCIe", "CloudPCIe",
-    "TechUSB", "DataUSB", "CloudUSB", "TechThunderbolt", "DataThunderbolt", "CloudThunderbolt",
-    "TechEthernet", "DataEthernet", "CloudEthernet", "TechWiFi", "DataWiFi", "CloudWiFi",
-    "TechBluetooth", "DataBluetooth", "CloudBluetooth", "TechNFC", "DataNFC", "CloudNFC",
-    "TechRFID", "DataRFID", "CloudRFID", "TechGPS", "DataGPS", "CloudGPS",
-    "TechLTE", "DataLTE", "CloudLTE", "Tech5G", "Data5G", "Cloud5G",
-    "Tech4G", "Data4G", "Cloud4G", "Tech3G", "Data3G", "Cloud3G",
-    "Tech2G", "Data2G", "Cloud2G", "TechGSM", "DataGSM", "CloudGSM",
-    "TechCDMA", "DataCDMA", "CloudCDMA", "TechTDMA", "DataTDMA", "CloudTDMA",
-    "TechFDMA", "DataFDMA", "CloudFDMA", "TechOFDMA", "DataOFDMA", "CloudOFDMA",
-    "TechMIMO", "DataMIMO", "CloudMIMO", "TechBeamforming", "DataBeamforming", "CloudBeamforming",
-    "TechMassive", "DataMassive", "CloudMassive", "TechSmall", "DataSmall", "CloudSmall",
-    "TechMacro", "DataMacro", "CloudMacro", "TechMicro", "DataMicro", "CloudMicro",
-    "TechPico", "DataPico", "CloudPico", "TechFemto", "DataFemto", "CloudFemto",
-    "TechNano", "DataNano", "CloudNano", "TechPico", "DataPico", "CloudPico",
-    "TechFemto", "DataFemto", "CloudFemto", "TechAtto", "DataAtto", "CloudAtto",
-    "TechZepto", "DataZepto", "CloudZepto", "TechYocto", "DataYocto", "CloudYocto"
-]
+# Sorteios de referência, cenários e estatísticas ficam no pacote backup_generator (sem numpy);
+# os nomes são reexportados aqui para os scripts que usam generate_large_dataset como módulo
+from backup_generator.cnpj import generate_cnpj
+from backup_generator.core import (
+    BACKUP_FIELDNAMES, COLUMNAR_FORMATS, DATABASE_OUTPUTS, DEFAULT_SCENARIO, DEFAULT_SCHEDULE, EPOCH, FREQUENCY_DAYS,
+    JOIN_DATE, PARTITION_MODES, SAMPLING_MODES, build_clients_with_stats, client_last_day, client_random,
+    client_schedule, compute_client_stats, day_factors, derive_seed, draw_backup, epoch_seconds, format_backup,
+    generate_backup_data, generate_clients, iter_backup_data, iter_backup_values, load_scenario, normalize_scenario,
+    resolve_client_list, scenario_clients, schedule_is_modeled, update_client_stats,
+)
+from backup_generator.partitions import PARTITION_DIR, PartitionWriter, iter_partition_rows
+from backup_generator.text_output import COMPRESSIONS, CRLF, TextOutput, compressed_name, csv_field, csv_line, open_text_input
+from generator_cache import add_cache_arguments, cache_from_args, cache_key, release, source_digest
+from generator_instrumentation import GeneratorInstrumentation, add_instrumentation_arguments, instrumentation_from_args
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: só o motor colunar depende dele
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow é opcional: só as saídas Parquet/Arrow dependem dele
+    pa = None
+    pq = None
+
+class BackupRecords:
+    """Backups em estrutura de arrays (~25 bytes por linha), formatados como texto só na saída"""
+
+    __slots__ = ("client_index", "timestamp", "success", "duration_seconds", "size_gb")
+
+    def __init__(self):
+        # Mesmas colunas (e tipos) do motor NumPy; o cliente é referenciado pelo índice em clients
+        self.client_index = array("i")
+        self.timestamp = array("q")
+        self.success = array("b")
+        self.duration_seconds = array("i")
+        self.size_gb = array("d")
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def extend(self, values):
+        """Acrescenta tuplas de iter_backup_values, na ordem de geração (backup_id = posição + 1)"""
+        client_index = self.client_index.append
+        timestamp = self.timestamp.append
+        success = self.success.append
+        duration_seconds = self.duration_seconds.append
+        size_gb = self.size_gb.append
+        for client, moment, is_success, duration, size in values:
+            client_index(client)
+            timestamp(moment)
+            success(is_success)
+            duration_seconds(duration)
+            size_gb(size)
+
+    def columns(self):
+        """As colunas como arrays NumPy, sem cópia"""
+        if np is None:
+            raise RuntimeError("As colunas NumPy requerem numpy (pip install numpy)")
+        return {
+            "client_index": np.frombuffer(self.client_index, dtype=np.int32),
+            "timestamp": np.frombuffer(self.timestamp, dtype=np.int64),
+            "success": np.frombuffer(self.success, dtype=np.int8).view(bool),
+            "duration_seconds": np.frombuffer(self.duration_seconds, dtype=np.int32),
+            "size_gb": np.frombuffer(self.size_gb, dtype=np.float64),
+        }
+
+    def date_order(self):
+        """Posições ordenadas por data, com empates na ordem de geração"""
+        if np is not None:
+            return date_order(self.columns()["timestamp"])
+        return sorted(range(len(self)), key=self.timestamp.__getitem__)
+
+    def iter_rows(self, clients, order=None, batch_size=100000, id_digits=6):
+        """Formata os backups como linhas de dicionário, na ordem informada (em lotes, sem cópia do todo)"""
+        if np is not None:
+            columns = self.columns()
+            order = np.arange(len(self)) if order is None else np.asarray(order)
+            for first in range(0, len(order), batch_size):
+                yield from backup_columns_to_rows(columns, clients, order[first:first + batch_size], id_digits=id_digits)
+            return
+        for position in range(len(self)) if order is None else order:
+            yield format_backup(
+                position + 1, clients[self.client_index[position]], self.timestamp[position],
+                self.success[position], self.duration_seconds[position], self.size_gb[position], id_digits
+            )
+
+    def iter_lines(self, clients, order=None, batch_size=100000, id_digits=6):
+        """Formata os backups direto como linhas do backup.csv, na ordem informada (sem dicionários)"""
+        if np is not None:
+            yield from iter_backup_column_lines(self.columns(), clients, order, batch_size, id_digits)
+            return
+        prefixes = client_prefixes(clients)
+        for position in range(len(self)) if order is None else order:
+            client_index = self.client_index[position]
+            yield backup_line(format_backup(
+                position + 1, clients[client_index], self.timestamp[position],
+                self.success[position], self.duration_seconds[position], self.size_gb[position], id_digits
+            ), prefixes[client_index])
+
+    def client_stats(self, clients):
+        """Estatísticas por cliente direto das colunas, no formato de compute_client_stats"""
+        if np is not None:
+            return compute_client_stats_columns(self.columns(), clients)
+        
+        totals = [0] * len(clients)
+        successes = [0] * len(clients)
+        last_timestamps = [-1] * len(clients)
+        for client, moment, is_success in zip(self.client_index, self.timestamp, self.success):
+            totals[client] += 1
+            successes[client] += is_success
+            if moment > last_timestamps[client]:
+                last_timestamps[client] = moment
+        
+        client_stats = {}
+        for client, total, successful, last_timestamp in zip(clients, totals, successes, last_timestamps):
+            if total == 0:
+                continue
+            client_stats[client["id"]] = {
+                'total_backups': total,
+                'successful_backups': successful,
+                'failed_backups': total - successful,
+                'last_backup_date': (EPOCH + timedelta(seconds=last_timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+            }
+        return client_stats
+
+def generate_backup_columns(clients, backups_per_client=400, rng=None, block_size=1024, seed=None, history_days=400, progress=None, scenario=None):
+    """Gera os backups em formato colunar (arrays NumPy), com as mesmas distribuições de generate_backup_data"""
+    blocks = []
+    for block in iter_backup_column_blocks(clients, backups_per_client, rng, block_size, seed, history_days, scenario):
+        blocks.append(block)
+        if progress is not None:
+            progress(len(block["timestamp"]))
+    if not blocks:
+        return {
+            "client_index": np.empty(0, dtype=np.int32),
+            "timestamp": np.empty(0, dtype=np.int64),
+            "success": np.empty(0, dtype=bool),
+            "duration_seconds": np.empty(0, dtype=np.int32),
+            "size_gb": np.empty(0, dtype=np.float64),
+        }
+
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+def iter_backup_column_blocks(clients, backups_per_client=400, rng=None, block_size=1024, seed=None, history_days=400, scenario=None):
+    """Gera as colunas de backup bloco a bloco de clientes (client_index é global)"""
+    if np is None:
+        raise RuntimeError("O motor colunar requer numpy (pip install numpy)")
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    if rng is None and seed is None:
+        rng = np.random.default_rng()
+
+    for first in range(0, len(clients), block_size):
+        block = clients[first:first + block_size]
+        if seed is None:
+            yield _draw_backup_schedules(block, first, rng, backups_per_client, history_days, scenario)
+        else:
+            # Cada cliente sorteia sua série com o próprio gerador: o resultado não depende de blocos ou shards
+            parts = [
+                _draw_backup_block([client], first + offset, np.random.default_rng(derive_seed(seed, "backups", client["id"])),
+                                   backups_per_client, history_days, scenario, client_schedule(client, scenario))
+                for offset, client in enumerate(block)
+            ]
+            yield {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+def _draw_backup_schedules(block, first, rng, backups_per_client, history_days, scenario):
+    """Sorteia um bloco separando os clientes por agenda e intercalando de volta na ordem dos clientes"""
+    groups = {}
+    for offset, client in enumerate(block):
+        groups.setdefault(id(client_schedule(client, scenario)), []).append(offset)
+    if len(groups) == 1:
+        return _draw_backup_block(block, first, rng, backups_per_client, history_days, scenario, client_schedule(block[0], scenario))
+
+    parts = []
+    for offsets in groups.values():
+        part = _draw_backup_block([block[offset] for offset in offsets], 0, rng, backups_per_client, history_days,
+                                  scenario, client_schedule(block[offsets[0]], scenario))
+        part["client_index"] = (np.asarray(offsets, dtype=np.int32) + first)[part["client_index"]]
+        parts.append(part)
+    merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    # Estável: dentro de cada cliente os dias continuam em ordem
+    order = np.argsort(merged["client_index"], kind="stable")
+    return {name: values[order] for name, values in merged.items()}
+
+def _draw_backup_block(block, first, rng, backups_per_client, history_days=400, scenario=None, schedule=None):
+    """Sorteia as séries de backup de um bloco de clientes com a mesma agenda (uma linha da matriz por cliente)"""
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    if schedule is None:
+        schedule = DEFAULT_SCHEDULE
+    start_date = scenario["start_date"]
+    start_epoch = epoch_seconds(start_date)
+
+    # Janela de dias (inclusiva) igual à do caminho de referência
+    num_days = history_days + 1
+    days = np.arange(num_days)
+    weekend = (start_date.weekday() + days) % 7 >= 5
+
+    rows = len(block)
+    shape = (rows, num_days)
+
+    last_day = np.array([client_last_day(c, scenario, history_days) for c in block])
+    success_rate = np.array([c["success_rate"] for c in block])
+    avg_size = np.array([c["avg_size"] for c in block])
+
+    # Só os dias da frequência; pular fins de semana com a probabilidade da agenda, como no caminho de referência
+    scheduled = days % FREQUENCY_DAYS[schedule["frequency"]] == 0
+    keep = scheduled & (days <= last_day[:, None]) & ~((rng.random(shape) < schedule["weekend_skip"]) & weekend)
+    keep &= np.cumsum(keep, axis=1) <= backups_per_client
+
+    # Horário: mesma cascata de sorteios do caminho de referência
+    # (padrão: 23h com 70%, madrugada com 0.3 * 0.9, 22h-23h no restante)
+    *windows, fallback = schedule["hours"]
+    draws = [rng.random(shape) for _ in windows]
+    choices = [_draw_hours(rng, window["hours"], shape) for window in schedule["hours"]]
+    hour = choices[-1]
+    for draw, window, choice in reversed(list(zip(draws, windows, choices))):
+        hour = np.where(draw < window["probability"], choice, hour)
+    hour = np.broadcast_to(hour, shape)  # uma faixa de uma hora só chega aqui como escalar
+    minute = rng.integers(0, 60, shape)
+
+    success_minutes = schedule["duration_minutes"]["success"]
+    failed_minutes = schedule["duration_minutes"]["failed"]
+    if schedule_is_modeled(schedule):
+        size_factors, failure_factors = (np.array(factors) for factors in day_factors(schedule, start_date, num_days))
+        is_success = _draw_modeled_success(rng.random(shape), keep, success_rate, schedule, failure_factors)
+        size = np.where(is_success, np.round(avg_size[:, None] * rng.uniform(*schedule["size_variation"], shape) * size_factors, 2), 0.0)
+    else:
+        is_success = rng.random(shape) < success_rate[:, None]
+        size = np.where(is_success, np.round(avg_size[:, None] * rng.uniform(*schedule["size_variation"], shape), 2), 0.0)
+    duration_minutes = np.where(is_success, rng.integers(success_minutes[0], success_minutes[1] + 1, shape),
+                                rng.integers(failed_minutes[0], failed_minutes[1] + 1, shape))
+    duration = duration_minutes * 60 + rng.integers(0, 60, shape)
+
+    # Seleção em ordem cliente a cliente, dia a dia (mesma ordem dos backup_id de referência)
+    block_rows, block_days = np.nonzero(keep)
+    return {
+        "client_index": (block_rows + first).astype(np.int32),
+        "timestamp": (start_epoch + block_days * 86400 + hour[keep] * 3600 + minute[keep] * 60).astype(np.int64),
+        "success": is_success[keep],
+        "duration_seconds": duration[keep].astype(np.int32),
+        "size_gb": size[keep],
+    }
+
+def _draw_modeled_success(draws, keep, success_rate, schedule, failure_factors):
+    """Versão vetorizada de failure_probability: todos os clientes do bloco avançam dia a dia juntos"""
+    failure = np.minimum(1.0, (1 - success_rate)[:, None] * failure_factors)
+    if schedule["failures"]["model"] != "markov":
+        return draws >= failure
+
+    burst_days = schedule["failures"]["burst_days"]
+    stay = 1 - 1 / burst_days
+    with np.errstate(divide="ignore", invalid="ignore"):
+        enter = np.where(failure >= 1, 1.0, np.minimum(1.0, failure / (burst_days * (1 - failure))))
+    failed = np.zeros(draws.shape, dtype=bool)
+    if draws.shape[0] < 16:
+        # Poucos clientes (blocos de um cliente com --seed): o laço em Python sai mais barato que numpy por dia
+        for row in range(draws.shape[0]):
+            failed_before = False
+            row_failed = []
+            for draw, enter_failure, kept in zip(draws[row].tolist(), enter[row].tolist(), keep[row].tolist()):
+                current = draw < (stay if failed_before else enter_failure)
+                row_failed.append(current)
+                if kept:
+                    failed_before = current
+            failed[row] = row_failed
+        return ~failed
+
+    failed_before = np.zeros(draws.shape[0], dtype=bool)
+    for day in range(draws.shape[1]):
+        failed[:, day] = draws[:, day] < np.where(failed_before, stay, enter[:, day])
+        # A cadeia só avança nos dias com backup de fato
+        failed_before = np.where(keep[:, day], failed[:, day], failed_before)
+    return ~failed
+
+def _draw_hours(rng, hours, shape):
+    """Horas sorteadas de uma faixa inclusiva (uma faixa de uma hora só não consome sorteios)"""
+    low, high = hours
+    if low == high:
+        return low
+    return rng.integers(low, high + 1, shape)
+
+def iter_backup_rows_columns(clients, backups_per_client=400, rng=None, block_size=1024, seed=None, history_days=400, scenario=None):
+    """Gera as linhas de backup a partir do motor colunar, um bloco de clientes por vez"""
+    first_backup_id = 1
+    id_digits = (scenario or DEFAULT_SCENARIO)["output"]["backup_id_digits"]
+    for columns in iter_backup_column_blocks(clients, backups_per_client, rng, block_size, seed, history_days, scenario):
+        yield from backup_columns_to_rows(columns, clients, first_backup_id=first_backup_id, id_digits=id_digits)
+        first_backup_id += len(columns["timestamp"])
+
+def date_order(timestamps):
+    """Ordem por data estável (empates na ordem de geração), sem o argsort estável sobre int64"""
+    if len(timestamps) == 0:
+        return np.arange(0)
+
+    # Empacota (segundos desde o primeiro backup, posição) em um único int64: as chaves ficam
+    # distintas, então o sort padrão (bem mais rápido que o estável) já dá a ordem estável
+    offsets = timestamps.astype(np.int64) - int(timestamps.min())
+    index_bits = (len(timestamps) - 1).bit_length()
+    if int(offsets.max()).bit_length() + index_bits > 63:
+        return np.argsort(timestamps, kind="stable")
+
+    keys = (offsets << index_bits) | np.arange(len(timestamps), dtype=np.int64)
+    keys.sort()
+    return keys & ((1 << index_bits) - 1)
+
+def backup_columns_to_rows(columns, clients, order=None, first_backup_id=1, id_digits=6):
+    """Converte as colunas do motor NumPy para o formato de dicionário usado nos CSVs"""
+    if order is None:
+        order = np.arange(len(columns["timestamp"]))
+
+    dates = np.datetime_as_string(columns["timestamp"][order].astype("datetime64[s]")).tolist()
+    client_index = columns["client_index"][order].tolist()
+    success = columns["success"][order].tolist()
+    duration_seconds = columns["duration_seconds"][order].tolist()
+    size_gb = columns["size_gb"][order].tolist()
+
+    for position, backup_index in enumerate(order.tolist()):
+        client = clients[client_index[position]]
+        minutes, seconds = divmod(duration_seconds[position], 60)
+        yield {
+            "backup_id": f"bkp_{backup_index + first_backup_id:0{id_digits}d}",
+            "client_id": client["id"],
+            "client_name": client["name"],
+            "date": dates[position].replace("T", " "),
+            "status": "success" if success[position] else "failed",
+            "duration": f"{minutes:02d}:{seconds:02d}",
+            "size": f"{size_gb[position]} GB"
+        }
+
+def iter_backup_column_lines(columns, clients, order=None, batch_size=100000, id_digits=6):
+    """Linhas do backup.csv a partir das colunas, formatadas em lotes (sem cópia do todo)"""
+    order = np.arange(len(columns["timestamp"])) if order is None else np.asarray(order)
+    prefixes = client_prefixes(clients)
+    for first in range(0, len(order), batch_size):
+        yield from backup_columns_to_lines(columns, clients, order[first:first + batch_size], prefixes=prefixes, id_digits=id_digits)
+
+def backup_columns_to_lines(columns, clients, order=None, first_backup_id=1, prefixes=None, id_digits=6):
+    """Formata as colunas do motor NumPy direto como linhas do backup.csv, sem dicionários nem csv.writer"""
+    if order is None:
+        order = np.arange(len(columns["timestamp"]))
+    if len(order) == 0:
+        return []
+    if prefixes is None:
+        prefixes = client_prefixes(clients)
+
+    # Data e hora por consulta: o texto de cada dia do lote e o de cada segundo do dia são montados uma vez
+    timestamps = columns["timestamp"][order]
+    days = timestamps // 86400
+    first_day = int(days.min())
+    day_texts = np.datetime_as_string(np.arange(first_day, int(days.max()) + 1).astype("datetime64[D]")).tolist()
+    times = times_of_day()
+
+    backup_ids = (np.asarray(order, dtype=np.int64) + first_backup_id).tolist()
+    client_index = columns["client_index"][order].tolist()
+    statuses = np.where(columns["success"][order], "success", "failed").tolist()
+    duration_seconds = columns["duration_seconds"][order]
+    durations = duration_texts(int(duration_seconds.max()))
+    size_gb = columns["size_gb"][order].tolist()
+    id_spec = f"0{id_digits}d"  # especificação pronta: a largura aninhada no f-string custa ~10% por linha
+
+    return [
+        f"bkp_{backup_id:{id_spec}},{prefixes[client]}{day_texts[day]} {times[second]},{status},{durations[duration]},{size} GB{CRLF}"
+        for backup_id, client, day, second, status, duration, size in zip(
+            backup_ids, client_index, (days - first_day).tolist(), (timestamps - days * 86400).tolist(),
+            statuses, duration_seconds.tolist(), size_gb
+        )
+    ]
+
+def compute_client_stats_columns(columns, clients):
+    """Calcula as estatísticas por cliente diretamente das colunas, sem percorrer dicionários"""
+    num_clients = len(clients)
+    client_index = columns["client_index"]
+    total = np.bincount(client_index, minlength=num_clients)
+    successful = np.bincount(client_index, weights=columns["success"], minlength=num_clients).astype(np.int64)
+
+    last_timestamp = np.full(num_clients, -1, dtype=np.int64)
+    np.maximum.at(last_timestamp, client_index, columns["timestamp"])
+    last_dates = np.datetime_as_string(last_timestamp.astype("datetime64[s]")).tolist()
+
+    client_stats = {}
+    for index, client in enumerate(clients):
+        if total[index] == 0:
+            continue
+        client_stats[client["id"]] = {
+            'total_backups': int(total[index]),
+            'successful_backups': int(successful[index]),
+            'failed_backups': int(total[index] - successful[index]),
+            'last_backup_date': last_dates[index].replace("T", " ")
+        }
+
+    return client_stats
+
+CLIENT_FIELDNAMES = ['client_id', 'name', 'cnpj', 'email', 'phone', 'address', 'status', 'join_date', 'logo', 'backup_frequency', 'backup_retention_days', 'last_backup_date', 'total_backups', 'successful_backups', 'failed_backups', 'avg_backup_size_gb']
+
+def write_clients_csv(data, filename):
+    """Escreve arquivo CSV de clientes (comprimido se o nome terminar em .gz ou .zst)"""
+    with TextOutput(filename) as output:
+        output.write(csv_line(CLIENT_FIELDNAMES))
+        output.writelines(csv_line([row.get(field) for field in CLIENT_FIELDNAMES]) for row in data)
+
+def client_prefixes(clients):
+    """Trecho client_id,client_name, de cada cliente, já escapado para o CSV: montado uma vez, não a cada backup"""
+    return [f"{csv_field(client['id'])},{csv_field(client['name'])}," for client in clients]
+
+def duration_texts(max_seconds):
+    """Texto MM:SS de cada duração de 0 a max_seconds, para consulta em vez de formatar a cada linha"""
+    return [f"{minutes:02d}:{seconds:02d}" for minutes, seconds in (divmod(total, 60) for total in range(max_seconds + 1))]
+
+@lru_cache(maxsize=None)
+def times_of_day():
+    """Texto HH:MM:SS de cada segundo do dia (86.400 entradas, montadas na primeira escrita)"""
+    return [f"{hour:02d}:{minute:02d}:{second:02d}" for hour in range(24) for minute in range(60) for second in range(60)]
+
+def backup_line(row, prefix):
+    """Linha do backup.csv de um backup em dicionário (os campos gerados nunca precisam de aspas, só o nome)"""
+    return f"{row['backup_id']},{prefix}{row['date']},{row['status']},{row['duration']},{row['size']}{CRLF}"
 
-# Sufixos de empresa
-company_suffixes = ["Ltda", "LTDA", "S.A.", "S.A", "ME", "EIRELI", "Corp", "Corporation", "Brasil", "Brazil", "Digital", "Tech", "Data", "Cloud", "Systems", "Solutions", "Group", "Labs", "Works", "Partners", "Alliance", "Network", "Hub", "Center", "Zone", "Space", "Place", "Spot", "Point", "Node", "Grid", "Web", "Net", "Mesh", "Fabric", "Matrix", "Array", "Vector", "Scalar", "Tensor", "Quantum", "Neural", "AI", "ML", "DL", "NN"]
-
-# Estados brasileiros
-states = ["SP", "RJ", "MG", "RS", "PR", "SC", "BA", "GO", "PE", "CE", "PA", "MT", "MS", "AL", "RN", "PB", "AM", "RO", "AC", "RR", "AP", "TO", "PI", "MA", "SE", "DF"]
-
-# Cidades por estado
-cities_by_state = {
-    "SP": ["São Paulo", "Campinas", "Santos", "Ribeirão Preto", "Sorocaba", "Guarulhos", "São Bernardo do Campo", "Osasco", "Santo André", "São José dos Campos"],
-    "RJ": ["Rio de Janeiro", "Niterói", "Nova Iguaçu", "Campos dos Goytacazes", "Duque de Caxias", "São Gonçalo", "Petrópolis", "Volta Redonda", "Macaé", "Cabo Frio"],
-    "MG": ["Belo Horizonte", "Uberlândia", "Contagem", "Juiz de Fora", "Betim", "Montes Claros", "Ribeirão das Neves", "Uberaba", "Governador Valadares", "Ipatinga"],
-    "RS": ["Porto Alegre", "Caxias do Sul", "Pelotas", "Canoas", "Santa Maria", "Gravataí", "Viamão", "Novo Hamburgo", "São Leopoldo", "Rio Grande"],
-    "PR": ["Curitiba", "Londrina", "Maringá", "Ponta Grossa", "Cascavel", "São José dos Pinhais", "Foz do Iguaçu", "Colombo", "Guarapuava", "Paranaguá"],
-    "SC": ["Florianópolis", "Joinville", "Blumenau", "São José", "Criciúma", "Chapecó", "Itajaí", "Lages", "Jaraguá do Sul", "Palhoça"],
-    "BA": ["Salvador", "Feira de Santana", "Vitória da Conquista", "Camaçari", "Juazeiro", "Itabuna", "Lauro de Freitas", "Ilhéus", "Jequié", "Teixeira de Freitas"],
-    "GO": ["Goiânia", "Aparecida de Goiânia", "Anápolis", "Rio Verde", "Luziânia", "Águas Lindas de Goiás", "Valparaíso de Goiás", "Trindade", "Formosa", "Novo Gama"],
-    "PE": ["Recife", "Jaboatão dos Guararapes", "Olinda", "Caruaru", "Petrolina", "Paulista", "Cabo de Santo Agostinho", "Camaragibe", "Garanhuns", "Vitória de Santo Antão"],
-    "CE": ["Fortaleza", "Caucaia", "Juazeiro do Norte", "Maracanaú", "Sobral", "Crato", "Itapipoca", "Maranguape", "Iguatu", "Quixadá"],
-    "PA": ["Belém", "Ananindeua", "Santarém", "Marabá", "Parauapebas", "Castanhal", "Abaetetuba", "Cametá", "Marituba", "Bragança"],
-    "MT": ["Cuiabá", "Várzea Grande", "Rondonópolis", "Sinop", "Tangará da Serra", "Cáceres", "Sorriso", "Lucas do Rio Verde", "Barra do Garças", "Primavera do Leste"],
-    "MS": ["Campo Grande", "Dourados", "Três Lagoas", "Corumbá", "Ponta Porã", "Naviraí", "Nova Andradina", "Aquidauana", "Paranaíba", "Sidrolândia"],
-    "AL": ["Maceió", "Arapiraca", "Rio Largo", "Palmeira dos Índios", "União dos Palmares", "Penedo", "Coruripe", "Delmiro Gouveia", "São Miguel dos Campos", "Marechal Deodoro"],
-    "RN": ["Natal", "Mossoró", "Parnamirim", "São Gonçalo do Amarante", "Macaíba", "Ceará-Mirim", "Caicó", "Açu", "Currais Novos", "Nova Cruz"],
-    "PB": ["João Pessoa", "Campina Grande", "Santa Rita", "Patos", "Bayeux", "Sousa", "Cajazeiras", "Guarabira", "Mamanguape", "Monteiro"],
-    "AM": ["Manaus", "Parintins", "Itacoatiara", "Manacapuru", "Coari", "Tefé", "Tabatinga", "Maués", "São Gabriel da Cachoeira", "Lábrea"],
-    "RO": ["Porto Velho", "Ji-Paraná", "Ariquemes", "Vilhena", "Cacoal", "Rolim de Moura", "Guajará-Mirim", "Jaru", "Ouro Preto do Oeste", "Buritis"],
-    "AC": ["Rio Branco", "Cruzeiro do Sul", "Sena Madureira", "Tarauacá", "Feijó", "Brasiléia", "Xapuri", "Plácido de Castro", "Epitaciolândia", "Mâncio Lima"],
-    "RR": ["Boa Vista", "Rorainópolis", "Caracaraí", "Alto Alegre", "Mucajaí", "Bonfim", "Cantá", "Caroebe", "Iracema", "Normandia"],
-    "AP": ["Macapá", "Santana", "Laranjal do Jari", "Oiapoque", "Porto Grande", "Mazagão", "Vitória do Jari", "Pedra Branca do Amapari", "Serra do Navio", "Amapá"],
-    "TO": ["Palmas", "Araguaína", "Gurupi", "Porto Nacional", "Paraíso do Tocantins", "Colinas do Tocantins", "Guaraí", "Tocantinópolis", "Miracema do Tocantins", "Dianópolis"],
-    "PI": ["Teresina", "Parnaíba", "Picos", "Piripiri", "Floriano", "Campo Maior", "Barras", "União", "Altos", "Pedro II"],
-    "MA": ["São Luís", "Imperatriz", "São José de Ribamar", "Timon", "Caxias", "Codó", "Paço do Lumiar", "Bacabal", "Balsas", "Pinheiro"],
-    "SE": ["Aracaju", "Nossa Senhora do Socorro", "Lagarto", "Itabaiana", "São Cristóvão", "Estância", "Tobias Barreto", "Simão Dias", "Propriá", "Barra dos Coqueiros"],
-    "DF": ["Brasília", "Gama", "Taguatinga", "Ceilândia", "Sobradinho", "Planaltina", "Samambaia", "Santa Maria", "São Sebastião", "Paranoá"]
-}
-
-def generate_cnpj():
-    """Gera um CNPJ válido"""
-    def calc_digit(cnpj, weights):
-        total = sum(int(cnpj[i]) * weights[i] for i in range(len(weights)))
-        remainder = total % 11
-        return 0 if remainder < 2 else 11 - remainder
-    
-    # Gera os primeiros 12 dígitos
-    cnpj = [random.randint(0, 9) for _ in range(12)]
-    
-    # Calcula os dois dígitos verificadores
-    first_digit = calc_digit(cnpj, [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
-    cnpj.append(first_digit)
-    
-    second_digit = calc_digit(cnpj, [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
-    cnpj.append(second_digit)
-    
-    # Formata o CNPJ
-    return f"{cnpj[0]}{cnpj[1]}.{cnpj[2]}{cnpj[3]}{cnpj[4]}.{cnpj[5]}{cnpj[6]}{cnpj[7]}/{cnpj[8]}{cnpj[9]}{cnpj[10]}{cnpj[11]}-{cnpj[12]}{cnpj[13]}"
-
-def generate_phone(state):
-    """Gera um telefone baseado no estado"""
-    area_codes = {
-        "SP": ["11", "12", "13", "14", "15", "16", "17", "18", "19"],
-        "RJ": ["21", "22", "24"],
-        "MG": ["31", "32", "33", "34", "35", "37", "38"],
-        "RS": ["51", "53", "54", "55"],
-        "PR": ["41", "42", "43", "44", "45", "46"],
-        "SC": ["47", "48", "49"],
-        "BA": ["71", "73", "74", "75", "77"],
-        "GO": ["62", "64"],
-        "PE": ["81", "87"],
-        "CE": ["85", "88"],
-        "PA": ["91", "93", "94"],
-        "MT": ["65", "66"],
-        "MS": ["67"],
-        "AL": ["82"],
-        "RN": ["84"],
-        "PB": ["83"],
-        "AM": ["92", "97"],
-        "RO": ["69"],
-        "AC": ["68"],
-        "RR": ["95"],
-        "AP": ["96"],
-        "TO": ["63"],
-        "PI": ["86", "89"],
-        "MA": ["98", "99"],
-        "SE": ["79"],
-        "DF": ["61"]
+def write_backup_csv(data, filename):
+    """Escreve arquivo CSV de backups (comprimido se o nome terminar em .gz ou .zst)"""
+    prefixes = {}
+    def lines():
+        for row in data:
+            prefix = prefixes.get(row['client_id'])
+            if prefix is None:
+                prefix = prefixes[row['client_id']] = f"{csv_field(row['client_id'])},{csv_field(row['client_name'])},"
+            yield backup_line(row, prefix)
+    write_backup_lines(lines(), filename)
+
+def write_backup_lines(lines, filename):
+    """Escreve linhas do backup.csv já montadas (iter_lines, backup_columns_to_lines) em blocos grandes"""
+    with open_backup_output(filename) as output:
+        output.writelines(lines)
+
+def open_backup_output(target, header=True):
+    """Destino das linhas do backup.csv: um arquivo pelo nome (com cabeçalho) ou as partições de um PartitionWriter"""
+    if isinstance(target, PartitionWriter):
+        return target
+    output = TextOutput(target)
+    if header:
+        output.write(csv_line(BACKUP_FIELDNAMES))
+    return output
+
+def _target_dir(target):
+    """Diretório dos temporários (runs, shards) ao lado do destino do backup.csv"""
+    if isinstance(target, PartitionWriter):
+        return target.directory
+    return os.path.dirname(os.path.abspath(target))
+
+def write_backup_csv_streaming(data, filename, chunk_size=500000, max_open_runs=64):
+    """Escreve o CSV de backups ordenado por data com memória constante (ordenação externa)"""
+    date_key = itemgetter(BACKUP_FIELDNAMES.index('date'))
+    output_dir = _target_dir(filename)
+    total_rows = 0
+    
+    with tempfile.TemporaryDirectory(prefix='backup-runs-', dir=output_dir) as tmp_dir:
+        runs = []
+        chunk = []
+        for row in data:
+            chunk.append([row[field] for field in BACKUP_FIELDNAMES])
+            if len(chunk) >= chunk_size:
+                runs.append(_write_sorted_run(chunk, tmp_dir, len(runs), date_key))
+                total_rows += len(chunk)
+                chunk = []
+        
+        # Tudo coube em um único bloco: ordena em memória, sem passar pelo disco
+        if not runs:
+            chunk.sort(key=date_key)
+            _write_backup_rows(iter(chunk), filename)
+            return len(chunk)
+        
+        if chunk:
+            runs.append(_write_sorted_run(chunk, tmp_dir, len(runs), date_key))
+            total_rows += len(chunk)
+            chunk = []
+        
+        # Limita o número de arquivos abertos ao mesmo tempo com merges intermediários
+        generation = 0
+        while len(runs) > max_open_runs:
+            generation += 1
+            merged_runs = []
+            for first in range(0, len(runs), max_open_runs):
+                group = runs[first:first + max_open_runs]
+                merged_path = os.path.join(tmp_dir, f'run-{generation}-{len(merged_runs):05d}.csv')
+                _merge_runs(group, merged_path, date_key, header=False)
+                for path in group:
+                    os.remove(path)
+                merged_runs.append(merged_path)
+            runs = merged_runs
+        
+        _merge_runs(runs, filename, date_key, header=True)
+    
+    return total_rows
+
+def _write_sorted_run(chunk, tmp_dir, run_index, date_key):
+    """Ordena um bloco de linhas por data e grava como run temporário"""
+    # sort é estável: empates mantêm a ordem de geração, como no sort em memória
+    chunk.sort(key=date_key)
+    path = os.path.join(tmp_dir, f'run-0-{run_index:05d}.csv')
+    _write_backup_rows(chunk, path, header=False)
+    return path
+
+def _merge_runs(runs, filename, date_key, header):
+    """Intercala (k-way merge) runs já ordenados por data em um único arquivo"""
+    run_files = [open(path, newline='', encoding='utf-8') for path in runs]
+    try:
+        # heapq.merge desempata pela ordem dos runs, preservando a estabilidade
+        merged = heapq.merge(*(csv.reader(run_file) for run_file in run_files), key=date_key)
+        _write_backup_rows(merged, filename, header)
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+def _write_backup_rows(rows, filename, header=True):
+    """Escreve linhas (listas na ordem de BACKUP_FIELDNAMES) em blocos grandes, com cabeçalho opcional"""
+    prefixes = {}
+    def lines():
+        for backup_id, client_id, client_name, moment, status, duration, size in rows:
+            prefix = prefixes.get(client_id)
+            if prefix is None:
+                prefix = prefixes[client_id] = f"{csv_field(client_id)},{csv_field(client_name)},"
+            yield f"{backup_id},{prefix}{moment},{status},{duration},{size}{CRLF}"
+    with open_backup_output(filename, header) as output:
+        output.writelines(lines())
+
+# Dicionário do status: o código 0 é sucesso e 1 é falha
+BACKUP_STATUSES = ['success', 'failed']
+
+def backup_rows_to_columns(rows, client_positions):
+    """Converte linhas de backup (listas na ordem de BACKUP_FIELDNAMES) em colunas numéricas"""
+    backup_id = []
+    client_index = []
+    dates = []
+    success = []
+    duration_seconds = []
+    size_gb = []
+    for row in rows:
+        backup_id.append(int(row[0][4:]))
+        client_index.append(client_positions[row[1]])
+        dates.append(row[3])
+        success.append(row[4] == 'success')
+        minutes, seconds = row[5].split(':')
+        duration_seconds.append(int(minutes) * 60 + int(seconds))
+        size_gb.append(float(row[6][:-3]))
+    
+    return {
+        'backup_id': np.array(backup_id, dtype=np.int64),
+        'client_index': np.array(client_index, dtype=np.int32),
+        'timestamp': np.array(dates, dtype='datetime64[s]').astype(np.int64),
+        'success': np.array(success, dtype=bool),
+        'duration_seconds': np.array(duration_seconds, dtype=np.int32),
+        'size_gb': np.array(size_gb, dtype=np.float64),
     }
+
+def iter_backup_csv_batches(filename, clients, batch_size=1000000):
+    """Lê o CSV de backups em lotes, devolvendo cada lote já em colunas numéricas"""
+    with open_text_input(filename) as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader)  # cabeçalho
+        yield from iter_backup_row_batches(reader, clients, batch_size)
+
+def iter_backup_row_batches(rows, clients, batch_size=1000000):
+    """Agrupa linhas (listas na ordem de BACKUP_FIELDNAMES) em lotes de colunas numéricas"""
+    client_positions = {client['id']: index for index, client in enumerate(clients)}
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield backup_rows_to_columns(batch, client_positions)
+            batch = []
+    if batch:
+        yield backup_rows_to_columns(batch, client_positions)
+
+def iter_sorted_column_batches(columns, order, batch_size=1000000):
+    """Fatia as colunas do motor NumPy em lotes, já na ordem por data"""
+    for first in range(0, len(order), batch_size):
+        positions = order[first:first + batch_size]
+        batch = {name: values[positions] for name, values in columns.items()}
+        batch['backup_id'] = positions.astype(np.int64) + 1
+        yield batch
+
+def write_backup_columnar(batches, clients, filename, fmt):
+    """Escreve os backups em formato colunar (parquet, arrow ou npz), lote a lote"""
+    if np is None:
+        raise RuntimeError("As saídas colunares requerem numpy (pip install numpy)")
+    if fmt in ('parquet', 'arrow') and pa is None:
+        raise RuntimeError(f"A saída {fmt} requer pyarrow (pip install pyarrow)")
+    
+    client_ids = [client['id'] for client in clients]
+    client_names = [client['name'] for client in clients]
     
-    area_code = random.choice(area_codes.get(state, ["11"]))
-    number = f"{random.randint(1000, 9999)}-{random.randint(1000, 9999)}"
-    return f"({area_code}) {number}"
+    if fmt == 'npz':
+        # NPZ não é incremental: as colunas (~25 bytes por linha) são concatenadas em memória
+        parts = list(batches)
+        if parts:
+            merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+        else:
+            merged = backup_rows_to_columns([], {})
+        with open(filename, 'wb') as npzfile:
+            np.savez(
+                npzfile,
+                backup_id=merged['backup_id'],
+                client_id=merged['client_index'].astype(np.int32),
+                client_id_dictionary=np.array(client_ids),
+                client_name_dictionary=np.array(client_names),
+                date=merged['timestamp'].astype(np.int64),
+                status=(~merged['success']).astype(np.int8),
+                status_dictionary=np.array(BACKUP_STATUSES),
+                duration_seconds=merged['duration_seconds'].astype(np.int32),
+                size_gb=merged['size_gb'].astype(np.float64)
+            )
+        return
+    
+    client_id_dictionary = pa.array(client_ids, type=pa.string())
+    client_name_dictionary = pa.array(client_names, type=pa.string())
+    status_dictionary = pa.array(BACKUP_STATUSES, type=pa.string())
+    schema = pa.schema([
+        ('backup_id', pa.int64()),
+        ('client_id', pa.dictionary(pa.int32(), pa.string())),
+        ('client_name', pa.dictionary(pa.int32(), pa.string())),
+        ('date', pa.int64()),
+        ('status', pa.dictionary(pa.int8(), pa.string())),
+        ('duration_seconds', pa.int32()),
+        ('size_gb', pa.float64()),
+    ], metadata={'date': 'epoch seconds (UTC)', 'duration_seconds': 'seconds', 'size_gb': 'GB'})
+    
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(filename, schema)
+    else:
+        writer = pa.ipc.new_file(filename, schema)
+    
+    try:
+        for batch in batches:
+            client_codes = pa.array(batch['client_index'].astype(np.int32))
+            status_codes = pa.array((~batch['success']).astype(np.int8))
+            writer.write_batch(pa.record_batch([
+                pa.array(batch['backup_id'].astype(np.int64)),
+                pa.DictionaryArray.from_arrays(client_codes, client_id_dictionary),
+                pa.DictionaryArray.from_arrays(client_codes, client_name_dictionary),
+                pa.array(batch['timestamp'].astype(np.int64)),
+                pa.DictionaryArray.from_arrays(status_codes, status_dictionary),
+                pa.array(batch['duration_seconds'].astype(np.int32)),
+                pa.array(batch['size_gb'].astype(np.float64)),
+            ], schema=schema))
+    finally:
+        writer.close()
 
-def generate_clients(num_clients=500):
-    """Gera lista de clientes"""
-    clients = []
+# Schema do CsvRow (src/lib/csvProcessor.ts): uma linha por cliente com os backups em JSON
+UPLOAD_FIELDNAMES = ['id', 'nome', 'email', 'cnpj', 'ativo', 'dataInclusao', 'backups']
+
+# Mensagens fixas dos DTOs de backup (o gerador não produz texto livre)
+SUCCESS_MESSAGE = "Backup concluído com sucesso"
+FAILURE_MESSAGE = "Falha ao executar o backup"
+
+# Trechos fixos do BackupRequestDTO por tipo: 0 = falha, 1 = sucesso, 2 = sucesso com VACUUM
+UPLOAD_STATUS_JSON = (
+    f'"status":"FALHA","mensagem":{json.dumps(FAILURE_MESSAGE, ensure_ascii=False)},"vacuumExecutado":false',
+    f'"status":"SUCESSO","mensagem":{json.dumps(SUCCESS_MESSAGE, ensure_ascii=False)},"vacuumExecutado":false',
+    f'"status":"SUCESSO","mensagem":{json.dumps(SUCCESS_MESSAGE, ensure_ascii=False)},"vacuumExecutado":true',
+)
+
+def client_number(client_id):
+    """Id numérico do cliente na API (clt_001 -> 1)"""
+    return int(client_id.rsplit("_", 1)[-1])
+
+def backup_origin(client, position):
+    """databaseBackup, ipBackup e o início do caminhoBackup (falta a data e ".dump") dos backups de um cliente"""
+    return "db_" + client["id"], f"10.{position >> 16 & 255}.{position >> 8 & 255}.{position & 255}", "/backups/" + client["id"] + "/"
+
+def backup_kinds(timestamp, success):
+    """Tipo de cada backup das colunas: 0 = falha, 1 = sucesso, 2 = sucesso com VACUUM"""
+    # O gerador não registra VACUUM: os backups bem-sucedidos de domingo fazem o papel (como no mock_api_server)
+    return success.astype(np.int8) + (success & ((timestamp // 86400 + 3) % 7 == 6))
+
+def _upload_backup_prefix(client, position, cliente_id=None):
+    """Início (já em JSON) dos BackupRequestDTO de um cliente, até a data no caminhoBackup"""
+    database, ip, path = backup_origin(client, position)
+    if cliente_id is None:
+        cliente_id = client_number(client["id"])
+    return (
+        f'{{"clienteId":{cliente_id},"databaseBackup":{json.dumps(database)},"ipBackup":"{ip}",'
+        # Sem a aspa final: a data e o ".dump" de cada backup completam o caminho
+        f'"caminhoBackup":{json.dumps(path)[:-1]}'
+    )
+
+def _upload_backup_objects(prefix, starts, ends, kinds, sizes):
+    """Os BackupRequestDTO de um cliente montados por concatenação (sem um json.dumps por backup)"""
+    status = UPLOAD_STATUS_JSON
+    objects = []
+    append = objects.append
+    for start, end, kind, size in zip(starts, ends, kinds, sizes):
+        vacuum_date = f'"vacuumDataExecucao":"{end}",' if kind == 2 else ''
+        append(f'{prefix}{start[:10]}.dump",{status[kind]},{vacuum_date}"dataInicio":"{start}","dataFim":"{end}","tamanhoEmMb":{size}}}')
+    return objects
+
+def backup_request_objects(client, position, backups, cliente_id=None):
+    """BackupRequestDTO (JSON) de um cliente a partir dos backups de um segmento de iter_upload_segments_*
+
+    position é a posição global do cliente (databaseBackup/ipBackup); cliente_id é o clienteId na API
+    (padrão: o id numérico do gerador, clt_001 -> 1).
+    """
+    return _upload_backup_objects(_upload_backup_prefix(client, position, cliente_id), *backups)
+
+def iter_upload_segments_columns(blocks):
+    """Backups de cada cliente a partir dos blocos colunares: (índice, objetos JSON, total, sucessos, última época)"""
+    for columns in blocks:
+        client_index = columns["client_index"]
+        if len(client_index) == 0:
+            continue
+        timestamp = columns["timestamp"]
+        success = columns["success"]
+        kinds = backup_kinds(timestamp, success).tolist()
+        starts = np.datetime_as_string(timestamp.astype("datetime64[s]")).tolist()
+        ends = np.datetime_as_string((timestamp + columns["duration_seconds"]).astype("datetime64[s]")).tolist()
+        sizes = np.round(columns["size_gb"] * 1024, 2).tolist()
+        
+        # Os blocos vêm em ordem de cliente: cada cliente é uma fatia contígua
+        bounds = (np.flatnonzero(np.diff(client_index)) + 1).tolist()
+        lows = [0] + bounds
+        highs = bounds + [len(client_index)]
+        positions = client_index[lows].tolist()
+        successes = np.add.reduceat(success.astype(np.int64), lows).tolist()
+        last_timestamps = timestamp[np.array(highs) - 1].tolist()
+        for position, low, high, successful, last_timestamp in zip(positions, lows, highs, successes, last_timestamps):
+            yield position, (starts[low:high], ends[low:high], kinds[low:high], sizes[low:high]), high - low, successful, last_timestamp
+
+def iter_upload_segments_values(values):
+    """Mesmo que iter_upload_segments_columns, a partir das tuplas de iter_backup_values (sem numpy)"""
+    for position, backups in groupby(values, key=itemgetter(0)):
+        starts, ends, kinds, sizes = [], [], [], []
+        successful = 0
+        for _, timestamp, success, duration_seconds, size_gb in backups:
+            starts.append((EPOCH + timedelta(seconds=timestamp)).isoformat())
+            ends.append((EPOCH + timedelta(seconds=timestamp + duration_seconds)).isoformat())
+            kinds.append(int(success) + (success and (timestamp // 86400 + 3) % 7 == 6))
+            sizes.append(round(size_gb * 1024, 2))
+            successful += success
+        yield position, (starts, ends, kinds, sizes), len(starts), successful, timestamp
+
+def write_upload_csv(clients, segments, filename, client_stats=None, first_position=0, header=True, progress=None):
+    """Escreve o CSV de upload (uma linha por cliente, na ordem de clients) e devolve o total de backups
+
+    segments vem de iter_upload_segments_*; clientes sem backups saem com "[]".
+    first_position é a posição global do primeiro cliente (shards), usada no ipBackup.
+    """
+    total_backups = 0
+    
+    def upload_rows():
+        nonlocal total_backups
+        next_position = 0
+        for position, backups, total, successful, last_timestamp in segments:
+            for empty in range(next_position, position):
+                yield _upload_row(clients[empty], "[]")
+            client = clients[position]
+            yield _upload_row(client, "[" + ",".join(backup_request_objects(client, first_position + position, backups)) + "]")
+            next_position = position + 1
+            total_backups += total
+            if client_stats is not None:
+                client_stats[client["id"]] = {
+                    'total_backups': total,
+                    'successful_backups': successful,
+                    'failed_backups': total - successful,
+                    'last_backup_date': (EPOCH + timedelta(seconds=last_timestamp)).strftime("%Y-%m-%d %H:%M:%S")
+                }
+            if progress is not None:
+                progress(total)
+        for empty in range(next_position, len(clients)):
+            yield _upload_row(clients[empty], "[]")
+    
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        if header:
+            writer.writerow(UPLOAD_FIELDNAMES)
+        # Lotes pequenos: cada linha carrega o histórico inteiro do cliente (centenas de KB)
+        rows = upload_rows()
+        while True:
+            batch = list(islice(rows, 64))
+            if not batch:
+                break
+            writer.writerows(batch)
+    return total_backups
+
+def _upload_row(client, backups):
+    return [client_number(client["id"]), client["name"], client["email"], client["cnpj"],
+            "true" if client["status"] == "active" else "false", JOIN_DATE, backups]
+
+def generate_upload_csv(scenario, filename, seed=None, workers=1, progress=None):
+    """Gera clientes e backups direto no CSV de upload, em streaming (shards em paralelo com workers > 1)"""
+    output_dir = os.path.dirname(os.path.abspath(filename))
+    num_clients = scenario["clients"]["count"]
+    shard_size = max(1, -(-num_clients // (workers * 4))) if workers > 1 else max(1, num_clients)
+    
+    with tempfile.TemporaryDirectory(prefix='upload-shards-', dir=output_dir) as tmp_dir:
+        shards = [{
+            'first_index': first,
+            'num_clients': min(shard_size, num_clients - first),
+            'seed': seed,
+            'scenario': scenario,
+            'path': os.path.join(tmp_dir, f'shard-{first // shard_size:05d}.csv')
+        } for first in range(0, num_clients, shard_size)]
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(_generate_upload_shard, shards)
+                results = [_report_progress(result, progress) for result in results]
+        else:
+            results = [_generate_upload_shard(shard, progress) for shard in shards]
+        
+        # Os shards são intervalos consecutivos de clientes: basta concatenar
+        clients = []
+        client_stats = {}
+        with open(filename, 'w', newline='', encoding='utf-8') as upload_file:
+            csv.writer(upload_file).writerow(UPLOAD_FIELDNAMES)
+            for shard, (shard_clients, shard_stats, _) in zip(shards, results):
+                clients.extend(shard_clients)
+                client_stats.update(shard_stats)
+                with open(shard['path'], newline='', encoding='utf-8') as shard_file:
+                    shutil.copyfileobj(shard_file, upload_file, 1024 * 1024)
+    
+    return clients, client_stats
+
+def _report_progress(result, progress):
+    if progress is not None:
+        progress(result[2])
+    return result
+
+def _generate_upload_shard(shard, progress=None):
+    """Gera um intervalo de clientes consecutivos e grava suas linhas de upload (sem cabeçalho)"""
+    scenario = shard['scenario']
+    output = scenario['output']
+    clients = scenario_clients(scenario, shard['first_index'], shard['num_clients'], shard['seed'])
+    if output['engine'] == 'numpy':
+        # Blocos menores que o padrão: as datas de cada bloco viram texto de uma vez
+        blocks = iter_backup_column_blocks(clients, scenario['backups_per_client'], block_size=256, seed=shard['seed'],
+                                           history_days=scenario['days'], scenario=scenario)
+        segments = iter_upload_segments_columns(blocks)
+    else:
+        segments = iter_upload_segments_values(
+            iter_backup_values(clients, scenario['backups_per_client'], shard['seed'], scenario['days'], scenario)
+        )
+    
+    client_stats = {}
+    total_backups = write_upload_csv(clients, segments, shard['path'], client_stats, shard['first_index'],
+                                     header=False, progress=progress)
+    return clients, client_stats, total_backups
+
+# Tabelas do backend (entidades Cliente e Backup de src/types/api.ts): (coluna, tipo PostgreSQL, tipo SQLite)
+# No PostgreSQL as chaves entram depois da carga; a ordem do backup junta os campos fixos de cada cliente e de cada tipo
+CLIENTE_COLUMNS = [
+    ('id', 'bigint NOT NULL', 'INTEGER PRIMARY KEY'),
+    ('nome', 'text NOT NULL', 'TEXT NOT NULL'),
+    ('email', 'text NOT NULL', 'TEXT NOT NULL'),
+    ('cnpj', 'varchar(18) NOT NULL', 'TEXT NOT NULL'),
+    ('ativo', 'boolean NOT NULL', 'INTEGER NOT NULL'),
+    ('data_inclusao', 'date NOT NULL', 'TEXT NOT NULL'),
+]
+BACKUP_COLUMNS = [
+    ('id', 'bigint NOT NULL', 'INTEGER PRIMARY KEY'),
+    ('cliente_id', 'bigint NOT NULL', 'INTEGER NOT NULL REFERENCES cliente (id)'),
+    ('database_backup', 'text NOT NULL', 'TEXT NOT NULL'),
+    ('ip_backup', 'varchar(15) NOT NULL', 'TEXT NOT NULL'),
+    ('status', 'varchar(7) NOT NULL', 'TEXT NOT NULL'),
+    ('mensagem', 'text NOT NULL', 'TEXT NOT NULL'),
+    ('vacuum_executado', 'boolean NOT NULL', 'INTEGER NOT NULL'),
+    ('vacuum_data_execucao', 'timestamp', 'TEXT'),
+    ('data_inicio', 'timestamp NOT NULL', 'TEXT NOT NULL'),
+    ('data_fim', 'timestamp NOT NULL', 'TEXT NOT NULL'),
+    ('tamanho_em_mb', 'double precision NOT NULL', 'REAL NOT NULL'),
+    ('caminho_backup', 'text NOT NULL', 'TEXT NOT NULL'),
+]
+
+# Índices criados depois da carga: histórico do cliente por data e filtros por status
+DATABASE_INDEXES = [
+    ('backup_cliente_data_idx', 'backup', 'cliente_id, data_inicio'),
+    ('backup_status_idx', 'backup', 'status'),
+]
+
+# status e mensagem de cada tipo de backup_kinds (0 = falha, 1 = sucesso, 2 = sucesso com VACUUM)
+BACKUP_KIND_STATUSES = ('FALHA', 'SUCESSO', 'SUCESSO')
+BACKUP_KIND_MESSAGES = (FAILURE_MESSAGE, SUCCESS_MESSAGE, SUCCESS_MESSAGE)
+
+# 2000-01-01 em segundos desde 1970: origem dos timestamp e date no COPY binário
+PG_EPOCH = 946684800
+
+def create_table_sql(table, columns, dialect):
+    """CREATE TABLE das colunas no dialeto 'postgres' ou 'sqlite'"""
+    position = 1 if dialect == 'postgres' else 2
+    definitions = ",\n".join(f"    {column[0]} {column[position]}" for column in columns)
+    return f"CREATE TABLE {table} (\n{definitions}\n);"
+
+def cliente_row(client):
+    """Linha da tabela cliente (id numérico da API, ativo só para os clientes active)"""
+    return (client_number(client["id"]), client["name"], client["email"], client["cnpj"], client["status"] == "active", JOIN_DATE)
+
+def timestamp_texts(timestamps):
+    """Texto AAAA-MM-DD HH:MM:SS de cada época, por consulta às tabelas de dias e de segundos do dia"""
+    if len(timestamps) == 0:
+        return []
+    days = timestamps // 86400
+    first_day = int(days.min())
+    day_texts = np.datetime_as_string(np.arange(first_day, int(days.max()) + 1).astype("datetime64[D]")).tolist()
+    times = times_of_day()
+    return [f"{day_texts[day]} {times[second]}" for day, second in zip((days - first_day).tolist(), (timestamps - days * 86400).tolist())]
+
+def _database_batch(batch):
+    """Um lote de colunas nos campos das tabelas: ids, posições dos clientes, tipos, épocas de início e fim, tamanhos em MB"""
+    timestamp = batch["timestamp"]
+    return (batch["backup_id"].tolist(), batch["client_index"].tolist(), backup_kinds(timestamp, batch["success"]).tolist(),
+            timestamp, timestamp + batch["duration_seconds"], np.round(batch["size_gb"] * 1024, 2).tolist())
+
+def copy_text(value):
+    """Um campo no formato texto do COPY: \\N para nulo, t/f para booleanos, barra, tab e quebras de linha escapadas"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = str(value)
+    if "\\" in text or "\t" in text or "\n" in text or "\r" in text:
+        text = text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return text
+
+class CopyTextEncoder:
+    """Linhas do COPY em formato texto; os trechos fixos de cada cliente e de cada tipo são montados uma vez"""
+    extension = '.copy'
+    options = 'FREEZE'
+    header = b''
+    trailer = b''
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.client_pieces = []
+        self.path_pieces = []
+        for position, client in enumerate(clients):
+            database, ip, path = backup_origin(client, position)
+            self.client_pieces.append(f"{client_number(client['id'])}\t{copy_text(database)}\t{ip}\t")
+            self.path_pieces.append(copy_text(path))
+        # O tipo 2 termina no vacuum_executado: a vacuum_data_execucao (o fim do backup) vem de cada linha
+        self.kind_pieces = [
+            f"{status}\t{copy_text(message)}\t{'t' if kind == 2 else 'f'}\t" + ("" if kind == 2 else "\\N\t")
+            for kind, (status, message) in enumerate(zip(BACKUP_KIND_STATUSES, BACKUP_KIND_MESSAGES))
+        ]
+
+    def clientes(self):
+        return "".join("\t".join(map(copy_text, cliente_row(client))) + "\n" for client in self.clients).encode("utf-8")
+
+    def backups(self, batch):
+        backup_ids, positions, kinds, starts, ends, sizes = _database_batch(batch)
+        client_pieces, kind_pieces, path_pieces = self.client_pieces, self.kind_pieces, self.path_pieces
+        tab = "\t"
+        return "".join([
+            f"{backup_id}\t{client_pieces[position]}{kind_pieces[kind]}{end + tab if kind == 2 else ''}"
+            f"{start}\t{end}\t{size}\t{path_pieces[position]}{start[:10]}.dump\n"
+            for backup_id, position, kind, start, end, size in zip(
+                backup_ids, positions, kinds, timestamp_texts(starts), timestamp_texts(ends), sizes
+            )
+        ]).encode("utf-8")
+
+def _binary_field(data):
+    """Campo do COPY binário: tamanho em 4 bytes e os bytes do valor"""
+    return struct.pack(">i", len(data)) + data
+
+class CopyBinaryEncoder:
+    """Tuplas do COPY binário (inteiros e datas em big-endian, timestamps em microssegundos desde 2000-01-01)"""
+    extension = '.bin'
+    options = 'FORMAT binary, FREEZE'
+    header = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+    trailer = struct.pack(">h", -1)
+
+    def __init__(self, clients):
+        self.clients = clients
+        self.client_pieces = []
+        self.path_pieces = []
+        for position, client in enumerate(clients):
+            database, ip, path = backup_origin(client, position)
+            self.client_pieces.append(struct.pack(">iq", 8, client_number(client["id"]))
+                                      + _binary_field(database.encode("utf-8")) + _binary_field(ip.encode("utf-8")))
+            # O tamanho do caminho já conta a data e o ".dump" (AAAA-MM-DD.dump, 15 bytes) de cada backup
+            path = path.encode("utf-8")
+            self.path_pieces.append(struct.pack(">i", len(path) + 15) + path)
+        self.kind_pieces = [
+            _binary_field(status.encode("utf-8")) + _binary_field(message.encode("utf-8"))
+            + struct.pack(">ib", 1, kind == 2) + (b"" if kind == 2 else struct.pack(">i", -1))
+            for kind, (status, message) in enumerate(zip(BACKUP_KIND_STATUSES, BACKUP_KIND_MESSAGES))
+        ]
+
+    def clientes(self):
+        join_day = (datetime.strptime(JOIN_DATE, "%Y-%m-%d") - EPOCH).days - PG_EPOCH // 86400
+        rows = []
+        for client_id, name, email, cnpj, active, _ in map(cliente_row, self.clients):
+            rows.append(struct.pack(">hiq", len(CLIENTE_COLUMNS), 8, client_id) + _binary_field(name.encode("utf-8"))
+                        + _binary_field(email.encode("utf-8")) + _binary_field(cnpj.encode("utf-8"))
+                        + struct.pack(">ibii", 1, active, 4, join_day))
+        return b"".join(rows)
+
+    def backups(self, batch):
+        backup_ids, positions, kinds, starts, ends, sizes = _database_batch(batch)
+        if not backup_ids:
+            return b""
+        days = starts // 86400
+        first_day = int(days.min())
+        day_paths = [f"{day}.dump".encode("utf-8") for day in np.datetime_as_string(
+            np.arange(first_day, int(days.max()) + 1).astype("datetime64[D]")).tolist()]
+        head = struct.Struct(">hiq").pack
+        vacuum = struct.Struct(">iq").pack
+        times = struct.Struct(">iqiqid").pack
+        client_pieces, kind_pieces, path_pieces = self.client_pieces, self.kind_pieces, self.path_pieces
+        fields = len(BACKUP_COLUMNS)
+        return b"".join([
+            head(fields, 8, backup_id) + client_pieces[position] + kind_pieces[kind] + (vacuum(8, end) if kind == 2 else b"")
+            + times(8, start, 8, end, 8, size) + path_pieces[position] + day_paths[day]
+            for backup_id, position, kind, start, end, size, day in zip(
+                backup_ids, positions, kinds, ((starts - PG_EPOCH) * 1000000).tolist(),
+                ((ends - PG_EPOCH) * 1000000).tolist(), sizes, (days - first_day).tolist()
+            )
+        ])
+
+def postgres_load_script(encoder):
+    """load.sql do dump: DDL, \\copy dos arquivos, chaves e índices depois da carga, tudo numa transação"""
+    lines = [
+        "-- Dump gerado por generate_large_dataset.py; rode de dentro deste diretório: psql -d BANCO -f load.sql",
+        "\\set ON_ERROR_STOP on",
+        "BEGIN;",
+        "DROP TABLE IF EXISTS backup, cliente;",
+        create_table_sql('cliente', CLIENTE_COLUMNS, 'postgres'),
+        create_table_sql('backup', BACKUP_COLUMNS, 'postgres'),
+        "-- Tabelas criadas nesta transação: o FREEZE grava as linhas já congeladas (sem VACUUM depois da carga)",
+    ]
+    for table, columns in (('cliente', CLIENTE_COLUMNS), ('backup', BACKUP_COLUMNS)):
+        names = ", ".join(column[0] for column in columns)
+        lines.append(f"\\copy {table} ({names}) FROM '{table}{encoder.extension}' WITH ({encoder.options})")
+    lines += [
+        "ALTER TABLE cliente ADD PRIMARY KEY (id);",
+        "ALTER TABLE backup ADD PRIMARY KEY (id);",
+        "ALTER TABLE backup ADD FOREIGN KEY (cliente_id) REFERENCES cliente (id);",
+    ]
+    lines += [f"CREATE INDEX {name} ON {table} ({columns});" for name, table, columns in DATABASE_INDEXES]
+    lines += ["COMMIT;", "ANALYZE cliente;", "ANALYZE backup;"]
+    return "\n".join(lines) + "\n"
+
+def write_postgres_copy(batches, clients, directory, binary=False, progress=None):
+    """Dump para o PostgreSQL: cliente e backup no formato do COPY (texto ou binário) e o load.sql; devolve os arquivos"""
+    encoder = CopyBinaryEncoder(clients) if binary else CopyTextEncoder(clients)
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for table in ('cliente', 'backup'):
+        path = os.path.join(directory, table + encoder.extension)
+        with open(path, 'wb') as copy_file:
+            copy_file.write(encoder.header)
+            if table == 'cliente':
+                copy_file.write(encoder.clientes())
+            else:
+                for batch in batches:
+                    copy_file.write(encoder.backups(batch))
+                    if progress is not None:
+                        progress(len(batch["timestamp"]))
+            copy_file.write(encoder.trailer)
+        files.append(path)
     
-    for i in range(num_clients):
-        # Escolher estado aleatório
-        state = random.choice(states)
-        city = random.choice(cities_by_state[state])
+    script_path = os.path.join(directory, 'load.sql')
+    with open(script_path, 'w', encoding='utf-8') as script_file:
+        script_file.write(postgres_load_script(encoder))
+    return files + [script_path]
+
+def write_sqlite(batches, clients, filename, progress=None):
+    """Banco SQLite pronto: inserts preparados em lote numa única transação e índices criados depois da carga"""
+    tmp_path = filename + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    origins = [backup_origin(client, position) for position, client in enumerate(clients)]
+    numbers = [client_number(client["id"]) for client in clients]
+    insert = f"INSERT INTO backup VALUES ({', '.join('?' * len(BACKUP_COLUMNS))})"
+    connection = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        # Sem journal nem fsync: o arquivo só é publicado (rename) depois de completo
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("PRAGMA cache_size = -262144")
+        connection.execute("BEGIN")
+        connection.execute(create_table_sql('cliente', CLIENTE_COLUMNS, 'sqlite'))
+        connection.execute(create_table_sql('backup', BACKUP_COLUMNS, 'sqlite'))
+        connection.executemany(f"INSERT INTO cliente VALUES ({', '.join('?' * len(CLIENTE_COLUMNS))})", map(cliente_row, clients))
+        for batch in batches:
+            # A tabela é ordenada pelo id (rowid): inserir cada lote em ordem de id evita inserções espalhadas na árvore
+            by_id = np.argsort(batch["backup_id"], kind="stable")
+            backup_ids, positions, kinds, starts, ends, sizes = _database_batch({name: column[by_id] for name, column in batch.items()})
+            connection.executemany(insert, (
+                (backup_id, numbers[position], origins[position][0], origins[position][1], BACKUP_KIND_STATUSES[kind],
+                 BACKUP_KIND_MESSAGES[kind], kind == 2, end if kind == 2 else None, start, end, size,
+                 f"{origins[position][2]}{start[:10]}.dump")
+                for backup_id, position, kind, start, end, size in zip(
+                    backup_ids, positions, kinds, timestamp_texts(starts), timestamp_texts(ends), sizes
+                )
+            ))
+            if progress is not None:
+                progress(len(backup_ids))
+        for name, table, columns in DATABASE_INDEXES:
+            connection.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.close()
+        os.remove(tmp_path)
+        raise
+    connection.close()
+    os.replace(tmp_path, filename)
+    return [filename]
+
+def write_database(database, batches, clients, target, progress=None):
+    """Escreve um dos dumps de DATABASE_OUTPUTS a partir dos lotes de colunas; devolve os arquivos escritos"""
+    if np is None:
+        raise RuntimeError("Os dumps de banco requerem numpy (pip install numpy)")
+    if database == 'sqlite':
+        return write_sqlite(batches, clients, target, progress)
+    return write_postgres_copy(batches, clients, target, database == 'postgres-binary', progress)
+
+def iter_with_client_stats(backup_rows, client_stats, aggregator=None):
+    """Repassa as linhas de backup acumulando as estatísticas (e agregados) na mesma passada"""
+    for backup in backup_rows:
+        update_client_stats(client_stats, backup)
+        if aggregator is not None:
+            aggregator.add(backup)
+        yield backup
+
+DAILY_ROLLUP_FIELDNAMES = ['client_id', 'date', 'total_backups', 'successful_backups', 'failed_backups', 'total_size_gb']
+TIMELINE_FIELDNAMES = ['date', 'successful', 'failed', 'total', 'success_rate', 'success_rate_7d', 'success_rate_30d', 'success_rate_90d']
+ROLLING_WINDOWS = [7, 30, 90]
+
+class BackupAggregator:
+    """Acumula os agregados diários do dashboard na mesma passada das estatísticas por cliente"""
+
+    def __init__(self, rollup_filename=None):
+        # dia (YYYY-MM-DD) -> [sucessos, falhas]
+        self.timeline = {}
+        self._rollup_file = None
+        self._rollup_writer = None
+        self._current_client = None
+        self._client_days = {}
+        if rollup_filename:
+            self._rollup_file = open(rollup_filename, 'w', newline='', encoding='utf-8')
+            self._rollup_writer = csv.writer(self._rollup_file)
+            self._rollup_writer.writerow(DAILY_ROLLUP_FIELDNAMES)
+
+    def add(self, backup):
+        """Acumula um backup (as linhas devem chegar agrupadas por cliente, em ordem de geração)"""
+        day = backup['date'][:10]
+        status_index = 0 if backup['status'] == 'success' else 1
+        counts = self.timeline.get(day)
+        if counts is None:
+            counts = self.timeline[day] = [0, 0]
+        counts[status_index] += 1
         
-        # Gerar nome da empresa
-        company_name = random.choice(company_names)
-        suffix = random.choice(company_suffixes)
-        full_name = f"{company_name} {suffix}"
+        if self._rollup_writer is None:
+            return
         
-        # Gerar dados do cliente
-        client_id = f"clt_{i+1:03d}"
-        cnpj = generate_cnpj()
-        email = f"contato@{company_name.lower().replace(' ', '')}.com.br"
-        phone = generate_phone(state)
-        address = f"{city} - {state}"
+        # Mudou o cliente: o rollup do anterior está completo e pode ir para o disco
+        if backup['client_id'] != self._current_client:
+            self._flush_client()
+            self._current_client = backup['client_id']
+        rollup = self._client_days.get(day)
+        if rollup is None:
+            rollup = self._client_days[day] = [0, 0, 0.0]
+        rollup[status_index] += 1
+        rollup[2] += float(backup['size'][:-3])
+
+    def add_columns(self, columns, clients):
+        """Versão vetorizada de add para as colunas do motor NumPy"""
+        if len(columns['timestamp']) == 0:
+            return
         
-        # Status baseado em distribuição realista
-        status_rand = random.random()
-        if status_rand < 0.8:  # 80% ativos
-            status = "active"
-        elif status_rand < 0.9:  # 10% inativos
-            status = "inactive"
-        else:  # 10% pendentes
-            status = "pending"
+        day_numbers = columns['timestamp'] // 86400
+        first_day = int(day_numbers.min())
+        day_offsets = day_numbers - first_day
+        num_days = int(day_offsets.max()) + 1
+        successful = np.bincount(day_offsets, weights=columns['success'], minlength=num_days).astype(np.int64)
+        total = np.bincount(day_offsets, minlength=num_days)
+        day_labels = np.datetime_as_string((first_day + np.arange(num_days)).astype('datetime64[D]')).tolist()
+        for offset in np.nonzero(total)[0].tolist():
+            counts = self.timeline.setdefault(day_labels[offset], [0, 0])
+            counts[0] += int(successful[offset])
+            counts[1] += int(total[offset] - successful[offset])
         
-        # Taxa de sucesso baseada no status
-        if status == "active":
-            success_rate = random.uniform(0.75, 0.95)
-        elif status == "inactive":
-            success_rate = random.uniform(0.30, 0.60)
-        else:  # pending
-            success_rate = random.uniform(0.50, 0.70)
+        if self._rollup_writer is None:
+            return
         
-        # Tamanho médio de backup
-        avg_size = random.uniform(0.5, 5.0)
+        # Agrupa por (cliente, dia); np.unique já devolve as chaves ordenadas por cliente e dia
+        keys, inverse = np.unique(columns['client_index'].astype(np.int64) * num_days + day_offsets, return_inverse=True)
+        group_total = np.bincount(inverse)
+        group_successful = np.bincount(inverse, weights=columns['success']).astype(np.int64)
+        group_size = np.round(np.bincount(inverse, weights=columns['size_gb']), 2)
+        client_index, day_offset = np.divmod(keys, num_days)
+        self._rollup_writer.writerows(
+            [clients[client]['id'], day_labels[offset], total, successful, total - successful, size]
+            for client, offset, total, successful, size in zip(
+                client_index.tolist(), day_offset.tolist(), group_total.tolist(),
+                group_successful.tolist(), group_size.tolist()
+            )
+        )
+
+    def merge(self, timeline, rollup_filename=None):
+        """Incorpora a timeline (e o arquivo de rollups) produzidos por outro agregador, ex.: de um shard"""
+        for day, (successful, failed) in timeline.items():
+            counts = self.timeline.setdefault(day, [0, 0])
+            counts[0] += successful
+            counts[1] += failed
         
+        if rollup_filename and self._rollup_writer is not None:
+            self._flush_client()
+            with open(rollup_filename, newline='', encoding='utf-8') as rollup_file:
+                reader = csv.reader(rollup_file)
+                next(reader)  # cabeçalho
+                self._rollup_writer.writerows(reader)
+
+    def close(self):
+        """Grava o rollup pendente e fecha o arquivo de rollups"""
+        if self._rollup_writer is not None:
+            self._flush_client()
+            self._rollup_file.close()
+            self._rollup_file = None
+            self._rollup_writer = None
+
+    def _flush_client(self):
+        for day in sorted(self._client_days):
+            successful, failed, size = self._client_days[day]
+            self._rollup_writer.writerow([self._current_client, day, successful + failed, successful, failed, round(size, 2)])
+        self._client_days = {}
+
+    def write_timeline(self, filename):
+        """Escreve a timeline diária contínua com as taxas de sucesso móveis de 7/30/90 dias"""
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(TIMELINE_FIELDNAMES)
+            if not self.timeline:
+                return
+            
+            # Dias sem backup entram com zero, como na timeline montada pelo dashboard
+            first_day = datetime.strptime(min(self.timeline), "%Y-%m-%d")
+            last_day = datetime.strptime(max(self.timeline), "%Y-%m-%d")
+            history = []
+            window_sums = {window: [0, 0] for window in ROLLING_WINDOWS}
+            day = first_day
+            while day <= last_day:
+                label = day.strftime("%Y-%m-%d")
+                successful, failed = self.timeline.get(label, (0, 0))
+                history.append((successful, failed))
+                
+                rates = []
+                for window in ROLLING_WINDOWS:
+                    sums = window_sums[window]
+                    sums[0] += successful
+                    sums[1] += failed
+                    if len(history) > window:
+                        expired_successful, expired_failed = history[-window - 1]
+                        sums[0] -= expired_successful
+                        sums[1] -= expired_failed
+                    rates.append(_success_rate(sums[0], sums[0] + sums[1]))
+                
+                writer.writerow([label, successful, failed, successful + failed, _success_rate(successful, successful + failed)] + rates)
+                day += timedelta(days=1)
+
+    def write_summary(self, filename):
+        """Escreve os totais no formato de BackupStats (getBackupStats do dashboard)"""
+        successful = sum(counts[0] for counts in self.timeline.values())
+        failed = sum(counts[1] for counts in self.timeline.values())
+        total = successful + failed
+        summary = {
+            'successful': successful,
+            'failed': failed,
+            'total': total,
+            'successRate': _success_rate(successful, total),
+            'firstDate': min(self.timeline) if self.timeline else None,
+            'lastDate': max(self.timeline) if self.timeline else None
+        }
+        with open(filename, 'w', encoding='utf-8') as jsonfile:
+            json.dump(summary, jsonfile, indent=2)
+
+def _success_rate(successful, total):
+    """Taxa de sucesso em porcentagem, com duas casas"""
+    return round(successful / total * 100, 2) if total else 0
+
+def read_last_backup_date(filename, tail_bytes=4096):
+    """Lê só o final do CSV de backups (ordenado por data) para obter a data mais recente"""
+    with open(filename, 'rb') as csvfile:
+        csvfile.seek(0, os.SEEK_END)
+        size = csvfile.tell()
+        csvfile.seek(max(0, size - tail_bytes))
+        lines = [line for line in csvfile.read().decode('utf-8', errors='ignore').splitlines() if line.strip()]
+    
+    if len(lines) < 2 and size <= tail_bytes:
+        return None  # só o cabeçalho
+    return next(csv.reader([lines[-1]]))[BACKUP_FIELDNAMES.index('date')]
+
+def append_backup_days(num_days, clients_filename='data/clients.csv', backup_filename='data/backup.csv', seed=None,
+                       scenario=None):
+    """Acrescenta N dias de backups ao dataset existente, sem regravar o histórico
+
+    Com a semente da geração, o histórico de cada cliente é sorteado de novo pelo cenário (sem formatar nem escrever)
+    para continuar o mesmo gerador: os dias novos saem iguais aos de uma geração única com N dias a mais. Sem ela,
+    os parâmetros de cada cliente são estimados do clients.csv e os dias novos usam sorteios novos.
+    """
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    with open(clients_filename, newline='', encoding='utf-8') as csvfile:
+        clients_with_stats = list(csv.DictReader(csvfile))
+    
+    last_date = read_last_backup_date(backup_filename)
+    if last_date is None:
+        raise RuntimeError(f"{backup_filename} não tem backups para continuar")
+    first_day = datetime.strptime(last_date[:10], "%Y-%m-%d") + timedelta(days=1)
+    start_date = scenario["start_date"]
+    if first_day <= start_date:
+        raise RuntimeError(f"{backup_filename} termina antes do início do cenário ({start_date:%Y-%m-%d}): "
+                           "use o mesmo cenário da geração")
+    
+    # Os backup_id são contíguos: o próximo é o total já registrado + 1
+    backup_id = sum(int(row['total_backups']) for row in clients_with_stats) + 1
+    id_digits = scenario["output"]["backup_id_digits"]
+    
+    # O limite de backups por cliente vale para o histórico inicial: no acréscimo, só os dias contam
+    history_days = (first_day - start_date).days + num_days - 1
+    clients = _append_clients(clients_with_stats, scenario, seed)
+    first_epoch = epoch_seconds(first_day)
+    new_values = [
+        values for values in iter_backup_values(clients, history_days + 1, seed, history_days, scenario)
+        if values[1] >= first_epoch
+    ]
+    # Numeração na ordem de geração e linhas na ordem de data, como na geração completa
+    new_backups = [
+        format_backup(backup_id + position, clients[client_index], *values, id_digits=id_digits)
+        for position, (client_index, *values) in enumerate(new_values)
+    ]
+    new_backups.sort(key=itemgetter('date'))
+    
+    # O CSV pode ser um hardlink restaurado do cache: acrescentar nele alteraria a entrada
+    release(backup_filename, keep_contents=True)
+    release(clients_filename)
+    rows_by_id = {row['client_id']: row for row in clients_with_stats}
+    with open(backup_filename, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerows([backup[field] for field in BACKUP_FIELDNAMES] for backup in new_backups)
+    
+    # Atualiza os contadores dos clientes sem reler o histórico
+    for backup in new_backups:
+        row = rows_by_id[backup['client_id']]
+        row['total_backups'] = int(row['total_backups']) + 1
+        if backup['status'] == 'success':
+            row['successful_backups'] = int(row['successful_backups']) + 1
+        else:
+            row['failed_backups'] = int(row['failed_backups']) + 1
+        row['last_backup_date'] = backup['date']
+    
+    write_clients_csv(clients_with_stats, clients_filename)
+    return len(new_backups), first_day, clients_with_stats
+
+def _append_clients(clients_with_stats, scenario, seed):
+    """Parâmetros de sorteio dos clientes do clients.csv: os da geração (mesmo cenário e semente) ou estimados dele"""
+    if seed is not None or scenario["clients"]["list"] is not None:
+        scenario = resolve_client_list(scenario, seed)
+        generated = scenario_clients(scenario, 0, len(clients_with_stats), seed)
+        if [(client["id"], client["name"], client["cnpj"]) for client in generated] == [
+            (row['client_id'], row['name'], row['cnpj']) for row in clients_with_stats
+        ]:
+            return generated
+    
+    # Sem a semente da geração: taxa de sucesso pelo histórico e tamanho médio do clients.csv
+    clients = []
+    for row in clients_with_stats:
+        total = int(row['total_backups'])
+        if total > 0:
+            success_rate = int(row['successful_backups']) / total
+        else:
+            low, high = scenario["clients"]["success_rate"].get(row['status'], (0.6, 0.6))
+            success_rate = (low + high) / 2
         clients.append({
-            "id": client_id,
-            "name": full_name,
-            "cnpj": cnpj,
-            "email": email,
-            "phone": phone,
-            "address": address,
-            "status": status,
-            "avg_size": round(avg_size, 2),
-            "success_rate": round(success_rate, 2)
+            "id": row['client_id'],
+            "name": row['name'],
+            "status": row['status'],
+            "avg_size": float(row['avg_backup_size_gb']),
+            "success_rate": success_rate
         })
-    
     return clients
 
-def generate_backup_data(clients, backups_per_client=400):
-    """Gera dados de backup para todos os clientes"""
-    backup_data = []
-    backup_id = 1
+def generate_sharded(num_clients, backups_per_client, seed, filename, workers=1, engine="dict", chunk_size=500000, aggregator=None, history_days=400, unique_cnpj=True, scenario=None):
+    """Gera clientes e backups em shards paralelos; a saída depende só da semente, não do número de workers"""
+    if scenario is None:
+        scenario = DEFAULT_SCENARIO
+    output_dir = _target_dir(filename)
+    shard_size = max(1, -(-num_clients // (workers * 4)))
     
-    # Data de início (400 dias atrás para ter 400 backups por cliente)
-    start_date = datetime(2023, 1, 1)
-    
-    for client in clients:
-        current_date = start_date
+    with tempfile.TemporaryDirectory(prefix='backup-shards-', dir=output_dir) as tmp_dir:
+        shards = []
+        for first in range(0, num_clients, shard_size):
+            shards.append({
+                'first_index': first,
+                'num_clients': min(shard_size, num_clients - first),
+                'backups_per_client': backups_per_client,
+                'seed': seed,
+                'engine': engine,
+                'history_days': history_days,
+                'unique_cnpj': unique_cnpj,
+                'scenario': scenario,
+                'chunk_size': chunk_size,
+                'path': os.path.join(tmp_dir, f'shard-{len(shards):05d}.csv'),
+                'rollup_path': os.path.join(tmp_dir, f'rollup-{len(shards):05d}.csv') if aggregator else None
+            })
         
-        # Cliente inativo para de fazer backup após 200 dias
-        if client["status"] == "inactive":
-            end_date_client = start_date + timedelta(days=200)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_generate_shard, shards))
         else:
-            end_date_client = start_date + timedelta(days=400)
+            results = [_generate_shard(shard) for shard in shards]
         
-        backup_count = 0
-        while current_date <= end_date_client and backup_count < backups_per_client:
-            # Pular fins de semana para alguns clientes (10% dos clientes)
-            if random.random() < 0.1 and current_date.weekday() >= 5:
-                current_date += timedelta(days=1)
-                continue
-            
-            # Gerar horário de backup
-            if random.random() < 0.7:  # 70% backup noturno
-                hour = random.randint(23, 23)
-            elif random.random() < 0.9:  # 20% backup madrugada
-                hour = random.randint(1, 3)
-            else:  # 10% backup tarde
-                hour = random.randint(22, 23)
-            
-            minute = random.randint(0, 59)
-            backup_time = current_date.replace(hour=hour, minute=minute, second=0)
-            
-            # Determinar se o backup foi bem-sucedido
-            is_success = random.random() < client["success_rate"]
-            status = "success" if is_success else "failed"
-            
-            if is_success:
-                # Tamanho baseado na média do cliente com variação
-                size_variation = random.uniform(0.8, 1.2)
-                size_gb = round(client["avg_size"] * size_variation, 2)
-                duration_minutes = random.randint(5, 20)
-            else:
-                size_gb = 0.0
-                duration_minutes = random.randint(1, 5)
-            
-            # Formatar duração
-            duration = f"{duration_minutes:02d}:{random.randint(0, 59):02d}"
-            
-            backup_data.append({
-                "backup_id": f"bkp_{backup_id:06d}",
-                "client_id": client["id"],
-                "client_name": client["name"],
-                "date": backup_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "status": status,
-                "duration": duration,
-                "size": f"{size_gb} GB"
-            })
-            
-            backup_id += 1
-            backup_count += 1
-            
-            # Próximo backup (diário)
-            current_date += timedelta(days=1)
+        # Os backup_id de cada shard começam em 1: o deslocamento é a soma dos shards anteriores
+        clients = []
+        client_stats = {}
+        offsets = []
+        next_offset = 0
+        for shard, (shard_clients, shard_stats, row_count, timeline) in zip(shards, results):
+            clients.extend(shard_clients)
+            client_stats.update(shard_stats)
+            offsets.append(next_offset)
+            next_offset += row_count
+            if aggregator is not None:
+                aggregator.merge(timeline, shard['rollup_path'])
+        
+        _merge_shards([shard['path'] for shard in shards], offsets, filename, scenario["output"]["backup_id_digits"])
     
-    return backup_data
+    return clients, client_stats
 
-def write_clients_csv(data, filename):
-    """Escreve arquivo CSV de clientes"""
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['client_id', 'name', 'cnpj', 'email', 'phone', 'address', 'status', 'join_date', 'logo', 'backup_frequency', 'backup_retention_days', 'last_backup_date', 'total_backups', 'successful_backups', 'failed_backups', 'avg_backup_size_gb']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
+def _generate_shard(shard):
+    """Gera um intervalo de clientes consecutivos e grava seus backups ordenados por data"""
+    scenario = shard['scenario']
+    clients = scenario_clients(scenario, shard['first_index'], shard['num_clients'], shard['seed'], shard['unique_cnpj'])
+    if shard['engine'] == 'numpy':
+        backup_rows = iter_backup_rows_columns(clients, shard['backups_per_client'], seed=shard['seed'], history_days=shard['history_days'], scenario=scenario)
+    else:
+        backup_rows = iter_backup_data(clients, shard['backups_per_client'], shard['seed'], shard['history_days'], scenario)
+    
+    client_stats = {}
+    aggregator = BackupAggregator(shard['rollup_path']) if shard['rollup_path'] else None
+    row_count = write_backup_csv_streaming(
+        iter_with_client_stats(backup_rows, client_stats, aggregator), shard['path'], shard['chunk_size']
+    )
+    if aggregator is None:
+        return clients, client_stats, row_count, {}
+    
+    aggregator.close()
+    return clients, client_stats, row_count, aggregator.timeline
 
-def write_backup_csv(data, filename):
-    """Escreve arquivo CSV de backups"""
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['backup_id', 'client_id', 'client_name', 'date', 'status', 'duration', 'size']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+def _merge_shards(paths, offsets, filename, id_digits=6):
+    """Intercala os arquivos dos shards por data, renumerando os backup_id globalmente"""
+    shard_files = [open(path, newline='', encoding='utf-8') for path in paths]
+    try:
+        readers = []
+        for shard_file, offset in zip(shard_files, offsets):
+            reader = csv.reader(shard_file)
+            next(reader)  # cabeçalho
+            readers.append(_offset_backup_ids(reader, offset, id_digits))
         
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
+        # Empates de data saem na ordem dos shards, que é a ordem global dos backup_id
+        date_key = itemgetter(BACKUP_FIELDNAMES.index('date'))
+        _write_backup_rows(heapq.merge(*readers, key=date_key), filename)
+    finally:
+        for shard_file in shard_files:
+            shard_file.close()
 
-if __name__ == "__main__":
-    print("Gerando 500 clientes...")
-    clients = generate_clients(500)
+def _offset_backup_ids(rows, offset, id_digits=6):
+    """Desloca os backup_id locais de um shard para a numeração global"""
+    for row in rows:
+        row[0] = f"bkp_{int(row[0][4:]) + offset:0{id_digits}d}"
+        yield row
+
+def run_scenario(scenario, instrumentation=None):
+    """Gera o dataset do cenário pelos caminhos rápidos; devolve os clientes com estatísticas e os arquivos escritos"""
+    if instrumentation is None:
+        instrumentation = GeneratorInstrumentation()
+    output = scenario["output"]
+    population = scenario["clients"]
+    seed = scenario["seed"]
+    num_clients = population["count"]
+    backups_per_client = scenario["backups_per_client"]
+    days = scenario["days"]
     
-    print("Gerando 400 backups por cliente...")
-    backup_data = generate_backup_data(clients, 400)
+    scenario = resolve_client_list(scenario, seed)
     
-    # Ordenar por data
-    backup_data.sort(key=lambda x: x['date'])
+    os.makedirs(output["dir"], exist_ok=True)
+    clear_outputs(output["dir"])
+    if output["workers"] > 1 and seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+        print(f"Semente mestre: {seed}")
     
-    # Calcular estatísticas para cada cliente
-    print("Calculando estatísticas...")
-    client_stats = {}
-    for backup in backup_data:
-        client_id = backup['client_id']
-        if client_id not in client_stats:
-            client_stats[client_id] = {
-                'total_backups': 0,
-                'successful_backups': 0,
-                'failed_backups': 0,
-                'last_backup_date': backup['date']
-            }
+    if output["upload"]:
+        # Layout do import em lote: um cliente por linha, sem clients.csv/backup.csv
+        upload_path = os.path.join(output["dir"], 'upload.csv')
+        print(f"Gerando {num_clients} clientes e {backups_per_client} backups por cliente no CSV de upload...")
+        with instrumentation.phase("CSV de upload (geração + serialização + escrita)") as phase:
+            clients, client_stats = generate_upload_csv(scenario, upload_path, seed, output["workers"], phase.advance)
+        return build_clients_with_stats(clients, client_stats, scenario), client_stats, [upload_path]
+    
+    clients_path = compressed_name(os.path.join(output["dir"], 'clients.csv'), output["compression"])
+    if output["partition"] is not None:
+        # Backups em um arquivo por mês (e balde de cliente) no lugar do backup.csv: o destino é o PartitionWriter
+        backup_path = PartitionWriter(os.path.join(output["dir"], PARTITION_DIR), output["client_buckets"], output["compression"])
+    else:
+        backup_path = compressed_name(os.path.join(output["dir"], 'backup.csv'), output["compression"])
+    files = [clients_path]
+    column_batches = None
+    aggregator = BackupAggregator(os.path.join(output["dir"], 'backup_daily_clients.csv')) if output["aggregates"] else None
+    
+    if seed is not None:
+        # Geração determinística em shards (em paralelo com workers > 1)
+        print(f"Gerando {num_clients} clientes e {backups_per_client} backups por cliente em {output['workers']} processo(s)...")
+        with instrumentation.phase("geração em shards (clientes + backups + escrita)") as phase:
+            clients, client_stats = generate_sharded(
+                num_clients, backups_per_client, seed, backup_path,
+                workers=output["workers"], engine=output["engine"], chunk_size=output["chunk_size"], aggregator=aggregator,
+                history_days=days, unique_cnpj=population["unique_cnpj"], scenario=scenario
+            )
+            phase.advance(sum(stats['total_backups'] for stats in client_stats.values()))
+    elif output["stream"]:
+        print(f"Gerando {num_clients} clientes...")
+        with instrumentation.phase("geração de clientes") as phase:
+            clients = scenario_clients(scenario)
+            phase.advance(len(clients))
         
-        client_stats[client_id]['total_backups'] += 1
-        if backup['status'] == 'success':
-            client_stats[client_id]['successful_backups'] += 1
+        print(f"Gerando {backups_per_client} backups por cliente...")
+        # Geração, estatísticas e escrita em uma única passada, com memória constante
+        if output["engine"] == "numpy":
+            backup_rows = iter_backup_rows_columns(clients, backups_per_client, history_days=days, scenario=scenario)
         else:
-            client_stats[client_id]['failed_backups'] += 1
+            backup_rows = iter_backup_data(clients, backups_per_client, history_days=days, scenario=scenario)
         
-        # Atualizar última data de backup
-        if backup['date'] > client_stats[client_id]['last_backup_date']:
-            client_stats[client_id]['last_backup_date'] = backup['date']
+        print("Ordenando e escrevendo backups em modo streaming...")
+        client_stats = {}
+        with instrumentation.phase("backups em streaming (geração + estatísticas + escrita)") as phase:
+            write_backup_csv_streaming(
+                instrumentation.track(iter_with_client_stats(backup_rows, client_stats, aggregator), phase),
+                backup_path, output["chunk_size"]
+            )
+    else:
+        print(f"Gerando {num_clients} clientes...")
+        with instrumentation.phase("geração de clientes") as phase:
+            clients = scenario_clients(scenario)
+            phase.advance(len(clients))
+        
+        print(f"Gerando {backups_per_client} backups por cliente...")
+        if output["engine"] == "numpy":
+            with instrumentation.phase("geração de backups") as phase:
+                columns = generate_backup_columns(clients, backups_per_client, history_days=days, progress=phase.advance, scenario=scenario)
+            
+            # Ordenar por data (ordenação estável, como o sort da lista de dicionários)
+            with instrumentation.phase("ordenação") as phase:
+                order = date_order(columns["timestamp"])
+                phase.advance(len(order))
+            
+            print("Calculando estatísticas...")
+            with instrumentation.phase("estatísticas") as phase:
+                client_stats = compute_client_stats_columns(columns, clients)
+                if aggregator is not None:
+                    aggregator.add_columns(columns, clients)
+                phase.advance(len(order))
+            backup_lines = iter_backup_column_lines(columns, clients, order, id_digits=output["backup_id_digits"])
+            total_rows = len(order)
+            column_batches = lambda: iter_sorted_column_batches(columns, order)
+        else:
+            # Struct-of-arrays com os sorteios de referência; o texto só é montado na escrita
+            with instrumentation.phase("geração de backups") as phase:
+                records = BackupRecords()
+                records.extend(instrumentation.track(
+                    iter_backup_values(clients, backups_per_client, history_days=days, scenario=scenario), phase
+                ))
+            
+            # Calcular estatísticas para cada cliente (antes do sort, na ordem de geração)
+            print("Calculando estatísticas...")
+            with instrumentation.phase("estatísticas") as phase:
+                client_stats = records.client_stats(clients)
+                if aggregator is not None:
+                    for backup in records.iter_rows(clients, id_digits=output["backup_id_digits"]):
+                        aggregator.add(backup)
+                phase.advance(len(records))
+            
+            # Ordenar por data
+            with instrumentation.phase("ordenação") as phase:
+                order = records.date_order()
+                phase.advance(len(order))
+            backup_lines = records.iter_lines(clients, order, id_digits=output["backup_id_digits"])
+            total_rows = len(records)
+            if np is not None:
+                column_batches = lambda: iter_sorted_column_batches(records.columns(), order)
+        
+        print("Escrevendo backups...")
+        with instrumentation.phase("escrita do CSV de backups", total=total_rows) as phase:
+            write_backup_lines(instrumentation.track(backup_lines, phase), backup_path)
+    files.extend(backup_path.files if isinstance(backup_path, PartitionWriter) else [backup_path])
+    
+    # Saídas colunares e dumps de banco: direto das colunas em memória ou relendo o backup.csv (ou as partições) em lotes
+    def backup_batches():
+        if column_batches:
+            return column_batches()
+        if isinstance(backup_path, PartitionWriter):
+            return iter_backup_row_batches(iter_partition_rows(backup_path.directory), clients)
+        return iter_backup_csv_batches(backup_path, clients)
+    
+    for fmt in output["formats"]:
+        print(f"Escrevendo backups em formato {fmt}...")
+        filename = os.path.join(output["dir"], 'backup' + COLUMNAR_FORMATS[fmt])
+        with instrumentation.phase(f"escrita {fmt}"):
+            write_backup_columnar(backup_batches(), clients, filename, fmt)
+        files.append(filename)
+    
+    for database in output["databases"]:
+        print(f"Escrevendo dump {database}...")
+        with instrumentation.phase(f"dump {database}") as phase:
+            files.extend(write_database(database, backup_batches(), clients,
+                                        os.path.join(output["dir"], DATABASE_OUTPUTS[database]), phase.advance))
+    
+    if aggregator is not None:
+        print("Escrevendo agregados...")
+        with instrumentation.phase("escrita dos agregados"):
+            aggregator.close()
+            aggregator.write_timeline(os.path.join(output["dir"], 'backup_timeline.csv'))
+            aggregator.write_summary(os.path.join(output["dir"], 'backup_summary.json'))
+        files.extend(os.path.join(output["dir"], name) for name in ('backup_daily_clients.csv', 'backup_timeline.csv', 'backup_summary.json'))
     
     # Preparar dados dos clientes com estatísticas
     print("Preparando dados finais...")
-    clients_with_stats = []
-    for client in clients:
-        stats = client_stats.get(client['id'], {
-            'total_backups': 0,
-            'successful_backups': 0,
-            'failed_backups': 0,
-            'last_backup_date': 'N/A'
-        })
-        
-        clients_with_stats.append({
-            'client_id': client['id'],
-            'name': client['name'],
-            'cnpj': client['cnpj'],
-            'email': client['email'],
-            'phone': client['phone'],
-            'address': client['address'],
-            'status': client['status'],
-            'join_date': '2023-01-15',
-            'logo': 'https://api.placeholder.com/40/40',
-            'backup_frequency': 'daily',
-            'backup_retention_days': 30,
-            'last_backup_date': stats['last_backup_date'],
-            'total_backups': stats['total_backups'],
-            'successful_backups': stats['successful_backups'],
-            'failed_backups': stats['failed_backups'],
-            'avg_backup_size_gb': client['avg_size']
-        })
+    with instrumentation.phase("escrita do CSV de clientes") as phase:
+        clients_with_stats = build_clients_with_stats(clients, client_stats, scenario)
+        write_clients_csv(instrumentation.track(clients_with_stats, phase), clients_path)
     
-    # Escrever arquivos
-    print("Escrevendo arquivos...")
-    write_clients_csv(clients_with_stats, 'data/clients.csv')
-    write_backup_csv(backup_data, 'data/backup.csv')
+    return clients_with_stats, client_stats, files
+
+def output_names():
+    """Nomes de todos os arquivos que run_scenario pode escrever no diretório de saída"""
+    return (['clients.csv', 'backup.csv', 'upload.csv']
+            + [compressed_name(name, compression) for name in ('clients.csv', 'backup.csv') for compression in COMPRESSIONS]
+            + ['backup' + extension for extension in COLUMNAR_FORMATS.values()]
+            + ['backup_daily_clients.csv', 'backup_timeline.csv', 'backup_summary.json', DATABASE_OUTPUTS['sqlite']])
+
+def output_dirs():
+    """Subdiretórios que run_scenario pode escrever no diretório de saída (removidos inteiros antes de regerar)"""
+    return [PARTITION_DIR] + [name for database, name in DATABASE_OUTPUTS.items() if database != 'sqlite']
+
+def clear_outputs(output_dir, keep=()):
+    """Remove as saídas de uma geração anterior que não estão em keep; devolve os nomes removidos
+
+    Remove em vez de sobrescrever: um arquivo restaurado do cache é hardlink da entrada, e nada da geração
+    anterior fica ao lado da nova (o servidor mock e as consultas leem data/backup.csv por padrão).
+    """
+    removed = []
+    for name in output_names():
+        path = os.path.join(output_dir, name)
+        if name not in keep and os.path.lexists(path):
+            os.unlink(path)
+            removed.append(name)
+    
+    # Diretórios (partições, dumps do PostgreSQL) de uma execução anterior não podem sobrar ao lado dos novos
+    for name in output_dirs():
+        stale = False
+        for directory, _, files in os.walk(os.path.join(output_dir, name), topdown=False):
+            for file_name in files:
+                path = os.path.join(directory, file_name)
+                if os.path.relpath(path, output_dir) not in keep:
+                    os.unlink(path)
+                    stale = True
+            if not os.listdir(directory):
+                os.rmdir(directory)
+        if stale:
+            removed.append(name)
+    return removed
+
+# Código que determina a saída (o motor e o pacote dos sorteios de referência), relativo a este diretório
+SOURCE_FILES = (
+    "generate_large_dataset.py", "backup_generator/core.py", "backup_generator/cnpj.py",
+    "backup_generator/partitions.py", "backup_generator/reference.py", "backup_generator/reference_data.json",
+    "backup_generator/sampling.py", "backup_generator/text_output.py",
+)
+
+def scenario_cache_parts(scenario):
+    """O que determina os bytes da saída: o cenário (sem diretório, workers e tamanho de bloco), o código e as bibliotecas"""
+    output = {key: value for key, value in scenario["output"].items() if key not in ("dir", "workers", "chunk_size", "stream")}
+    here = os.path.dirname(os.path.abspath(__file__))
+    return {
+        "scenario": dict(scenario, output=output),
+        "source": source_digest([os.path.join(here, name) for name in SOURCE_FILES]),
+        "numpy": None if np is None else np.__version__,
+        "pyarrow": None if pa is None else pa.__version__,
+    }
+
+def run_cached_scenario(scenario, instrumentation=None, cache=None):
+    """run_scenario com o cache de saídas: em um acerto só restaura os arquivos; devolve (resumo, arquivos)"""
+    if instrumentation is None:
+        instrumentation = GeneratorInstrumentation()
+    key = None
+    if cache is not None:
+        if scenario["seed"] is None:
+            print("ℹ️  Sem semente a saída é aleatória: o cache de saídas não é usado")
+        else:
+            key = cache_key(scenario_cache_parts(scenario))
+            with instrumentation.phase("cache de saídas (restauração)"):
+                manifest = cache.restore(key, scenario["output"]["dir"])
+            if manifest is not None:
+                clear_outputs(scenario["output"]["dir"], keep=manifest["files"])
+                print(f"♻️  Saídas reaproveitadas do cache ({key[:12]}), sem regerar")
+                return manifest["summary"], manifest["paths"]
     
-    print(f"\n✅ Dataset gerado com sucesso!")
-    print(f"📊 Clientes: {len(clients_with_stats)}")
-    print(f"📊 Backups: {len(backup_data):,}")
-    print(f"📊 Média de backups por cliente: {len(backup_data) // len(clients_with_stats)}")
+    clients_with_stats, client_stats, files = run_scenario(scenario, instrumentation)
+    summary = report_summary(clients_with_stats, client_stats)
+    if key is not None:
+        with instrumentation.phase("cache de saídas (armazenamento)"):
+            stored = cache.store(key, files, summary, root=scenario["output"]["dir"])
+        if not stored:
+            print("ℹ️  Saídas maiores que o limite do cache (ou já guardadas por outra execução): não guardadas")
+    return summary, files
+
+def report_summary(clients_with_stats, client_stats):
+    """Números do resumo do dataset (o que print_summary mostra), sem as listas completas"""
+    statuses = {'active': 0, 'inactive': 0, 'pending': 0}
+    for client in clients_with_stats:
+        statuses[client['status']] = statuses.get(client['status'], 0) + 1
+    return {
+        'clients': len(clients_with_stats),
+        'successful_backups': sum(stats['successful_backups'] for stats in client_stats.values()),
+        'failed_backups': sum(stats['failed_backups'] for stats in client_stats.values()),
+        'statuses': statuses,
+    }
+
+def print_report(clients_with_stats, client_stats, files):
+    """Imprime o resumo do dataset gerado"""
+    print_summary(report_summary(clients_with_stats, client_stats), files)
+
+def print_summary(summary, files):
+    """Imprime o resumo do dataset a partir de report_summary"""
+    success_count = summary['successful_backups']
+    failed_count = summary['failed_backups']
+    total_count = success_count + failed_count
+    num_clients = summary['clients']
     
-    # Estatísticas gerais
-    success_count = sum(1 for item in backup_data if item['status'] == 'success')
-    failed_count = sum(1 for item in backup_data if item['status'] == 'failed')
-    total_count = len(backup_data)
+    print("\n✅ Dataset gerado com sucesso!")
+    print(f"📊 Clientes: {num_clients}")
+    print(f"📊 Backups: {total_count:,}")
+    print(f"📊 Média de backups por cliente: {total_count // num_clients}")
     
-    print(f"\n📈 Estatísticas de Backup:")
+    print("\n📈 Estatísticas de Backup:")
     print(f"   Sucessos: {success_count:,} ({(success_count/total_count*100):.1f}%)")
     print(f"   Falhas: {failed_count:,} ({(failed_count/total_count*100):.1f}%)")
     
     # Estatísticas por status de cliente
-    active_clients = sum(1 for c in clients_with_stats if c['status'] == 'active')
-    inactive_clients = sum(1 for c in clients_with_stats if c['status'] == 'inactive')
-    pending_clients = sum(1 for c in clients_with_stats if c['status'] == 'pending')
-    
-    print(f"\n👥 Distribuição de Clientes:")
-    print(f"   Ativos: {active_clients} ({(active_clients/len(clients_with_stats)*100):.1f}%)")
-    print(f"   Inativos: {inactive_clients} ({(inactive_clients/len(clients_with_stats)*100):.1f}%)")
-    print(f"   Pendentes: {pending_clients} ({(pending_clients/len(clients_with_stats)*100):.1f}%)")
-    
-    print(f"\n🎯 Arquivos atualizados:")
-    print(f"   📁 data/clients.csv")
-    print(f"   📁 data/backup.csv")
+    active_clients = summary['statuses'].get('active', 0)
+    inactive_clients = summary['statuses'].get('inactive', 0)
+    pending_clients = summary['statuses'].get('pending', 0)
+    
+    print("\n👥 Distribuição de Clientes:")
+    print(f"   Ativos: {active_clients} ({(active_clients/num_clients*100):.1f}%)")
+    print(f"   Inativos: {inactive_clients} ({(inactive_clients/num_clients*100):.1f}%)")
+    print(f"   Pendentes: {pending_clients} ({(pending_clients/num_clients*100):.1f}%)")
+    
+    print("\n🎯 Arquivos atualizados:")
+    for filename in files:
+        print(f"   📁 {filename}")
+
+def main(argv=None):
+    """Linha de comando do gerador (argv: argumentos sem o nome do programa; padrão: sys.argv)"""
+    parser = argparse.ArgumentParser(description="Gera um dataset grande de clientes e backups")
+    parser.add_argument("--scenario", default=None, metavar="ARQUIVO",
+                        help="Cenário em YAML ou JSON (ex.: scenarios/extended.json); as opções abaixo o sobrescrevem")
+    parser.add_argument("--clients", type=int, default=None, help="Número de clientes (padrão: 500)")
+    parser.add_argument("--backups-per-client", type=int, default=None, help="Máximo de backups por cliente (padrão: 400)")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Dias de histórico a partir de 2023-01-01; inativos param na metade (padrão: 400)")
+    parser.add_argument("--weights", choices=["population"], default=None,
+                        help="Sorteia estados, cidades e DDDs com os pesos populacionais reais (padrão: uniforme)")
+    parser.add_argument("--sampling", choices=list(SAMPLING_MODES), default=None,
+                        help="reference: um gerador por cliente (padrão); batch: a população inteira em lote com numpy")
+    parser.add_argument("--engine", choices=["dict", "numpy"], default=None,
+                        help="dict: implementação de referência; numpy: motor colunar vetorizado")
+    parser.add_argument("--stream", action="store_true",
+                        help="Gera e escreve em blocos com memória constante (ordenação externa por data)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Linhas por bloco ordenado em memória no modo streaming (padrão: 500000)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semente mestre: cada cliente recebe uma semente derivada e a saída é reproduzível")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processos para geração em shards (implica --seed; padrão: 1)")
+    parser.add_argument("--unique-cnpj", action="store_true",
+                        help="CNPJs em lote, garantidamente distintos: já é o padrão (mantido por compatibilidade)")
+    parser.add_argument("--legacy-cnpj", action="store_true",
+                        help="Sorteia o CNPJ cliente a cliente, como antes: reproduz datasets antigos da mesma semente, "
+                             "mas os CNPJs podem se repetir")
+    parser.add_argument("--aggregates", action="store_true",
+                        help="Gera também os agregados do dashboard (rollups diários, timeline e resumo)")
+    parser.add_argument("--append-days", type=int, default=None,
+                        help="Acrescenta N dias ao dataset existente em vez de regerar tudo")
+    parser.add_argument("--upload", action="store_true",
+                        help="Gera só o upload.csv no schema do import em lote (CsvRow: um cliente por linha, backups em JSON)")
+    parser.add_argument("--compress", choices=list(COMPRESSIONS), default=None,
+                        help="Comprime clients.csv e backup.csv em streaming (backup.csv.gz ou backup.csv.zst)")
+    parser.add_argument("--databases", default=None,
+                        help="Dumps para o banco do backend, separados por vírgula: " + ", ".join(DATABASE_OUTPUTS))
+    parser.add_argument("--partition", choices=list(PARTITION_MODES), default=None,
+                        help="Particiona os backups em backup_partitions/ (um arquivo por mês, com manifest.json) no lugar do backup.csv")
+    parser.add_argument("--client-buckets", type=int, default=None,
+                        help="Com --partition, divide cada mês em N baldes de cliente (crc32 do client_id)")
+    parser.add_argument("--formats", default=None,
+                        help="Formatos colunares extras, separados por vírgula: " + ", ".join(COLUMNAR_FORMATS))
+    add_cache_arguments(parser)
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    try:
+        scenario = load_scenario(args.scenario) if args.scenario else normalize_scenario({})
+    except (OSError, ValueError, RuntimeError) as error:
+        parser.error(f"cenário inválido: {error}")
+    
+    # As opções da linha de comando têm precedência sobre o arquivo de cenário
+    output = scenario["output"]
+    if args.clients is not None:
+        scenario["clients"]["count"] = args.clients
+    if args.backups_per_client is not None:
+        scenario["backups_per_client"] = args.backups_per_client
+    if args.days is not None:
+        # Cenário sem limite de backups (backups_per_client: null): o limite acompanha o histórico novo
+        if args.backups_per_client is None and scenario["backups_per_client"] == scenario["days"] + 1:
+            scenario["backups_per_client"] = args.days + 1
+        scenario["days"] = args.days
+    if args.seed is not None:
+        scenario["seed"] = args.seed
+    if args.unique_cnpj and args.legacy_cnpj:
+        parser.error("use --unique-cnpj ou --legacy-cnpj, não os dois")
+    if args.unique_cnpj:
+        scenario["clients"]["unique_cnpj"] = True
+    if args.legacy_cnpj:
+        scenario["clients"]["unique_cnpj"] = False
+    if args.weights is not None:
+        scenario["clients"]["weights"] = args.weights
+    if args.sampling is not None:
+        scenario["clients"]["sampling"] = args.sampling
+    if args.engine is not None:
+        output["engine"] = args.engine
+    if args.stream:
+        output["stream"] = True
+    if args.chunk_size is not None:
+        output["chunk_size"] = args.chunk_size
+    if args.workers is not None:
+        output["workers"] = args.workers
+    if args.aggregates:
+        output["aggregates"] = True
+    if args.formats is not None:
+        output["formats"] = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    for fmt in output["formats"]:
+        if fmt not in COLUMNAR_FORMATS:
+            parser.error(f"formato desconhecido: {fmt}")
+    if args.databases is not None:
+        output["databases"] = [database.strip() for database in args.databases.split(",") if database.strip()]
+    for database in output["databases"]:
+        if database not in DATABASE_OUTPUTS:
+            parser.error(f"dump de banco desconhecido: {database}")
+    if args.compress is not None:
+        output["compression"] = args.compress
+    if args.partition is not None:
+        output["partition"] = args.partition
+    if args.client_buckets is not None:
+        output["client_buckets"] = args.client_buckets
+    if output["client_buckets"] < 1:
+        parser.error("--client-buckets deve ser pelo menos 1")
+    if output["client_buckets"] > 1 and output["partition"] is None:
+        parser.error("--client-buckets requer --partition")
+    if args.upload:
+        output["upload"] = True
+    if output["upload"] and (output["formats"] or output["databases"] or output["aggregates"] or output["compression"]
+                             or output["partition"]):
+        parser.error("--upload gera só o upload.csv: não combina com --formats, --databases, --aggregates, --compress "
+                     "ou --partition")
+    
+    if args.append_days is not None and (output["formats"] or output["databases"] or output["aggregates"] or output["upload"]
+                                         or output["compression"] or output["partition"]):
+        parser.error("--append-days só acrescenta ao backup.csv e ao clients.csv: não combina com --formats, --databases, "
+                     "--aggregates, --upload, --compress ou --partition")
+    
+    if args.append_days is not None:
+        # Um .gz/.zst não recebe linhas no fim sem ser reescrito inteiro, e as partições não têm o backup.csv único
+        compressed = [
+            compressed_name(name, compression) for name in ('clients.csv', 'backup.csv') for compression in COMPRESSIONS
+            if os.path.exists(compressed_name(os.path.join(output["dir"], name), compression))
+        ]
+        if compressed:
+            parser.error(f"--append-days continua só datasets sem compressão ({', '.join(compressed)} em {output['dir']}): "
+                         "regere sem --compress")
+        if os.path.isdir(os.path.join(output["dir"], PARTITION_DIR)):
+            parser.error(f"--append-days continua só o backup.csv único ({PARTITION_DIR} em {output['dir']}): "
+                         "regere sem --partition")
+        print(f"Acrescentando {args.append_days} dia(s) de backups ao dataset existente...")
+        appended, first_day, clients_with_stats = append_backup_days(
+            args.append_days, os.path.join(output["dir"], 'clients.csv'), os.path.join(output["dir"], 'backup.csv'),
+            seed=scenario["seed"], scenario=scenario
+        )
+        last_day = first_day + timedelta(days=args.append_days - 1)
+        print(f"\n✅ {appended:,} backups acrescentados ({first_day:%Y-%m-%d} a {last_day:%Y-%m-%d})")
+        print(f"📊 Clientes atualizados: {len(clients_with_stats)}")
+        # Colunares e agregados da geração anterior não têm os dias novos: removidos para não servir dados velhos
+        stale = clear_outputs(output["dir"], keep=('clients.csv', 'backup.csv'))
+        if stale:
+            print(f"🗑️  Saídas derivadas desatualizadas removidas (regere com --formats/--aggregates/--databases): {', '.join(stale)}")
+        return
+    
+    if args.scenario:
+        print(f"Cenário: {scenario['name']}")
+    instrumentation = instrumentation_from_args(args)
+    instrumentation.start()
+    summary, files = run_cached_scenario(scenario, instrumentation, cache_from_args(args))
+    instrumentation.finish()
+    
+    print_summary(summary, files)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# Diretório padrão do cache (CI e containers de desenvolvimento podem apontar para um volume persistente)
+CACHE_ENV = "BACKUP_GENERATOR_CACHE"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "backup-generator")
+DEFAULT_MAX_GB = 10.0
+MANIFEST = "manifest.json"
+
+def cache_key(parts):
+    """Chave do conteúdo: SHA-256 do JSON canônico dos parâmetros que determinam a saída"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _canonical(value):
+    # Datas viram texto ISO e conjuntos (filtros das agendas) viram listas ordenadas
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+def source_digest(paths):
+    """SHA-256 do código-fonte: qualquer mudança no gerador invalida o cache"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+def release(path, keep_contents=False):
+    """Desfaz o hardlink de um arquivo de saída com o cache antes de reescrevê-lo
+
+    Escrever por cima (modo 'w' ou 'a') de um arquivo restaurado por hardlink alteraria a entrada do cache;
+    com keep_contents o arquivo vira uma cópia independente, senão é só removido.
+    """
+    try:
+        if os.stat(path).st_nlink <= 1:
+            return
+    except FileNotFoundError:
+        return
+    if not keep_contents:
+        os.unlink(path)
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".release-", dir=directory)
+    os.close(fd)
+    shutil.copy2(path, tmp_path)
+    os.replace(tmp_path, path)
+
+class OutputCache:
+    """Cache endereçado por conteúdo das saídas do gerador, com despejo LRU limitado por tamanho"""
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=int(DEFAULT_MAX_GB * 1024 ** 3)):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def restore(self, key, output_dir):
+        """Em um acerto, liga (ou copia) os arquivos da entrada em output_dir e devolve o manifesto"""
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        entry_dir = self.entry_dir(key)
+        for name, (size, mtime_ns) in manifest["files"].items():
+            stat = os.stat(os.path.join(entry_dir, name))
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                # Alguém alterou o arquivo da entrada (ou o hardlink dele): a entrada não vale mais
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return None
+
+        os.makedirs(output_dir, exist_ok=True)
+        for name in manifest["files"]:
+            target = os.path.join(output_dir, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _link_or_copy(os.path.join(entry_dir, name), target)
+        manifest["last_used"] = time.time()
+        self._write_manifest(entry_dir, manifest)
+        manifest["paths"] = [os.path.join(output_dir, name) for name in manifest["files"]]
+        return manifest
+
+    def store(self, key, files, summary=None, root=None):
+        """Guarda as saídas de uma geração e despeja as entradas menos usadas além do limite; devolve se guardou
+
+        Com root, cada arquivo é guardado pelo caminho relativo a ele (subdiretórios como backup_partitions/);
+        sem root, pelo nome do arquivo.
+        """
+        total_bytes = sum(os.path.getsize(path) for path in files)
+        if total_bytes > self.max_bytes:
+            return False
+        os.makedirs(self.root, exist_ok=True)
+        # Monta a entrada em um diretório temporário e publica com rename: execuções concorrentes não se veem pela metade
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            entry_files = {}
+            for path in files:
+                name = os.path.basename(path) if root is None else os.path.relpath(path, root)
+                target = os.path.join(tmp_dir, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                _link_or_copy(path, target)
+                stat = os.stat(target)
+                entry_files[name] = [stat.st_size, stat.st_mtime_ns]
+            now = time.time()
+            self._write_manifest(tmp_dir, {
+                "files": entry_files,
+                "bytes": total_bytes,
+                "summary": summary,
+                "created": now,
+                "last_used": now,
+            })
+            try:
+                os.rename(tmp_dir, self.entry_dir(key))
+            except OSError:
+                return False  # outra execução publicou a mesma chave primeiro
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=key)
+        return True
+
+    def entries(self):
+        """(chave, manifesto) de cada entrada válida, da menos para a mais recentemente usada"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            if key.startswith("."):
+                continue
+            manifest = self._read_manifest(key)
+            if manifest is not None:
+                entries.append((key, manifest))
+        entries.sort(key=lambda entry: entry[1]["last_used"])
+        return entries
+
+    def evict(self, keep=None):
+        """Remove as entradas menos recentemente usadas até o cache caber em max_bytes; devolve as chaves removidas"""
+        entries = self.entries()
+        total_bytes = sum(manifest["bytes"] for _, manifest in entries)
+        evicted = []
+        for key, manifest in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+            total_bytes -= manifest["bytes"]
+            evicted.append(key)
+        return evicted
+
+    def _read_manifest(self, key):
+        try:
+            with open(os.path.join(self.entry_dir(key), MANIFEST), encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, entry_dir, manifest):
+        tmp_path = os.path.join(entry_dir, MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, MANIFEST))
+
+def _link_or_copy(source, target):
+    """Hardlink quando origem e destino estão no mesmo sistema de arquivos; cópia nos demais casos"""
+    if os.path.lexists(target):
+        os.unlink(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+def add_cache_arguments(parser):
+    """Adiciona as opções do cache de saídas a um ArgumentParser"""
+    parser.add_argument("--cache-dir", default=os.environ.get(CACHE_ENV, DEFAULT_CACHE_DIR),
+                        help=f"Diretório do cache de saídas (padrão: ${CACHE_ENV} ou {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_MAX_GB,
+                        help=f"Tamanho máximo do cache; as entradas menos usadas saem primeiro (padrão: {DEFAULT_MAX_GB:g})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Sempre regera, sem consultar nem alimentar o cache")
+
+def cache_from_args(args):
+    """Cria o cache a partir das opções de add_cache_arguments (None com --no-cache)"""
+    if args.no_cache:
+        return None
+    return OutputCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
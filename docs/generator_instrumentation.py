@@ -0,0 +1,138 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class Phase:
+    """Uma fase instrumentada: tempo, linhas processadas e progresso ao vivo"""
+
+    def __init__(self, name, total, instrumentation):
+        self.name = name
+        self.total = total
+        self.rows = 0
+        self.seconds = 0.0
+        self.peak_memory_mb = None
+        self._instrumentation = instrumentation
+        self._started = time.perf_counter()
+        self._last_report = self._started
+
+    def advance(self, rows=1):
+        """Contabiliza linhas processadas e mostra o progresso a cada intervalo"""
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_report >= self._instrumentation.progress_interval:
+            self._last_report = now
+            self._instrumentation.report_progress(self, now - self._started)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else None
+
+class GeneratorInstrumentation:
+    """Mede cada fase dos geradores e, opcionalmente, perfila com cProfile/tracemalloc"""
+
+    def __init__(self, progress_interval=2.0, profile_path=None, tracemalloc_path=None, output=sys.stderr):
+        self.progress_interval = progress_interval
+        self.profile_path = profile_path
+        self.tracemalloc_path = tracemalloc_path
+        self.output = output
+        self.phases = []
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        """Inicia a medição (e os perfis pedidos)"""
+        self._started = time.perf_counter()
+        if self.tracemalloc_path:
+            tracemalloc.start()
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def phase(self, name, total=None):
+        """Contexto de uma fase; use phase.advance(n) ou track() para contar linhas"""
+        current = Phase(name, total, self)
+        if self.tracemalloc_path:
+            tracemalloc.reset_peak()
+        try:
+            yield current
+        finally:
+            current.seconds = time.perf_counter() - current._started
+            if self.tracemalloc_path:
+                current.peak_memory_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            self.phases.append(current)
+            self._print(f"   ⏱️  {self._describe(current)}")
+
+    def track(self, iterable, phase, step=10000):
+        """Repassa os itens contando-os na fase (o progresso é verificado a cada `step` itens)"""
+        pending = 0
+        for item in iterable:
+            yield item
+            pending += 1
+            if pending == step:
+                phase.advance(pending)
+                pending = 0
+        if pending:
+            phase.advance(pending)
+
+    def report_progress(self, phase, elapsed):
+        """Imprime a taxa ao vivo de uma fase em andamento"""
+        rate = phase.rows / elapsed if elapsed > 0 else 0
+        line = f"   … {phase.name}: {phase.rows:,} linhas, {rate:,.0f} linhas/s"
+        if phase.total:
+            line += f" ({phase.rows / phase.total:.0%})"
+        self._print(line)
+
+    def finish(self):
+        """Encerra os perfis, grava os dumps e imprime o resumo por fase"""
+        total_seconds = time.perf_counter() - self._started if self._started else 0.0
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            summary = io.StringIO()
+            pstats.Stats(self._profiler, stream=summary).sort_stats("cumulative").print_stats(15)
+            self._print(summary.getvalue())
+            self._print(f"💾 Perfil cProfile salvo em {self.profile_path}")
+
+        if self.tracemalloc_path:
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(self.tracemalloc_path)
+            tracemalloc.stop()
+            self._print("🧠 Maiores alocações (tracemalloc):")
+            for stat in snapshot.statistics("lineno")[:10]:
+                self._print(f"   {stat}")
+            self._print(f"💾 Snapshot tracemalloc salvo em {self.tracemalloc_path}")
+
+        self._print(f"\n⏱️  Tempo por fase (total {total_seconds:.2f}s):")
+        for phase in self.phases:
+            share = phase.seconds / total_seconds if total_seconds > 0 else 0
+            self._print(f"   {self._describe(phase)} [{share:.0%}]")
+
+    def _describe(self, phase):
+        text = f"{phase.name}: {phase.seconds:.2f}s"
+        if phase.rows:
+            text += f", {phase.rows:,} linhas ({phase.rows_per_second:,.0f} linhas/s)"
+        if phase.peak_memory_mb is not None:
+            text += f", pico {phase.peak_memory_mb:.1f} MB"
+        return text
+
+    def _print(self, text):
+        print(text, file=self.output, flush=True)
+
+def add_instrumentation_arguments(parser):
+    """Adiciona as opções de instrumentação a um ArgumentParser"""
+    parser.add_argument("--progress-interval", type=float, default=2.0,
+                        help="Segundos entre as linhas de progresso ao vivo (padrão: 2)")
+    parser.add_argument("--profile", default=None, metavar="ARQUIVO",
+                        help="Perfila a execução com cProfile e salva o dump (.prof) neste arquivo")
+    parser.add_argument("--tracemalloc", default=None, metavar="ARQUIVO",
+                        help="Rastreia alocações com tracemalloc e salva o snapshot neste arquivo")
+
+def instrumentation_from_args(args):
+    """Cria a instrumentação a partir das opções de add_instrumentation_arguments"""
+    return GeneratorInstrumentation(args.progress_interval, args.profile, args.tracemalloc)
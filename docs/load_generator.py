@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import generate_large_dataset as generator
+from generator_instrumentation import add_instrumentation_arguments, instrumentation_from_args
+from mock_api_server import client_number
+
+# Percentis reportados por endpoint
+PERCENTILES = [50, 95, 99]
+
+class HttpError(Exception):
+    """Falha de protocolo ou de conexão (sem resposta HTTP)"""
+
+class ConnectionPool:
+    """Pool de conexões HTTP/1.1 keep-alive sobre asyncio, sem dependências externas"""
+
+    def __init__(self, base_url, size=10, timeout=30.0):
+        url = urlsplit(base_url)
+        if url.scheme not in ('http', 'https'):
+            raise ValueError(f"URL base inválida: {base_url}")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == 'https' else None
+        self.base_path = url.path.rstrip('/')
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+
+    async def request(self, method, path, payload=None):
+        """Envia uma requisição JSON e devolve (status, corpo), reaproveitando conexões ociosas"""
+        if payload is None:
+            body = b''
+        elif isinstance(payload, str):
+            # JSON já montado (BackupRequestDTO do gerador)
+            body = payload.encode('utf-8')
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"{method} {self.base_path}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode('ascii')
+
+        async with self._slots:
+            # Uma conexão reaproveitada pode ter sido fechada pelo servidor: tenta de novo com uma nova
+            for attempt in range(2):
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._connect()
+                try:
+                    status, response, keep_alive = await asyncio.wait_for(
+                        self._exchange(connection, head + body), self.timeout
+                    )
+                except (HttpError, ConnectionError, asyncio.IncompleteReadError) as error:
+                    self._close(connection)
+                    if reused and attempt == 0:
+                        continue
+                    raise HttpError(str(error) or type(error).__name__)
+                except BaseException:
+                    self._close(connection)
+                    raise
+                if keep_alive:
+                    self._idle.append(connection)
+                else:
+                    self._close(connection)
+                return status, response
+
+    async def _connect(self):
+        self.connections_opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+
+    async def _exchange(self, connection, request):
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError("Conexão fechada pelo servidor")
+        parts = status_line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b'HTTP/'):
+            raise HttpError(f"Resposta inválida: {status_line[:80]!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # Trailers opcionais até a linha em branco
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            response = b''.join(chunks)
+        elif 'content-length' in headers:
+            response = await reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304) or 100 <= status < 200:
+            response = b''
+        else:
+            # Sem tamanho declarado o corpo vai até o fim da conexão
+            response = await reader.read()
+            keep_alive = False
+        return status, response, keep_alive
+
+    def _close(self, connection):
+        connection[1].close()
+
+    async def close(self):
+        """Fecha as conexões ociosas"""
+        while self._idle:
+            reader, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+class RateLimiter:
+    """Agenda o início das requisições a `rps` por segundo (0 = sem limite); wait devolve o horário agendado
+
+    Um envio atrasado não empurra a agenda: a latência medida a partir do horário agendado inclui o atraso
+    (sem coordinated omission) e as requisições atrasadas saem em seguida até a taxa ser recuperada.
+    """
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps else 0.0
+        self._next = None
+
+    def reset(self):
+        """Recomeça a agenda no próximo wait (depois de uma pausa do próprio cliente, como entre lotes)"""
+        self._next = None
+
+    async def wait(self):
+        now = time.perf_counter()
+        if not self.interval:
+            return now
+        if self._next is None:
+            self._next = now
+        scheduled = self._next
+        self._next += self.interval
+        if scheduled > now:
+            await asyncio.sleep(scheduled - now)
+        return scheduled
+
+def percentile(sorted_values, fraction):
+    """Percentil pelo método nearest-rank sobre valores já ordenados"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * fraction // 100))
+    return sorted_values[int(rank) - 1]
+
+class LatencyStats:
+    """Latências (ms) e status HTTP por endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, status=None, error=None):
+        self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+        if error is not None:
+            self.errors.setdefault(endpoint, Counter())[error] += 1
+        else:
+            self.statuses.setdefault(endpoint, Counter())[status] += 1
+
+    def summary(self, elapsed_seconds):
+        """Resumo por endpoint: contagens, vazão e percentis de latência"""
+        summary = {}
+        for endpoint, latencies in self.latencies.items():
+            latencies.sort()
+            statuses = self.statuses.get(endpoint, Counter())
+            errors = self.errors.get(endpoint, Counter())
+            failed = sum(errors.values()) + sum(count for status, count in statuses.items() if status >= 400)
+            summary[endpoint] = {
+                "requests": len(latencies),
+                "failed": failed,
+                "requests_per_second": round(len(latencies) / elapsed_seconds, 1) if elapsed_seconds > 0 else None,
+                "latency_ms": {
+                    **{f"p{value}": round(percentile(latencies, value), 3) for value in PERCENTILES},
+                    "mean": round(sum(latencies) / len(latencies), 3),
+                    "max": round(latencies[-1], 3)
+                },
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+                "errors": dict(errors)
+            }
+        return summary
+
+def client_request(client):
+    """Corpo do criarCliente (Omit<Cliente, 'id' | 'dataInclusao' | 'backups'>) para um cliente gerado"""
+    return {
+        "nome": client["name"],
+        "email": client["email"],
+        "cnpj": client["cnpj"],
+        "ativo": client["status"] == "active"
+    }
+
+async def run_requests(pool, requests, stats, concurrency=10, rps=0, batch_size=0, batch_pause=0.0, on_response=None, phase=None):
+    """Dispara as requisições (endpoint, método, caminho, corpo, chave) respeitando concorrência, RPS e lotes"""
+    limiter = RateLimiter(rps)
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def send(started, endpoint, method, path, payload, key):
+        # A latência conta a partir do horário agendado: inclui o atraso do envio e a espera por uma vaga no pool
+        try:
+            status, body = await pool.request(method, path, payload)
+        except (HttpError, OSError, asyncio.TimeoutError) as error:
+            stats.record(endpoint, time.perf_counter() - started, error=type(error).__name__)
+        else:
+            stats.record(endpoint, time.perf_counter() - started, status)
+            if on_response is not None:
+                on_response(key, status, body)
+        finally:
+            in_flight.release()
+            if phase is not None:
+                phase.advance()
+
+    async def schedule(request):
+        scheduled = await limiter.wait()
+        await in_flight.acquire()
+        return asyncio.ensure_future(send(scheduled, *request))
+
+    if batch_size > 0:
+        # Como o ApiService: um lote em paralelo, espera o lote inteiro terminar e faz uma pausa
+        requests = iter(requests)
+        while True:
+            batch = [request for _, request in zip(range(batch_size), requests)]
+            if not batch:
+                break
+            await asyncio.gather(*[await schedule(request) for request in batch])
+            if batch_pause:
+                await asyncio.sleep(batch_pause)
+            limiter.reset()
+        return
+
+    pending = set()
+    for request in requests:
+        task = await schedule(request)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+def iter_backup_segments(clients, args):
+    """Backups gerados cliente a cliente (segmentos de iter_upload_segments_values), sem guardar o histórico em memória"""
+    backups_per_client = args.days + 1 if args.backups_per_client is None else args.backups_per_client
+    values = generator.iter_backup_values(clients, backups_per_client, args.seed, args.days)
+    return generator.iter_upload_segments_values(values)
+
+def iter_client_requests(clients, segments=None):
+    """Requisições de criarClientesEmLote; com segments, o corpo leva também dataInclusao e os backups, como no uploadCsvData"""
+    if segments is None:
+        for index, client in enumerate(clients):
+            yield "POST /api/clientes", "POST", "/api/clientes", client_request(client), index
+        return
+
+    join_date = datetime.now().strftime("%Y-%m-%d")
+    segments = iter(segments)
+    segment = next(segments, None)
+    for index, client in enumerate(clients):
+        objects = []
+        if segment is not None and segment[0] == index:
+            objects = generator.backup_request_objects(client, index, segment[1])
+            segment = next(segments, None)
+        # Corpo montado em texto: os BackupRequestDTO já vêm em JSON do gerador
+        payload = json.dumps(client_request(client), ensure_ascii=False)[:-1]
+        yield ("POST /api/clientes", "POST", "/api/clientes",
+               f'{payload},"dataInclusao":"{join_date}","backups":[{",".join(objects)}]}}', index)
+
+def iter_backup_requests(clients, segments, client_ids):
+    """Requisições de criarBackupsEmLote; client_ids mapeia o id gerado (clt_001) para o clienteId da API"""
+    for position, backups, *_ in segments:
+        client = clients[position]
+        cliente_id = client_ids.get(client["id"])
+        if cliente_id is None:
+            continue  # o cliente não foi criado: o uploadCsvData também pula os backups dele
+        for payload in generator.backup_request_objects(client, position, backups, cliente_id):
+            yield "POST /api/backups", "POST", "/api/backups", payload, None
+
+async def run_load(args, instrumentation):
+    """Executa o cenário escolhido e devolve (estatísticas, segundos)"""
+    clients = generator.generate_clients(args.clients, args.seed, unique_cnpj=True)
+    pool = ConnectionPool(args.base_url, args.concurrency, args.timeout)
+    stats = LatencyStats()
+    options = dict(concurrency=args.concurrency, rps=args.rps, batch_size=args.batch_size, batch_pause=args.batch_pause / 1000)
+    started = time.perf_counter()
+    try:
+        if args.scenario == "clientes":
+            with instrumentation.phase("POST /api/clientes", total=len(clients)) as phase:
+                await run_requests(pool, iter_client_requests(clients), stats, phase=phase, **options)
+        elif args.scenario == "backups":
+            # Os clientes já existem no servidor com o id numérico do gerador (clt_001 -> 1)
+            client_ids = {client["id"]: client_number(client["id"]) for client in clients}
+            with instrumentation.phase("POST /api/backups") as phase:
+                await run_requests(pool, iter_backup_requests(clients, iter_backup_segments(clients, args), client_ids),
+                                   stats, phase=phase, **options)
+        else:
+            # uploadCsvData: primeiro todos os clientes (com os backups no corpo), depois todos os backups
+            created = {}
+            def remember_client(index, status, body):
+                if 200 <= status < 300:
+                    created[clients[index]["id"]] = json.loads(body)["id"]
+
+            with instrumentation.phase("POST /api/clientes", total=len(clients)) as phase:
+                await run_requests(pool, iter_client_requests(clients, iter_backup_segments(clients, args)), stats,
+                                   on_response=remember_client, phase=phase, **options)
+            # A semente torna a geração reprodutível: a segunda passada gera de novo em vez de guardar os backups
+            with instrumentation.phase("POST /api/backups") as phase:
+                await run_requests(pool, iter_backup_requests(clients, iter_backup_segments(clients, args), created),
+                                   stats, phase=phase, **options)
+    finally:
+        await pool.close()
+    return stats, time.perf_counter() - started, pool.connections_opened
+
+def print_summary(summary, elapsed, connections):
+    """Imprime a tabela de latências por endpoint"""
+    total = sum(endpoint["requests"] for endpoint in summary.values())
+    print(f"\n📊 {total:,} requisições em {elapsed:.2f}s ({total / elapsed:,.1f} req/s, {connections} conexões abertas)")
+    print(f"   {'endpoint':<22} {'req':>9} {'falhas':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, result in summary.items():
+        latency = result["latency_ms"]
+        print(f"   {endpoint:<22} {result['requests']:>9,} {result['failed']:>7,} {result['requests_per_second']:>9,.1f} "
+              f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} {latency['max']:>9.2f}")
+        if result["failed"]:
+            print(f"      status: {result['statuses']}, erros: {result['errors']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga assíncrono para os POSTs em lote da API de backups")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080",
+                        help="URL base da API (padrão: o mock_api_server local em http://127.0.0.1:8080)")
+    parser.add_argument("--scenario", choices=["clientes", "backups", "upload"], default="upload",
+                        help="clientes: criarClientesEmLote; backups: criarBackupsEmLote; upload: uploadCsvData (padrão)")
+    parser.add_argument("--clients", type=int, default=100, help="Clientes gerados (padrão: 100)")
+    parser.add_argument("--days", type=int, default=30, help="Dias de histórico de backups por cliente (padrão: 30)")
+    parser.add_argument("--backups-per-client", type=int, default=None,
+                        help="Máximo de backups por cliente (padrão: sem limite, até um por dia de histórico)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador (padrão: 0)")
+    parser.add_argument("--concurrency", type=int, default=20,
+                        help="Requisições simultâneas e tamanho do pool de conexões (padrão: 20)")
+    parser.add_argument("--rps", type=float, default=0, help="Taxa alvo de requisições por segundo (padrão: 0 = sem limite)")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="Lotes como no ApiService (10 clientes, 20 backups): espera cada lote terminar (padrão: 0 = fluxo contínuo)")
+    parser.add_argument("--batch-pause", type=float, default=0,
+                        help="Pausa entre lotes em ms (o ApiService usa 100 para clientes e 50 para backups)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por requisição em segundos (padrão: 30)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON para salvar o resumo")
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    if args.backups_per_client is not None and args.backups_per_client < 1:
+        parser.error("--backups-per-client deve ser pelo menos 1")
+
+    instrumentation = instrumentation_from_args(args)
+    instrumentation.start()
+    print(f"🚚 Cenário {args.scenario}: {args.clients} clientes x {args.days} dias contra {args.base_url} "
+          f"(concorrência {args.concurrency}, rps {args.rps or 'sem limite'}, lote {args.batch_size or 'contínuo'})")
+    try:
+        stats, elapsed, connections = asyncio.run(run_load(args, instrumentation))
+    except (OSError, ValueError) as error:
+        sys.exit(f"❌ {error}")
+    instrumentation.finish()
+
+    summary = stats.summary(elapsed)
+    print_summary(summary, elapsed, connections)
+
+    if args.output:
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "base_url": args.base_url,
+            "scenario": args.scenario,
+            "clients": args.clients,
+            "days": args.days,
+            "backups_per_client": args.backups_per_client,
+            "concurrency": args.concurrency,
+            "rps": args.rps,
+            "batch_size": args.batch_size,
+            "elapsed_seconds": round(elapsed, 3),
+            "connections_opened": connections,
+            "endpoints": summary
+        }
+        with open(args.output, "w", encoding="utf-8") as jsonfile:
+            json.dump(report, jsonfile, indent=2)
+        print(f"\n💾 Resumo salvo em {args.output}")
@@ -0,0 +1,549 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from backup_generator.partitions import is_partitioned, iter_partition_rows
+from backup_generator.text_output import open_text_input
+import generate_large_dataset as generator
+from generate_large_dataset import FAILURE_MESSAGE, SUCCESS_MESSAGE, client_number, np, pa
+
+# Janela padrão dos endpoints com `dias`, como no ApiService (indicadores-30, clientes-status-all-30)
+DEFAULT_DAYS = 30
+
+def load_clients(filename):
+    """Lê o clients.csv gerado (também .gz/.zst), no formato usado por iter_backup_csv_batches"""
+    with open_text_input(filename) as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    for row in rows:
+        row['id'] = row['client_id']
+    return rows
+
+def load_backup_columns(filename, clients, since=None):
+    """Carrega os backups em colunas NumPy a partir do CSV, NPZ, Parquet, Arrow ou das partições do gerador
+
+    Com since (AAAA-MM-DD), as partições mensais anteriores nem são abertas; só vale para backup_partitions/.
+    """
+    client_positions = {client['id']: index for index, client in enumerate(clients)}
+    extension = os.path.splitext(filename)[1]
+
+    if is_partitioned(filename):
+        batches = list(generator.iter_backup_row_batches(iter_partition_rows(filename, since=since), clients))
+        if not batches:
+            return generator.backup_rows_to_columns([], client_positions)
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+    if since is not None:
+        raise RuntimeError("--since só se aplica a backups particionados (backup_partitions/)")
+
+    if extension in ('.parquet', '.arrow'):
+        if pa is None:
+            raise RuntimeError(f"Ler {filename} requer pyarrow (pip install pyarrow)")
+        if extension == '.parquet':
+            table = generator.pq.read_table(filename)
+        else:
+            with pa.memory_map(filename) as source:
+                table = pa.ipc.open_file(source).read_all()
+        table = table.combine_chunks()
+        client_ids = table.column('client_id').chunk(0)
+        statuses = table.column('status').chunk(0)
+        return {
+            'backup_id': table.column('backup_id').to_numpy(),
+            'client_index': _remap_codes(client_ids.indices.to_numpy(), client_ids.dictionary.to_pylist(), client_positions),
+            'timestamp': table.column('date').to_numpy(),
+            'success': statuses.indices.to_numpy() == statuses.dictionary.to_pylist().index('success'),
+            'duration_seconds': table.column('duration_seconds').to_numpy(),
+            'size_gb': table.column('size_gb').to_numpy(),
+        }
+
+    if extension == '.npz':
+        with np.load(filename) as npz:
+            statuses = npz['status_dictionary'].tolist()
+            return {
+                'backup_id': npz['backup_id'],
+                'client_index': _remap_codes(npz['client_id'], npz['client_id_dictionary'].tolist(), client_positions),
+                'timestamp': npz['date'],
+                'success': npz['status'] == statuses.index('success'),
+                'duration_seconds': npz['duration_seconds'],
+                'size_gb': npz['size_gb'],
+            }
+
+    batches = list(generator.iter_backup_csv_batches(filename, clients))
+    if not batches:
+        return generator.backup_rows_to_columns([], client_positions)
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+def _remap_codes(codes, dictionary, client_positions):
+    """Traduz os códigos de dicionário do arquivo colunar para a posição do cliente no clients.csv"""
+    mapping = np.array([client_positions[client_id] for client_id in dictionary], dtype=np.int32)
+    return mapping[codes]
+
+class BackupIndex:
+    """Backups em arrays compactos, indexados por cliente e por data, para consultas rápidas"""
+
+    def __init__(self, clients, columns, now=None):
+        self.clients = clients
+        self.positions = {client_number(client['client_id']): index for index, client in enumerate(clients)}
+        num_clients = len(clients)
+
+        timestamps = columns['timestamp'].astype(np.int64)
+        self.epoch = int(timestamps.min()) if len(timestamps) else 0
+        # Segundos desde o primeiro backup cabem em uint32 (136 anos) e ocupam metade de um int64
+        offsets = (timestamps - self.epoch).astype(np.uint32)
+        if now is not None:
+            self.now = int((now - datetime(1970, 1, 1)).total_seconds()) - self.epoch
+        else:
+            self.now = int(offsets.max()) if len(offsets) else 0
+
+        # Ordem por cliente e data: o histórico de um cliente é uma fatia contígua
+        by_client = np.lexsort((offsets, columns['client_index']))
+        client_index = columns['client_index'][by_client].astype(np.int64)
+        self.backup_id = columns['backup_id'][by_client].astype(np.int64)
+        self.timestamp = offsets[by_client]
+        self.success = columns['success'][by_client].astype(bool)
+        self.duration_seconds = columns['duration_seconds'][by_client].astype(np.uint32)
+        self.size_gb = columns['size_gb'][by_client].astype(np.float32)
+        counts = np.bincount(client_index, minlength=num_clients)
+        self.client_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        # Chave (cliente << 32) + data, crescente nessa ordem: a janela de cada cliente sai de dois searchsorted
+        # e os sucessos nela da soma acumulada, sem varrer as linhas a cada requisição
+        self.client_time = (client_index << 32) + self.timestamp
+        self.client_success_prefix = np.concatenate([[0], np.cumsum(self.success)]).astype(np.uint32)
+        self._last_backups = None
+
+        # Ordem por data com soma acumulada dos sucessos: contagens de uma janela em O(log n)
+        by_date = generator.date_order(offsets)
+        self.dates = offsets[by_date]
+        self.success_prefix = np.concatenate([[0], np.cumsum(columns['success'][by_date])]).astype(np.int64)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def window(self, days):
+        """Intervalo [início, fim] (em segundos desde o primeiro backup) dos últimos `days` dias"""
+        return self.now - days * 86400, self.now
+
+    def count_window(self, days=None):
+        """Sucessos e total de backups na janela (ou em todo o histórico)"""
+        if days is None:
+            return int(self.success_prefix[-1]), len(self.dates)
+        start, end = self.window(days)
+        # Escalares uint32 evitam que o searchsorted converta o array inteiro para int64
+        first = int(np.searchsorted(self.dates, np.uint32(max(start, 0)), 'left'))
+        last = int(np.searchsorted(self.dates, np.uint32(max(end, 0)), 'right'))
+        return int(self.success_prefix[last] - self.success_prefix[first]), last - first
+
+    def client_slice(self, client_id):
+        """Fatia do histórico de um cliente (id numérico da API), ou None se ele não existe"""
+        position = self.positions.get(client_id)
+        if position is None:
+            return None
+        return slice(int(self.client_offsets[position]), int(self.client_offsets[position + 1]))
+
+    def format_dates(self, offsets):
+        """Converte segundos desde o primeiro backup em datas ISO (YYYY-MM-DDTHH:MM:SS)"""
+        return np.datetime_as_string((offsets.astype(np.int64) + self.epoch).astype('datetime64[s]')).tolist()
+
+    def database_name(self, position):
+        return f"db_{self.clients[position]['client_id']}"
+
+    def ip_address(self, position):
+        return f"10.{position >> 16 & 255}.{position >> 8 & 255}.{position & 255}"
+
+    def backup_history(self, client_id):
+        """BackupHistoricoDTO[] de um cliente, em ordem de data"""
+        rows = self.client_slice(client_id)
+        if rows is None:
+            return None
+
+        position = self.positions[client_id]
+        client_code = self.clients[position]['client_id']
+        database = self.database_name(position)
+        ip_address = self.ip_address(position)
+        starts = self.timestamp[rows]
+        start_dates = self.format_dates(starts)
+        end_dates = self.format_dates(starts + self.duration_seconds[rows])
+        # O gerador não registra VACUUM: os backups bem-sucedidos de domingo fazem o papel
+        sundays = (((starts.astype(np.int64) + self.epoch) // 86400 + 3) % 7 == 6).tolist()
+        sizes = np.round(self.size_gb[rows].astype(np.float64) * 1024, 2).tolist()
+
+        history = []
+        for backup_id, success, start, end, size, sunday in zip(
+            self.backup_id[rows].tolist(), self.success[rows].tolist(), start_dates, end_dates, sizes, sundays
+        ):
+            vacuum = success and sunday
+            backup = {
+                "id": backup_id,
+                "status": "SUCESSO" if success else "FALHA",
+                "mensagem": SUCCESS_MESSAGE if success else FAILURE_MESSAGE,
+                "vacuumExecutado": vacuum,
+                "dataInicio": start,
+                "dataFim": end,
+                "tamanhoEmMb": size,
+                "caminhoBackup": f"/backups/{client_code}/{start[:10]}.dump",
+                "ipBackup": ip_address,
+                "databaseBackup": database
+            }
+            if vacuum:
+                backup["vacuumDataExecucao"] = end
+            history.append(backup)
+        return history
+
+    def client_statuses(self, status=None, days=DEFAULT_DAYS):
+        """ClienteBackupStatusDTO[]: último backup de cada cliente e taxa de sucesso na janela"""
+        start, end = self.window(days)
+        # Limites da janela por cliente: O(clientes · log n); um fim antes do primeiro backup deixa a janela vazia
+        client_keys = np.arange(len(self.clients), dtype=np.int64) << 32
+        first = np.searchsorted(self.client_time, client_keys + max(start, 0), 'left')
+        last = np.searchsorted(self.client_time, client_keys + min(max(end, -1), 0xFFFFFFFF), 'right')
+        window_total = (last - first).tolist()
+        window_successful = (self.client_success_prefix[last].astype(np.int64) - self.client_success_prefix[first]).tolist()
+
+        wanted = None
+        if status:
+            wanted = {'SUCCESS': 'SUCESSO', 'FAILED': 'FALHA'}.get(status.upper(), status.upper())
+
+        statuses = []
+        for position, fields, size, database in self.last_backups():
+            if wanted is not None and fields["statusUltimoBackup"] != wanted:
+                continue
+            statuses.append({
+                **fields,
+                "taxaSucesso": generator._success_rate(window_successful[position], window_total[position]),
+                "tamanhoEmMb": size,
+                "databaseBackup": database
+            })
+        return statuses
+
+    def last_backups(self):
+        """(posição, campos até statusUltimoBackup, tamanhoEmMb, databaseBackup) dos clientes com backups, na primeira chamada"""
+        if self._last_backups is None:
+            # O último backup de cada cliente é a última linha da sua fatia
+            positions = np.nonzero(np.diff(self.client_offsets) > 0)[0]
+            last = self.client_offsets[positions + 1] - 1
+            last_starts = self.timestamp[last]
+            start_dates = self.format_dates(last_starts)
+            end_dates = self.format_dates(last_starts + self.duration_seconds[last])
+            last_success = self.success[last].tolist()
+            last_sizes = np.round(self.size_gb[last].astype(np.float64) * 1024, 2).tolist()
+            self._last_backups = []
+            for position, start_date, end_date, success, size in zip(
+                positions.tolist(), start_dates, end_dates, last_success, last_sizes
+            ):
+                client = self.clients[position]
+                self._last_backups.append((position, {
+                    "id": client_number(client['client_id']),
+                    "nome": client['name'],
+                    "cnpj": client['cnpj'],
+                    "dataInicio": start_date,
+                    "dataFim": end_date,
+                    "statusUltimoBackup": "SUCESSO" if success else "FALHA"
+                }, size, self.database_name(position)))
+        return self._last_backups
+
+    def client_dto(self, position):
+        """Cliente do clients.csv (sem o histórico embutido: use /api/dashboard/backup/cliente/{id})"""
+        client = self.clients[position]
+        return {
+            "id": client_number(client['client_id']),
+            "nome": client['name'],
+            "email": client['email'],
+            "cnpj": client['cnpj'],
+            "ativo": client['status'] == 'active',
+            "dataInclusao": client['join_date'],
+            "backups": []
+        }
+
+    def clients_list(self):
+        """Cliente[] de todos os clientes"""
+        return [self.client_dto(position) for position in range(len(self.clients))]
+
+    def summary(self):
+        """BackupDashboardDTO de todo o histórico"""
+        successful, total = self.count_window()
+        return {
+            "total": total,
+            "sucessos": successful,
+            "falhas": total - successful,
+            "percentualSucesso": generator._success_rate(successful, total)
+        }
+
+    def indicators(self, days=DEFAULT_DAYS):
+        """BackupDashboardIndicadoresDTO dos últimos `days` dias"""
+        successful, total = self.count_window(days)
+        return {
+            "totalClientes": len(self.clients),
+            "backupsSucesso": successful,
+            "backupsFalha": total - successful,
+            "taxaSucesso": generator._success_rate(successful, total)
+        }
+
+class ResponseCache:
+    """Cache LRU das respostas já serializadas (os dados são somente leitura)"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+        # Monta fora do lock: requisições de outras chaves não esperam pela serialização
+        body = build()
+        with self._lock:
+            self._entries[key] = body
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return body
+
+class ApiError(Exception):
+    """Erro com status HTTP, respondido como {"message": ...}"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# Campos obrigatórios dos POSTs (Omit<Cliente, 'id' | 'dataInclusao' | 'backups'> e BackupRequestDTO)
+CLIENT_REQUIRED_FIELDS = ['nome', 'email', 'cnpj', 'ativo']
+BACKUP_REQUIRED_FIELDS = ['clienteId', 'status', 'databaseBackup', 'caminhoBackup', 'ipBackup', 'dataInicio', 'dataFim', 'tamanhoEmMb']
+
+class WriteLog:
+    """Recebe os POSTs de criação: valida e numera os registros, sem alterar o índice de leitura"""
+
+    def __init__(self, index):
+        self.index = index
+        # Clientes criados ficam em memória (os backups referenciam o id); backups só são contados
+        self.clients = {}
+        self.backups_created = 0
+        self._next_client_id = max(index.positions, default=0) + 1
+        self._next_backup_id = int(index.backup_id.max()) + 1 if len(index) else 1
+        self._lock = threading.Lock()
+
+    def create_client(self, payload):
+        """POST /api/clientes: devolve o Cliente criado"""
+        _require_fields(payload, CLIENT_REQUIRED_FIELDS)
+        with self._lock:
+            client_id = self._next_client_id
+            self._next_client_id += 1
+            client = {
+                "id": client_id,
+                "nome": payload['nome'],
+                "email": payload['email'],
+                "cnpj": payload['cnpj'],
+                "ativo": bool(payload['ativo']),
+                "dataInclusao": datetime.now().isoformat(timespec='seconds'),
+                "backups": []
+            }
+            self.clients[client_id] = client
+        return client
+
+    def create_backup(self, payload):
+        """POST /api/backups: devolve o Backup criado, com o Cliente embutido"""
+        _require_fields(payload, BACKUP_REQUIRED_FIELDS)
+        if payload['status'] not in ('SUCESSO', 'FALHA'):
+            raise ApiError(400, f"Status inválido: {payload['status']}")
+        client = self.find_client(payload['clienteId'])
+        with self._lock:
+            backup_id = self._next_backup_id
+            self._next_backup_id += 1
+            self.backups_created += 1
+        backup = {
+            "id": backup_id,
+            "status": payload['status'],
+            "mensagem": payload.get('mensagem') or "",
+            "vacuumExecutado": bool(payload.get('vacuumExecutado')),
+            "dataInicio": payload['dataInicio'],
+            "dataFim": payload['dataFim'],
+            "tamanhoEmMb": payload['tamanhoEmMb'],
+            "caminhoBackup": payload['caminhoBackup'],
+            "ipBackup": payload['ipBackup'],
+            "databaseBackup": payload['databaseBackup'],
+            "cliente": client
+        }
+        if payload.get('vacuumDataExecucao'):
+            backup["vacuumDataExecucao"] = payload['vacuumDataExecucao']
+        return backup
+
+    def find_client(self, client_id):
+        """Cliente criado por POST ou carregado do clients.csv"""
+        client = self.clients.get(client_id)
+        if client is not None:
+            return client
+        position = self.index.positions.get(client_id)
+        if position is None:
+            raise ApiError(404, f"Cliente {client_id} não encontrado")
+        return self.index.client_dto(position)
+
+def _require_fields(payload, fields):
+    if not isinstance(payload, dict):
+        raise ApiError(400, "O corpo deve ser um objeto JSON")
+    for field in fields:
+        if payload.get(field) is None:
+            raise ApiError(400, f"Campo obrigatório ausente: {field}")
+
+def _int_param(query, name, default):
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise ApiError(400, f"Parâmetro {name} inválido: {values[0]}")
+    if value <= 0:
+        raise ApiError(400, f"Parâmetro {name} deve ser positivo")
+    return value
+
+CLIENT_HISTORY_PATH = re.compile(r"^/api/dashboard/backup/cliente/(\d+)$")
+
+def route(index, path, query):
+    """Resolve um GET do ApiService para o objeto de resposta (DTO ou lista de DTOs)"""
+    if path == "/api/clientes":
+        return index.clients_list()
+    if path == "/api/dashboard/backup/resumo":
+        return index.summary()
+    if path == "/api/dashboard/backup/indicadores":
+        return index.indicators(_int_param(query, 'dias', DEFAULT_DAYS))
+    if path == "/api/dashboard/backup/clientes":
+        status = query.get('status', [None])[0]
+        return index.client_statuses(status, _int_param(query, 'dias', DEFAULT_DAYS))
+
+    match = CLIENT_HISTORY_PATH.match(path)
+    if match:
+        history = index.backup_history(int(match.group(1)))
+        if history is None:
+            raise ApiError(404, f"Cliente {match.group(1)} não encontrado")
+        return history
+
+    raise ApiError(404, f"Endpoint não encontrado: {path}")
+
+def route_post(write_log, path, payload):
+    """Resolve um POST de criação do ApiService (criarCliente, criarBackup)"""
+    if path == "/api/clientes":
+        return write_log.create_client(payload)
+    if path == "/api/backups":
+        return write_log.create_backup(payload)
+    raise ApiError(404, f"Endpoint não encontrado: {path}")
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 (keep-alive) dos endpoints usados pelo ApiService"""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas: sem TCP_NODELAY o Nagle atrasa respostas pequenas
+    disable_nagle_algorithm = True
+    index = None
+    cache = None
+    write_log = None
+    verbose = False
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        # A chave normaliza a query para que ?dias=7&status=x e ?status=x&dias=7 compartilhem a entrada
+        query = parse_qs(url.query)
+        key = (url.path, tuple(sorted((name, tuple(values)) for name, values in query.items())))
+        try:
+            body = self.cache.get(key, lambda: json.dumps(route(self.index, url.path, query), ensure_ascii=False).encode('utf-8'))
+            status = 200
+        except ApiError as error:
+            body = json.dumps({"message": error.message}, ensure_ascii=False).encode('utf-8')
+            status = error.status
+        self._send(status, body, time.perf_counter() - started)
+
+    def do_POST(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b'null')
+            except ValueError:
+                raise ApiError(400, "JSON inválido")
+            body = json.dumps(route_post(self.write_log, url.path, payload), ensure_ascii=False).encode('utf-8')
+            status = 201
+        except ApiError as error:
+            body = json.dumps({"message": error.message}, ensure_ascii=False).encode('utf-8')
+            status = error.status
+        self._send(status, body, time.perf_counter() - started)
+
+    def do_OPTIONS(self):
+        # Preflight de CORS do navegador (o front roda em outra origem, ex.: o Vite em :5173)
+        self._send(204, b"", 0.0)
+
+    def _send(self, status, body, seconds):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        # Tempo de processamento no servidor, visível na aba Network do navegador
+        self.send_header("Server-Timing", f"app;dur={seconds * 1000:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+class MockApiServer(ThreadingHTTPServer):
+    """Servidor com uma thread por conexão e fila de conexões maior que o padrão (5)"""
+
+    # Com a fila padrão, rajadas de conexões do gerador de carga perdem SYNs e esperam 1s de retransmissão
+    request_queue_size = 128
+
+def build_index(clients_filename, backup_filename, now=None, since=None):
+    """Lê a saída do gerador e monta o índice em memória"""
+    if np is None:
+        raise RuntimeError("O servidor mock requer numpy (pip install numpy)")
+    clients = load_clients(clients_filename)
+    columns = load_backup_columns(backup_filename, clients, since)
+    return BackupIndex(clients, columns, now)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor REST local que imita a API do dashboard com os dados gerados")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", default="data/clients.csv", help="CSV de clientes do gerador (padrão: data/clients.csv)")
+    parser.add_argument("--backups", default="data/backup.csv",
+                        help="Backups do gerador: .csv (ou .csv.gz/.csv.zst), .npz, .parquet, .arrow ou o diretório "
+                             "backup_partitions/ (padrão: data/backup.csv)")
+    parser.add_argument("--since", default=None,
+                        help="Com backups particionados, carrega só a partir desta data (AAAA-MM-DD), sem abrir os meses anteriores")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="Data de referência das janelas de `dias` (padrão: o último backup do dataset)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="Respostas serializadas mantidas em cache (padrão: 1024)")
+    parser.add_argument("--verbose", action="store_true", help="Registra cada requisição no stderr")
+    args = parser.parse_args()
+
+    print(f"Carregando {args.clients} e {args.backups}...")
+    started = time.perf_counter()
+    try:
+        index = build_index(args.clients, args.backups, args.now, args.since)
+    except RuntimeError as error:
+        sys.exit(f"❌ {error}")
+    print(f"✅ {len(index.clients):,} clientes e {len(index):,} backups indexados em {time.perf_counter() - started:.1f}s")
+
+    MockApiHandler.index = index
+    MockApiHandler.cache = ResponseCache(args.cache_size)
+    MockApiHandler.write_log = WriteLog(index)
+    MockApiHandler.verbose = args.verbose
+    server = MockApiServer((args.host, args.port), MockApiHandler)
+    print(f"🚀 API mock em http://{args.host}:{args.port} (VITE_API_BASE_URL=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,23 @@
+import csv
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+def test_package_import_does_not_load_the_file_engine():
+    code = ("import sys, backup_generator; "
+            "print(sorted(name for name in ('numpy', 'pyarrow', 'generate_large_dataset') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True, capture_output=True, text=True)
+    assert result.stdout.strip() == '[]'
+
+def test_generate_dataset_matches_the_written_csvs(run_generator):
+    from backup_generator import generate_dataset
+    data = run_generator('reference', '--clients', 12, '--days', 45, '--seed', 9)
+    clients, backups = generate_dataset({"seed": 9, "clients": {"count": 12}, "dates": {"days": 45}})
+    assert [{key: str(value) for key, value in client.items()} for client in clients] == read_csv(data / 'clients.csv')
+    assert backups == read_csv(data / 'backup.csv')
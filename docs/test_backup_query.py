@@ -0,0 +1,78 @@
+import argparse
+import csv
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import backup_query
+
+def query_args(**options):
+    """Argumentos do CLI com os valores padrão do parser"""
+    defaults = dict(client=None, state=None, client_status=None, status=None, last_days=None, since=None, until=None,
+                    group_by=None, sort='key', top=None, rows=0, backup_id_digits=None)
+    return argparse.Namespace(**dict(defaults, **options))
+
+def load_dataset(data):
+    with open(data / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        backups = list(csv.DictReader(csvfile))
+    with open(data / 'clients.csv', newline='', encoding='utf-8') as csvfile:
+        clients = {client['client_id']: client for client in csv.DictReader(csvfile)}
+    return backups, clients
+
+def build(data):
+    index_dir = str(data / 'backup.index')
+    backup_query.build_index(str(data / 'backup.csv'), str(data / 'clients.csv'), index_dir)
+    assert backup_query.index_is_current(index_dir, str(data / 'backup.csv'), str(data / 'clients.csv'))
+    return backup_query.BackupQuery(index_dir)
+
+def expected_groups(backups, clients, key, keep=lambda backup: True):
+    counts = Counter()
+    successes = Counter()
+    for backup in backups:
+        if keep(backup):
+            group = key(backup, clients[backup['client_id']])
+            counts[group] += 1
+            successes[group] += backup['status'] == 'success'
+    return {group: (counts[group], successes[group]) for group in counts}
+
+def test_queries_match_a_scan_of_backup_csv(run_generator):
+    data = run_generator('query', '--clients', 40, '--days', 120, '--seed', 2)
+    backups, clients = load_dataset(data)
+    query = build(data)
+
+    def groups(**options):
+        return {key: (total, successful) for key, (total, successful, _) in backup_query.run_query(query, query_args(**options))[0]}
+
+    assert groups(group_by='client') == expected_groups(backups, clients, lambda backup, client: backup['client_id'])
+    assert groups(group_by='state', client_status=['active']) == expected_groups(
+        backups, clients, lambda backup, client: client['address'].rsplit(' - ', 1)[-1],
+        lambda backup: clients[backup['client_id']]['status'] == 'active')
+    assert groups(group_by='month', status='failed') == expected_groups(
+        backups, clients, lambda backup, client: backup['date'][:7], lambda backup: backup['status'] == 'failed')
+
+    # Janela parcial (últimos 10 dias a partir do último backup) com filtro de cliente: filtra as linhas mapeadas
+    last = max(datetime.strptime(backup['date'], '%Y-%m-%d %H:%M:%S') for backup in backups)
+    since = (last - timedelta(days=10)).strftime('%Y-%m-%d %H:%M:%S')
+    wanted = ['clt_003', 'clt_017']
+    assert groups(group_by='day', last_days=10, client=wanted) == expected_groups(
+        backups, clients, lambda backup, client: backup['date'][:10],
+        lambda backup: backup['client_id'] in wanted and backup['date'] >= since)
+
+def test_listed_rows_keep_the_dataset_backup_id_width(run_generator, tmp_path):
+    scenario = tmp_path / 'scenario.json'
+    scenario.write_text(json.dumps({'clients': {'count': 12}, 'dates': {'days': 30}, 'output': {'backup_id_digits': 4}}),
+                        encoding='utf-8')
+    data = run_generator('width', '--scenario', scenario, '--seed', 7)
+    backups, _ = load_dataset(data)
+    query = build(data)
+    assert query.meta['backup_id_digits'] == 4
+
+    _, lines = backup_query.run_query(query, query_args(client=['clt_005'], rows=1000))
+    csv_lines = (data / 'backup.csv').read_text(encoding='utf-8').splitlines()[1:]
+    assert lines == [line for line in csv_lines if line.split(',')[1] == 'clt_005']
+    _, lines = backup_query.run_query(query, query_args(client=['clt_005'], rows=1, backup_id_digits=6))
+    assert len(lines[0].split(',')[0]) == len('bkp_000001')
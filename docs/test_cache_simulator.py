@@ -0,0 +1,81 @@
+from functools import partial
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import cache_simulator as simulator
+import mock_api_server as server
+
+@pytest.fixture
+def index(run_generator):
+    data = run_generator('cache', '--clients', 25, '--days', 60, '--seed', 3)
+    return server.build_index(str(data / 'clients.csv'), str(data / 'backup.csv'))
+
+def trace_keys(trace, workload):
+    return [key for _, _, action, position, days in trace for key in workload.keys(action, position, days)]
+
+def test_ttl_expires_entries_without_freeing_them():
+    cache = simulator.CacheModel(ttl=10)
+    cache.put('a', 100, 0)
+    assert cache.get('a', 9.9)
+    assert not cache.get('a', 10)
+    assert (len(cache.entries), cache.bytes) == (1, 100)
+
+def test_bounded_caches_evict_the_least_recently_used():
+    cache = simulator.LRUCache(2)
+    cache.put('a', 1, 0)
+    cache.put('b', 1, 0)
+    assert cache.get('a', 1)
+    cache.put('c', 1, 1)
+    assert list(cache.entries) == ['a', 'c'] and cache.evictions == 1
+
+    cache = simulator.SizeBoundedCache(250)
+    for key in 'abc':
+        cache.put(key, 100, 0)
+    assert list(cache.entries) == ['b', 'c'] and cache.bytes == 200
+    cache.put('big', 300, 1)
+    assert not cache.entries and cache.bytes == 0
+
+def test_parse_policy():
+    assert isinstance(simulator.parse_policy('entries=3,ttl=60')(), simulator.LRUCache)
+    assert simulator.parse_policy('mb=1')().max_bytes == simulator.MB
+    for spec in ('size=3', 'entries=0', 'entries=3,mb=1', 'ttl'):
+        with pytest.raises(ValueError):
+            simulator.parse_policy(spec)
+
+def test_generate_trace_is_seeded():
+    trace = simulator.generate_trace(25, users=3, duration=900, seed=7)
+    assert trace == simulator.generate_trace(25, users=3, duration=900, seed=7)
+    assert trace != simulator.generate_trace(25, users=3, duration=900, seed=8)
+    assert [event[0] for event in trace] == sorted(event[0] for event in trace)
+    refreshes = [event for event in trace if event[2] == 'refresh']
+    assert len(refreshes) == 3 * 900 // simulator.DASHBOARD_REFRESH_SECONDS
+
+@pytest.mark.parametrize('service', ['api', 'mock'])
+def test_unbounded_shared_cache_loads_each_key_once(index, service):
+    workload = simulator.DashboardWorkload(index, service)
+    trace = simulator.generate_trace(len(index.clients), users=3, duration=900, seed=2)
+    result = simulator.replay(trace, workload, simulator.CacheModel, shared=True)
+
+    # Sem TTL nem limite, cada chave (e cada dependência, no mock) vai ao backend uma vez só
+    loaded = set()
+    def load(key):
+        for dependency in workload.spec(key)[3]:
+            load(dependency)
+        loaded.add(key)
+    for key in set(trace_keys(trace, workload)):
+        load(key)
+    assert result['backend_requests'] == len(loaded)
+    assert result['rows_scanned'] == sum(workload.spec(key)[2] for key in loaded)
+    assert result['accesses'] == result['hits'] + result['backend_requests']
+    assert result['evictions'] == 0
+
+def test_lru_bound_caps_entries_and_costs_hits(index):
+    workload = simulator.DashboardWorkload(index)
+    trace = simulator.generate_trace(len(index.clients), users=2, duration=900, seed=5)
+    unbounded = simulator.replay(trace, workload, partial(simulator.CacheModel, 300))
+    bounded = simulator.replay(trace, workload, partial(simulator.LRUCache, 5, 300))
+    assert bounded['peak_entries_per_cache'] <= 5 < unbounded['peak_entries_per_cache']
+    assert bounded['evictions'] > 0 and bounded['hits'] < unbounded['hits']
+    assert bounded['caches'] == unbounded['caches'] == 2
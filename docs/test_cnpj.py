@@ -0,0 +1,41 @@
+import csv
+import random
+import re
+
+from backup_generator import cnpj, generate_clients
+
+CNPJ_PATTERN = re.compile(r'^\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}$')
+
+def test_generate_cnpjs_are_valid_and_distinct():
+    cnpjs = cnpj.generate_cnpjs(20000, random.Random(7))
+    assert len(set(cnpjs)) == len(cnpjs)
+    assert all(CNPJ_PATTERN.match(number) and cnpj.is_valid_cnpj(number) for number in cnpjs)
+
+def test_cnpjs_for_indices_without_numpy_match(monkeypatch):
+    key = cnpj.cnpj_key(random.Random(3))
+    indices = list(range(1000, 3000))
+    expected = cnpj.cnpjs_for_indices(indices, key)
+    monkeypatch.setattr(cnpj, '_numpy', lambda: None)
+    assert cnpj.cnpjs_for_indices(indices, key) == expected
+
+def test_generate_cnpj_and_check_digits():
+    rng = random.Random(11)
+    for _ in range(1000):
+        number = cnpj.generate_cnpj(rng)
+        assert cnpj.is_valid_cnpj(number)
+        # Trocar o último dígito sempre invalida
+        assert not cnpj.is_valid_cnpj(number[:-1] + str((int(number[-1]) + 1) % 10))
+    assert not cnpj.is_valid_cnpj('12.345.678/0001')
+
+def test_populations_use_batch_cnpjs_unless_legacy(run_generator):
+    def cnpjs(data):
+        with open(data / 'clients.csv', newline='', encoding='utf-8') as csvfile:
+            return [row['cnpj'] for row in csv.DictReader(csvfile)]
+
+    default = cnpjs(run_generator('default', '--clients', 200, '--days', 5, '--seed', 13))
+    legacy = cnpjs(run_generator('legacy', '--clients', 200, '--days', 5, '--seed', 13, '--legacy-cnpj'))
+    assert default == [client['cnpj'] for client in generate_clients(200, 13)]
+    assert len(set(default)) == len(default) and all(cnpj.is_valid_cnpj(number) for number in default)
+    # O sorteio cliente a cliente de antes continua disponível para reproduzir datasets antigos
+    assert legacy == [client['cnpj'] for client in generate_clients(200, 13, unique_cnpj=False)]
+    assert legacy != default
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+import csv_import_validator as validator
+
+VALID_BACKUPS = json.dumps([{'status': 'SUCESSO', 'tamanhoEmMb': 1024.5, 'dataInicio': '2023-01-01T23:10:00'}])
+
+def csv_text(rows):
+    text = io.StringIO()
+    csv.writer(text, lineterminator='\n').writerows(rows)
+    return text.getvalue()
+
+def test_validate_chunk_rejects_invalid_rows():
+    backups = json.dumps([{'status': 'PARCIAL', 'tamanhoEmMb': -1, 'dataInicio': 'ontem'}])
+    row = ['1', 'Cliente', 'sem-arroba', '12.345.678/0001-00', 'true', '2023-01-01', backups]
+    payloads, errors, rows, accepted = validator.validate_chunk((2, csv_text([row])))
+    assert (payloads, rows, accepted) == ([], 1, 0)
+    assert {code for _, code, _ in errors} == {
+        'backup_status', 'backup_tamanho', 'backup_data', 'email_invalido', 'cnpj_digitos'
+    }
+
+def test_validate_csv_same_report_for_any_worker_count(tmp_path):
+    rows = [validator.CSV_FIELDS]
+    for index in range(1, 51):
+        email = 'sem-arroba' if index % 10 == 0 else f'cliente{index}@empresa.com.br'
+        rows.append([str(index), f'Cliente {index}', email, '11.222.333/0001-81', 'true', '2023-01-01', VALID_BACKUPS])
+    source = tmp_path / 'upload.csv'
+    source.write_text(csv_text(rows), encoding='utf-8')
+
+    reports = []
+    for workers in (1, 2):
+        output = tmp_path / f'import-{workers}'
+        report = validator.validate_csv(str(source), str(output), workers=workers, chunk_rows=7, batch_size=20)
+        assert (report['totalRows'], report['processedClients'], report['invalidRows']) == (50, 45, 5)
+        assert report['errorCounts'] == {'email_invalido': 5}
+        batches = [json.loads(line) for line in (output / 'payloads.jsonl').read_text(encoding='utf-8').splitlines()]
+        assert [len(batch) for batch in batches] == [20, 20, 5]
+        reports.append(((output / 'payloads.jsonl').read_bytes(), (output / 'errors.csv').read_bytes()))
+    assert reports[0] == reports[1]
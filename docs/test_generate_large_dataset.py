@@ -0,0 +1,304 @@
+import csv
+import json
+import os
+import sqlite3
+import struct
+import subprocess
+from collections import Counter
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def read_rows(path):
+    return path.read_text(encoding='utf-8').splitlines()[1:]
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_same_seed_same_output_for_any_worker_count(run_generator, engine):
+    if engine == 'numpy':
+        pytest.importorskip('numpy')
+    argv = ['--clients', 40, '--backups-per-client', 60, '--seed', 42, '--engine', engine, '--aggregates']
+    single = run_generator('single', *argv, '--workers', 1)
+    parallel = run_generator('parallel', *argv, '--workers', 3)
+    for name in ('clients.csv', 'backup.csv', 'backup_daily_clients.csv', 'backup_timeline.csv', 'backup_summary.json'):
+        assert (single / name).read_bytes() == (parallel / name).read_bytes(), name
+
+    # backup_id contíguos e o arquivo ordenado por data
+    rows = read_rows(single / 'backup.csv')
+    assert sorted(int(row.split(',')[0][4:]) for row in rows) == list(range(1, len(rows) + 1))
+    dates = [row.split(',')[3] for row in rows]
+    assert dates == sorted(dates)
+
+def test_aggregates_match_backup_csv(run_generator):
+    data = run_generator('aggregates', '--clients', 25, '--backups-per-client', 30, '--seed', 6, '--aggregates')
+    daily = Counter()
+    timeline = Counter()
+    for backup_id, client_id, _, date, status, _, _ in (row.split(',') for row in read_rows(data / 'backup.csv')):
+        daily[client_id, date[:10], status] += 1
+        timeline[date[:10], status] += 1
+
+    for client_id, date, total, successful, failed, _ in (row.split(',') for row in read_rows(data / 'backup_daily_clients.csv')):
+        assert (int(successful), int(failed)) == (daily[client_id, date, 'success'], daily[client_id, date, 'failed'])
+        assert int(total) == int(successful) + int(failed)
+    for date, successful, failed, total, *_ in (row.split(',') for row in read_rows(data / 'backup_timeline.csv')):
+        assert (int(successful), int(failed)) == (timeline[date, 'success'], timeline[date, 'failed'])
+
+    summary = json.loads((data / 'backup_summary.json').read_text(encoding='utf-8'))
+    assert summary['successful'] == sum(count for (_, status), count in timeline.items() if status == 'success')
+    assert summary['total'] == sum(timeline.values())
+
+def write_scenario(tmp_path, **raw):
+    path = tmp_path / 'scenario.json'
+    path.write_text(json.dumps(raw), encoding='utf-8')
+    return path
+
+SCENARIO = {
+    'clients': {'count': 15},
+    'dates': {'start': '2024-03-01', 'days': 60, 'inactive_stop': 20},
+    'backups_per_client': None,
+    'schedules': [{'statuses': ['pending'], 'frequency': 'weekly'}, {}],
+    'output': {'backup_id_digits': 5},
+}
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_scenario_file_drives_generation(run_generator, tmp_path, engine):
+    if engine == 'numpy':
+        pytest.importorskip('numpy')
+    scenario = write_scenario(tmp_path, **SCENARIO)
+    data = run_generator('scenario', '--scenario', scenario, '--seed', 9, '--engine', engine)
+    with open(data / 'clients.csv', newline='', encoding='utf-8') as csvfile:
+        statuses = {client['client_id']: client['status'] for client in csv.DictReader(csvfile)}
+    with open(data / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.reader(csvfile))[1:]
+    assert rows and all(len(row[0]) == len('bkp_00001') for row in rows)
+
+    start = datetime(2024, 3, 1)
+    for row in rows:
+        day = (datetime.strptime(row[3][:10], '%Y-%m-%d') - start).days
+        assert 0 <= day <= 60
+        if statuses[row[1]] == 'pending':
+            assert day % 7 == 0
+        if statuses[row[1]] == 'inactive':
+            assert day <= 20
+
+def test_extended_scenario_keeps_short_backup_ids(run_generator):
+    pytest.importorskip('numpy')
+    data = run_generator('extended', '--scenario', os.path.join(HERE, 'scenarios', 'extended.json'), '--seed', 1,
+                         '--engine', 'numpy')
+    rows = read_rows(data / 'backup.csv')
+    assert len(rows) > 0 and all(len(row.split(',')[0]) == len('bkp_0001') for row in rows)
+
+def test_append_days_continues_the_seeded_generation(run_generator, tmp_path):
+    scenario = write_scenario(tmp_path, **SCENARIO)
+    data = run_generator('append', '--scenario', scenario, '--seed', 5, '--aggregates')
+    initial = len(read_rows(data / 'backup.csv'))
+    run_generator('append', '--scenario', scenario, '--seed', 5, '--append-days', 6)
+    assert not (data / 'backup_summary.json').exists()
+    full = run_generator('full', '--scenario', scenario, '--seed', 5, '--days', 66)
+
+    # Os dias acrescentados são os mesmos de uma geração única com 6 dias a mais (os backup_id seguem a
+    # numeração do dataset acrescentado) e os contadores do clients.csv batem com os dela
+    with open(data / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.reader(csvfile))[1:]
+    with open(full / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        full_rows = [row for row in list(csv.reader(csvfile))[1:] if row[3][:10] > rows[initial - 1][3][:10]]
+    assert full_rows and [row[1:] for row in rows[initial:]] == [row[1:] for row in full_rows]
+    assert (data / 'clients.csv').read_bytes() == (full / 'clients.csv').read_bytes()
+
+    # backup_id contíguos e arquivo ordenado por data
+    assert sorted(int(row[0][4:]) for row in rows) == list(range(1, len(rows) + 1))
+    assert [row[3] for row in rows] == sorted(row[3] for row in rows)
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_compressed_csvs_round_trip(run_generator, tmp_path, engine):
+    if engine == 'numpy':
+        pytest.importorskip('numpy')
+    import backup_query
+    from backup_generator.text_output import open_text_input
+
+    scenario = write_scenario(tmp_path, **SCENARIO)
+    argv = ('--scenario', scenario, '--seed', 4, '--engine', engine)
+    plain = run_generator('plain', *argv)
+    packed = run_generator('gzip', *argv, '--compress', 'gzip')
+    for name in ('clients.csv', 'backup.csv'):
+        assert not (packed / name).exists()
+        with open_text_input(str(packed / (name + '.gz'))) as compressed, \
+                open(plain / name, newline='', encoding='utf-8') as csvfile:
+            assert compressed.read() == csvfile.read()
+    assert backup_query.backup_id_digits(str(packed / 'backup.csv.gz')) == 5
+
+    # Um .gz não recebe linhas no fim: o acréscimo recusa o dataset comprimido sem tocar nele
+    before = (packed / 'backup.csv.gz').read_bytes()
+    with pytest.raises(subprocess.CalledProcessError):
+        run_generator('gzip', '--scenario', scenario, '--seed', 4, '--append-days', 3)
+    assert (packed / 'backup.csv.gz').read_bytes() == before
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_partitions_hold_the_rows_of_the_single_backup_csv(run_generator, tmp_path, engine):
+    if engine == 'numpy':
+        pytest.importorskip('numpy')
+    import backup_query
+    from backup_generator.partitions import client_bucket, iter_partition_rows, load_manifest
+
+    scenario = write_scenario(tmp_path, **SCENARIO)
+    argv = ('--scenario', scenario, '--seed', 3, '--engine', engine)
+    flat = run_generator('flat', *argv)
+    partitioned = run_generator('partitioned', *argv, '--partition', 'month', '--client-buckets', 3)
+    partition_dir = partitioned / 'backup_partitions'
+    manifest = load_manifest(str(partition_dir))
+    with open(flat / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.reader(csvfile))[1:]
+    assert list(iter_partition_rows(str(partition_dir))) == rows
+    assert manifest['rows'] == len(rows) == sum(partition['rows'] for partition in manifest['partitions'])
+    assert manifest['failed'] == sum(row[4] == 'failed' for row in rows)
+    for partition in manifest['partitions']:
+        with open(partition_dir / partition['path'], newline='', encoding='utf-8') as csvfile:
+            partition_rows = list(csv.reader(csvfile))[1:]
+        assert len(partition_rows) == partition['rows']
+        assert {row[3][:7] for row in partition_rows} == {partition['month']}
+        assert {client_bucket(row[1], 3) for row in partition_rows} == {partition['bucket']}
+    assert backup_query.backup_id_digits(str(partition_dir)) == 5
+    assert (partitioned / 'clients.csv').read_bytes() == (flat / 'clients.csv').read_bytes()
+
+def test_switching_layouts_leaves_no_stale_backups(run_generator, tmp_path):
+    scenario = write_scenario(tmp_path, **SCENARIO)
+    data = run_generator('layout', '--scenario', scenario, '--seed', 3)
+    assert (data / 'backup.csv').exists()
+
+    # O backup.csv único da geração anterior não fica ao lado das partições (nem o contrário)
+    run_generator('layout', '--scenario', scenario, '--seed', 3, '--partition', 'month')
+    assert not (data / 'backup.csv').exists()
+    assert (data / 'backup_partitions' / 'manifest.json').exists()
+    with pytest.raises(subprocess.CalledProcessError):
+        run_generator('layout', '--scenario', scenario, '--seed', 3, '--append-days', 3)
+
+    run_generator('layout', '--scenario', scenario, '--seed', 3, '--days', 30)
+    assert (data / 'backup.csv').exists()
+    assert not (data / 'backup_partitions').exists()
+
+def _binary_to_text(payload, columns):
+    """Decodifica as tuplas de um arquivo do COPY binário nas linhas equivalentes do COPY texto"""
+    import generate_large_dataset as generator
+
+    assert payload.startswith(generator.CopyBinaryEncoder.header)
+    position = len(generator.CopyBinaryEncoder.header)
+    pg_epoch = datetime(2000, 1, 1)
+    lines = []
+    while True:
+        (fields,) = struct.unpack_from('>h', payload, position)
+        position += 2
+        if fields == -1:
+            break
+        assert fields == len(columns)
+        values = []
+        for _, pg_type, _ in columns:
+            (size,) = struct.unpack_from('>i', payload, position)
+            position += 4
+            if size == -1:
+                values.append('\\N')
+                continue
+            data = payload[position:position + size]
+            position += size
+            if pg_type.startswith('bigint'):
+                values.append(str(struct.unpack('>q', data)[0]))
+            elif pg_type.startswith('boolean'):
+                values.append('t' if data == b'\x01' else 'f')
+            elif pg_type.startswith('timestamp'):
+                moment = pg_epoch + timedelta(microseconds=struct.unpack('>q', data)[0])
+                values.append(moment.strftime('%Y-%m-%d %H:%M:%S'))
+            elif pg_type.startswith('date'):
+                values.append((pg_epoch + timedelta(days=struct.unpack('>i', data)[0])).strftime('%Y-%m-%d'))
+            elif pg_type.startswith('double'):
+                values.append(str(struct.unpack('>d', data)[0]))
+            else:
+                values.append(generator.copy_text(data.decode('utf-8')))
+        lines.append('\t'.join(values))
+    assert position == len(payload)
+    return lines
+
+def test_database_dumps_hold_the_same_rows(run_generator):
+    pytest.importorskip('numpy')
+    import generate_large_dataset as generator
+
+    data = run_generator('dump', '--clients', 15, '--days', 40, '--seed', 8,
+                         '--databases', 'postgres,postgres-binary,sqlite')
+    for table, columns in (('cliente', generator.CLIENTE_COLUMNS), ('backup', generator.BACKUP_COLUMNS)):
+        text = (data / 'postgres' / f'{table}.copy').read_text(encoding='utf-8').splitlines()
+        binary = _binary_to_text((data / 'postgres_binary' / f'{table}.bin').read_bytes(), columns)
+        assert binary == text
+        with closing(sqlite3.connect(data / 'backup.sqlite')) as connection:
+            assert connection.execute(f'SELECT count(*) FROM {table}').fetchone()[0] == len(text)
+
+def model_backups(engine, schedule, days=730):
+    """(cliente, data, sucesso, tamanho) de 150 clientes ativos com success_rate 0.8 na agenda informada"""
+    import generate_large_dataset as generator
+
+    scenario = generator.normalize_scenario({'dates': {'days': days}, 'backups_per_client': None,
+                                             'schedules': [dict(schedule, weekend_skip=0.0)]})
+    clients = [{'id': f'clt_{index:03d}', 'name': f'Cliente {index}', 'status': 'active', 'avg_size': 2.0,
+                'success_rate': 0.8} for index in range(150)]
+    if engine == 'dict':
+        values = generator.iter_backup_values(clients, days + 1, 3, days, scenario)
+        return [(client, generator.EPOCH + timedelta(seconds=moment), success, size)
+                for client, moment, success, _, size in values]
+    pytest.importorskip('numpy')
+    backups = []
+    for columns in generator.iter_backup_column_blocks(clients, days + 1, seed=3, history_days=days, scenario=scenario):
+        moments = [generator.EPOCH + timedelta(seconds=moment) for moment in columns['timestamp'].tolist()]
+        backups.extend(zip(columns['client_index'].tolist(), moments, columns['success'].tolist(), columns['size_gb'].tolist()))
+    return backups
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_markov_failures_come_in_bursts_at_the_client_rate(engine):
+    backups = model_backups(engine, {'failures': {'model': 'markov', 'burst_days': 4}})
+    assert abs(sum(not success for _, _, success, _ in backups) / len(backups) - 0.2) < 0.02
+
+    bursts = []
+    previous = None
+    for client, _, success, _ in backups:
+        if success:
+            previous = client, True
+            continue
+        if previous == (client, False):
+            bursts[-1] += 1
+        else:
+            bursts.append(1)
+        previous = client, False
+    assert abs(sum(bursts) / len(bursts) - 4) < 0.3
+
+@pytest.mark.parametrize('engine', ['dict', 'numpy'])
+def test_size_growth_and_seasonality(engine):
+    schedule = {
+        'size_growth': {'model': 'exponential', 'rate': 1.0},
+        'seasonality': {'weekday_size': [1, 1, 1, 1, 1, 0.5, 0.5], 'month_end_days': 3, 'month_end_size': 1.0,
+                        'month_end_failure': 2.0},
+    }
+    backups = model_backups(engine, schedule)
+
+    def mean_size(keep):
+        sizes = [size for _, moment, success, size in backups if success and keep(moment)]
+        return sum(sizes) / len(sizes)
+
+    def failure_rate(keep):
+        selected = [success for _, moment, success, _ in backups if keep(moment)]
+        return 1 - sum(selected) / len(selected)
+
+    weekday = lambda moment: moment.weekday() < 5
+    assert abs(mean_size(lambda moment: moment.year == 2024 and weekday(moment))
+               / mean_size(lambda moment: moment.year == 2023 and weekday(moment)) - 2) < 0.15
+    assert abs(mean_size(lambda moment: not weekday(moment)) / mean_size(weekday) - 0.5) < 0.05
+
+    month_end = lambda moment: (moment + timedelta(days=3)).month != moment.month
+    assert abs(failure_rate(month_end) - 0.4) < 0.04
+    assert abs(failure_rate(lambda moment: not month_end(moment)) - 0.2) < 0.02
+
+def test_upload_csv_passes_import_validator(run_generator, tmp_path):
+    import csv_import_validator as validator
+
+    data = run_generator('upload', '--clients', 25, '--days', 30, '--seed', 3, '--upload', '--workers', 2)
+    report = validator.validate_csv(str(data / 'upload.csv'), str(tmp_path / 'import'), workers=1)
+    assert report['totalRows'] == 25
+    assert report['invalidRows'] == 0
+    assert report['totalBackups'] > 0
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import generator_cache
+from generator_cache import OutputCache, cache_key
+
+def entry_files(cache_dir):
+    """Conteúdo de cada arquivo de dados das entradas do cache"""
+    return {
+        (key, name): (cache_dir / key / name).read_bytes()
+        for key in os.listdir(cache_dir) if not key.startswith('.')
+        for name in os.listdir(cache_dir / key) if name != generator_cache.MANIFEST
+    }
+
+def test_cache_key_is_canonical():
+    assert cache_key({'a': 1, 'b': frozenset({'y', 'x'})}) == cache_key({'b': ['x', 'y'], 'a': 1})
+    assert cache_key({'a': 1}) != cache_key({'a': 2})
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path):
+    cache = OutputCache(str(tmp_path / 'cache'), max_bytes=250)
+    files = {}
+    for key in ('a', 'b', 'c'):
+        path = tmp_path / key / 'backup.csv'
+        path.parent.mkdir()
+        path.write_bytes(key.encode() * 100)
+        files[key] = str(path)
+
+    assert cache.store('a', [files['a']]) and cache.store('b', [files['b']])
+    # Usar "a" o torna o mais recente: "b" é quem sai quando "c" não cabe
+    assert cache.restore('a', str(tmp_path / 'out')) is not None
+    assert cache.store('c', [files['c']])
+    assert [key for key, _ in cache.entries()] == ['a', 'c']
+    assert cache.restore('b', str(tmp_path / 'out')) is None
+
+def test_hit_restores_outputs_and_edits_do_not_reach_the_cache(run_generator, tmp_path):
+    argv = ['--clients', 15, '--days', 40, '--seed', 3]
+    first = run_generator('first', *argv, cache=True)
+    cached = entry_files(tmp_path / 'cache')
+    assert len(cached) == 2
+
+    second = run_generator('second', *argv, cache=True)
+    for name in ('clients.csv', 'backup.csv'):
+        assert (second / name).read_bytes() == (first / name).read_bytes()
+        assert os.stat(second / name).st_nlink > 1
+
+    # Acrescentar dias ao dataset restaurado (hardlinks) não altera a entrada
+    run_generator('second', '--seed', 3, '--append-days', 2)
+    assert (second / 'backup.csv').read_bytes() != (first / 'backup.csv').read_bytes()
+    assert entry_files(tmp_path / 'cache') == cached
+
+def test_outputs_of_a_previous_run_do_not_survive(run_generator):
+    pytest.importorskip('numpy')
+    data = run_generator('stale', '--clients', 15, '--days', 40, '--seed', 3, cache=True)
+    run_generator('stale', '--clients', 15, '--days', 40, '--seed', 4, '--aggregates', '--formats', 'npz')
+    assert (data / 'backup_summary.json').exists() and (data / 'backup.npz').exists()
+
+    # Acerto do cache: só os arquivos da entrada ficam no diretório
+    run_generator('stale', '--clients', 15, '--days', 40, '--seed', 3, cache=True)
+    assert sorted(os.listdir(data)) == ['backup.csv', 'clients.csv']
+    run_generator('stale', '--clients', 15, '--days', 40, '--seed', 4, '--upload')
+    assert sorted(os.listdir(data)) == ['upload.csv']
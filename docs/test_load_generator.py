@@ -0,0 +1,45 @@
+import asyncio
+import time
+from argparse import Namespace
+
+import pytest
+
+import generate_large_dataset as generator
+import load_generator as load
+
+def test_rate_limiter_keeps_its_schedule_when_sends_fall_behind():
+    async def run():
+        limiter = load.RateLimiter(100)
+        first = await limiter.wait()
+        time.sleep(0.05)  # o loop fica bloqueado: as próximas vagas passam sem envio
+        return first, [await limiter.wait() for _ in range(5)]
+
+    first, late = asyncio.run(run())
+    assert late == pytest.approx([first + 0.01 * step for step in range(1, 6)])
+
+class SlowPool:
+    """Pool falso que leva 20 ms por requisição"""
+
+    async def request(self, method, path, payload):
+        await asyncio.sleep(0.02)
+        return 201, b'{}'
+
+def test_latency_counts_from_the_scheduled_start():
+    stats = load.LatencyStats()
+    requests = [('POST /api/backups', 'POST', '/api/backups', '{}', None)] * 10
+    asyncio.run(load.run_requests(SlowPool(), requests, stats, concurrency=1, rps=100))
+
+    # 100 req/s com uma requisição de 20 ms por vez: cada envio espera 10 ms a mais que o anterior
+    latencies = stats.latencies['POST /api/backups']
+    assert latencies[0] < 40 and latencies[-1] > latencies[0] + 60
+
+def test_backup_segments_cover_every_history_day_unless_capped():
+    clients = generator.generate_clients(40, 3)
+
+    def counts(backups_per_client):
+        args = Namespace(days=10, seed=3, backups_per_client=backups_per_client)
+        return [count for _, _, count, *_ in load.iter_backup_segments(clients, args)]
+
+    # 10 dias de histórico são 11 datas (hoje incluso), como no generate_large_dataset.py
+    assert max(counts(None)) == 11
+    assert max(counts(4)) == 4
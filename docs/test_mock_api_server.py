@@ -0,0 +1,87 @@
+import csv
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import generate_large_dataset as generator
+import mock_api_server as server
+
+@pytest.fixture
+def dataset(run_generator):
+    data = run_generator('api', '--clients', 30, '--days', 90, '--seed', 4)
+    with open(data / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        backups = list(csv.DictReader(csvfile))
+    index = server.build_index(str(data / 'clients.csv'), str(data / 'backup.csv'))
+    return index, backups
+
+def window_rows(backups, days):
+    """Backups dos últimos `days` dias até o último backup, como BackupIndex.window"""
+    last = max(datetime.fromisoformat(backup['date']) for backup in backups)
+    return [backup for backup in backups if datetime.fromisoformat(backup['date']) >= last - timedelta(days=days)]
+
+def test_summary_and_indicators_match_backup_csv(dataset):
+    index, backups = dataset
+    summary = server.route(index, '/api/dashboard/backup/resumo', {})
+    successful = sum(backup['status'] == 'success' for backup in backups)
+    assert (summary['total'], summary['sucessos']) == (len(backups), successful)
+
+    indicators = server.route(index, '/api/dashboard/backup/indicadores', {'dias': ['7']})
+    recent = window_rows(backups, 7)
+    successful = sum(backup['status'] == 'success' for backup in recent)
+    assert (indicators['backupsSucesso'], indicators['backupsFalha']) == (successful, len(recent) - successful)
+
+def test_client_statuses_use_last_backup_and_window(dataset):
+    index, backups = dataset
+    by_client = defaultdict(list)
+    for backup in window_rows(backups, 10):
+        by_client[backup['client_id']].append(backup['status'] == 'success')
+    last = {}
+    for backup in sorted(backups, key=lambda backup: backup['date']):
+        last[backup['client_id']] = backup['status']
+
+    statuses = server.route(index, '/api/dashboard/backup/clientes', {'dias': ['10']})
+    assert len(statuses) == len(last)
+    for status in statuses:
+        client_id = f"clt_{status['id']:03d}"
+        assert status['statusUltimoBackup'] == ('SUCESSO' if last[client_id] == 'success' else 'FALHA')
+        window = by_client[client_id]
+        assert status['taxaSucesso'] == generator._success_rate(sum(window), len(window))
+
+    failed = server.route(index, '/api/dashboard/backup/clientes', {'status': ['FAILED'], 'dias': ['10']})
+    assert [status['id'] for status in failed] == [
+        status['id'] for status in statuses if status['statusUltimoBackup'] == 'FALHA'
+    ]
+
+def test_client_history_and_errors(dataset):
+    index, backups = dataset
+    history = server.route(index, '/api/dashboard/backup/cliente/3', {})
+    rows = sorted((backup for backup in backups if backup['client_id'] == 'clt_003'), key=lambda backup: backup['date'])
+    assert [backup['id'] for backup in history] == [int(row['backup_id'][4:]) for row in rows]
+    assert [backup['dataInicio'] for backup in history] == [row['date'].replace(' ', 'T') for row in rows]
+
+    with pytest.raises(server.ApiError) as error:
+        server.route(index, '/api/dashboard/backup/cliente/999', {})
+    assert error.value.status == 404
+    with pytest.raises(server.ApiError) as error:
+        server.route(index, '/api/dashboard/backup/indicadores', {'dias': ['0']})
+    assert error.value.status == 400
+
+def test_history_end_date_keeps_durations_past_18_hours(run_generator, tmp_path):
+    data = run_generator('long', '--clients', 5, '--days', 10, '--seed', 4)
+    with open(data / 'backup.csv', newline='', encoding='utf-8') as csvfile:
+        rows = list(csv.reader(csvfile))
+    # Um backup de 25 horas (90.000 s) não cabe em 16 bits
+    row = next(row for row in rows[1:] if row[1] == 'clt_002')
+    row[5] = '1500:00'
+    backup_path = tmp_path / 'long.csv'
+    with open(backup_path, 'w', newline='', encoding='utf-8') as csvfile:
+        csv.writer(csvfile).writerows(rows)
+
+    index = server.build_index(str(data / 'clients.csv'), str(backup_path))
+    history = server.route(index, '/api/dashboard/backup/cliente/2', {})
+    backup = next(backup for backup in history if backup['id'] == int(row[0][4:]))
+    start = datetime.fromisoformat(backup['dataInicio'])
+    assert datetime.fromisoformat(backup['dataFim']) - start == timedelta(hours=25)
@@ -0,0 +1,41 @@
+import random
+from collections import Counter
+
+import pytest
+
+from backup_generator.sampling import CategoricalSampler
+
+def test_categorical_sampler_frequencies():
+    weights = [1, 0, 2, 3, 4]
+    sampler = CategoricalSampler('abcde', weights)
+    draws = 200000
+    expected = {value: weight / sum(weights) for value, weight in zip('abcde', weights)}
+
+    rng = random.Random(5)
+    counts = Counter(sampler.draw(rng) for _ in range(draws))
+    assert counts['b'] == 0
+    for value, share in expected.items():
+        assert abs(counts[value] / draws - share) < 0.01
+
+    np = pytest.importorskip('numpy')
+    indices = sampler.draw_indices(np.random.default_rng(5), draws)
+    shares = np.bincount(indices, minlength=len(weights)) / draws
+    assert shares[1] == 0
+    for index, share in enumerate(expected.values()):
+        assert abs(shares[index] - share) < 0.01
+
+def test_categorical_sampler_rejects_invalid_weights():
+    with pytest.raises(ValueError):
+        CategoricalSampler('ab', [1])
+    with pytest.raises(ValueError):
+        CategoricalSampler('ab', [0, 0])
+    with pytest.raises(ValueError):
+        CategoricalSampler('ab', [1, -1])
+
+def test_batch_population_is_the_same_for_any_worker_count(run_generator):
+    pytest.importorskip('numpy')
+    argv = ['--clients', 300, '--days', 20, '--seed', 12, '--weights', 'population', '--sampling', 'batch']
+    single = run_generator('single', *argv, '--workers', 1)
+    parallel = run_generator('parallel', *argv, '--workers', 3, '--chunk-size', 1000)
+    assert (single / 'clients.csv').read_bytes() == (parallel / 'clients.csv').read_bytes()
+    assert (single / 'backup.csv').read_bytes() == (parallel / 'backup.csv').read_bytes()